@@ -31,6 +31,7 @@ def create_app(environment="development"):
         permissions_blueprint,
         search_blueprint,
         notifications_blueprint,
+        job_blueprint,
     )
     from app import models as m
 
@@ -61,6 +62,7 @@ def create_app(environment="development"):
     app.register_blueprint(permissions_blueprint)
     app.register_blueprint(search_blueprint)
     app.register_blueprint(notifications_blueprint)
+    app.register_blueprint(job_blueprint)
 
     # Set up flask login.
     @login_manager.user_loader
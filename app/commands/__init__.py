@@ -1,3 +1,7 @@
+import os
+import socket
+
+import click
 from flask import Flask
 from app import models as m
 from app import db, forms
@@ -35,3 +39,88 @@ def init(app: Flask):
             password=app.config["ADMIN_PASSWORD"],
         ).save()
         print("admin created")
+
+    @app.cli.command("backfill-featured-interpretations")
+    @click.option("--batch-size", default=1000, help="Sections per transaction")
+    def backfill_featured_interpretations(batch_size: int):
+        """Fill featured interpretation of every section"""
+        from app.controllers.featured_interpretation import (
+            backfill_featured_interpretations,
+        )
+
+        total = backfill_featured_interpretations(batch_size)
+        print(f"Featured interpretations of {total} sections updated")
+
+    @app.cli.command("recount-tags")
+    def recount_tags():
+        """Set usage counters of every tag from the tag links"""
+        from app.controllers.tags import recount_tag_usage
+
+        total = recount_tag_usage()
+        print(f"Usage of {total} tags counted")
+
+    @app.cli.command("reconcile-book-stats")
+    def reconcile_book_stats():
+        """Add missing book stats and fix counters drifted from the source tables"""
+        from app.controllers.book_stats import reconcile_book_stats
+
+        added, fixed = reconcile_book_stats()
+        print(f"Book stats: {added} added, {fixed} fixed")
+
+    @app.cli.command("check-query-plans")
+    def check_query_plans():
+        """EXPLAIN hot queries, fail if any of them scans a table sequentially"""
+        from app.controllers.query_plan import check_query_plans
+
+        failed = check_query_plans()
+        if failed:
+            print(f"Sequential scan in: {', '.join(failed)}")
+            raise SystemExit(1)
+        print("All hot queries use indexes")
+
+    @app.cli.group("jobs")
+    def jobs():
+        """Background jobs"""
+
+    @jobs.command("worker")
+    @click.option("--once", is_flag=True, help="Exit when the queue is empty")
+    @click.option("--poll-interval", default=5.0, help="Seconds between queue checks")
+    def worker(once: bool, poll_interval: float):
+        """Run queued forks, versions and deletions"""
+        from app.controllers.jobs import work
+
+        name = f"{socket.gethostname()}:{os.getpid()}"
+        print(f"Worker [{name}] started")
+        processed = work(name, once=once, poll_interval=poll_interval)
+        print(f"{processed} jobs processed")
+
+    @app.cli.group("rankings")
+    def rankings():
+        """Ranking snapshots of the home feed"""
+
+    @rankings.command("refresh")
+    @click.option("--limit", default=0, help="Interpretations per snapshot")
+    def refresh(limit: int):
+        """Rebuild the snapshots, the jobs worker does it periodically"""
+        from app.controllers.rankings import refresh_rankings
+
+        counts = refresh_rankings(limit)
+        for ordering, count in counts.items():
+            print(f"{ordering.name.lower()}: {count} ranked")
+
+    @app.cli.group("search")
+    def search():
+        """Full text search"""
+
+    @search.command("reindex")
+    @click.option("--batch-size", default=1000, help="Rows per fetch and insert")
+    def reindex(batch_size: int):
+        """Rebuild search documents of books, collections, sections and
+        interpretations"""
+        from app.controllers.search_index import reindex
+
+        indexed = reindex(
+            batch_size,
+            on_progress=lambda kind, total: print(f"{kind.name.lower()}: {total}"),
+        )
+        print(f"{sum(indexed.values())} documents indexed")
@@ -1,5 +1,5 @@
 # flake8: noqa F401
-from .pagination import create_pagination
+from .pagination import create_pagination, paginate, keyset_page
 from .breadcrumbs import create_breadcrumbs
 from .book_verify import register_book_verify_route, book_validator
 from .clean_html import clean_html
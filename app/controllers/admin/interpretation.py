@@ -6,6 +6,7 @@ from flask_admin.babel import gettext
 from app.controllers.delete_nested_book_entities import (
     delete_nested_interpretation_entities,
 )
+from app.controllers.featured_interpretation import update_featured_interpretation
 from .protected_model_view import ProtectedModelView
 
 
@@ -46,6 +47,7 @@ class InterpretationView(ProtectedModelView):
 
             model.is_deleted = True
             delete_nested_interpretation_entities(model)
+            update_featured_interpretation(model.section)
             model.save()
             flash(
                 gettext(
@@ -3,9 +3,6 @@ from flask_admin.helpers import get_redirect_target, flash_errors
 from flask import redirect, flash
 from flask_admin.babel import gettext
 
-from app.controllers.delete_nested_book_entities import (
-    delete_nested_comment_entities,
-)
 from .protected_model_view import ProtectedModelView
 
 
@@ -40,7 +37,6 @@ class TagView(ProtectedModelView):
                 return redirect(return_url)
 
             model.is_deleted = True
-            delete_nested_comment_entities(model)
             model.save()
             flash(
                 gettext(
@@ -0,0 +1,52 @@
+import sqlalchemy as sa
+
+from app import models as m
+from app.controllers.search_backend import search_interpretations
+from app.controllers.trigram_search import trigram_match
+
+
+def matching_book_ids(q: str) -> sa.CompoundSelect:
+    """Ids of books matching q by label, by a label of a collection or a section,
+    or by text of an interpretation. Every part is looked up by its own index"""
+    by_label = sa.select(m.Book.id.label("book_id")).where(
+        trigram_match(m.Book.label, q)
+    )
+    by_collection = (
+        sa.select(m.BookVersion.book_id)
+        .join(m.Collection, m.Collection.version_id == m.BookVersion.id)
+        .where(
+            trigram_match(m.Collection.label, q),
+            m.Collection.is_deleted.is_(False),
+            m.Collection.copy_of == 0,
+            m.Collection.is_root.is_(False),
+        )
+    )
+    by_section = (
+        sa.select(m.BookVersion.book_id)
+        .join(m.Section, m.Section.version_id == m.BookVersion.id)
+        .where(
+            trigram_match(m.Section.label, q),
+            m.Section.is_deleted.is_(False),
+            m.Section.copy_of == 0,
+        )
+    )
+    interpretation_ids = (
+        search_interpretations(q).with_entities(m.Interpretation.id).order_by(None)
+    )
+    by_interpretation = sa.select(m.Interpretation.book_id).where(
+        m.Interpretation.id.in_(interpretation_ids),
+        sa.exists().where(
+            m.Section.id == m.Interpretation.section_id,
+            m.Section.is_deleted.is_(False),
+        ),
+    )
+    return sa.union(by_label, by_collection, by_section, by_interpretation)
+
+
+def search_books(q: str):
+    """Active books matching q, see matching_book_ids"""
+    books = m.Book.query.filter(m.Book.is_deleted.is_(False)).order_by(m.Book.id)
+    if not q.strip():
+        return books
+    matched = matching_book_ids(q).subquery()
+    return books.filter(m.Book.id.in_(sa.select(matched.c.book_id)))
@@ -0,0 +1,119 @@
+from datetime import datetime
+
+import sqlalchemy as sa
+from sqlalchemy.orm import Query
+
+from app import models as m, db, schema as s
+from app.controllers.pagination import Page, paginate
+from app.logger import log
+
+# book_stats rows are moved by the write paths: stars, votes, interpretations,
+# comments and contributors. Bulk changes (deleted collections, sections and
+# versions, forks and new versions) recount the book. reconcile_book_stats
+# repairs any drift
+
+# (sort key, book id) pairs in the order of their indexes
+BOOK_ORDERINGS = {
+    "favorited": (m.BookStats.stars_count, m.BookStats.book_id),
+    "interpretations": (m.BookStats.interpretations_count, m.BookStats.book_id),
+    "recent": (m.Book.created_at, m.Book.id),
+}
+DEFAULT_ORDERING = "recent"
+
+
+def add_book_stats(book_id: int, **deltas: int):
+    """Move counters of the book by deltas, e.g. stars_count=1, and mark the
+    book active now. Without deltas only the activity is marked. Does not commit"""
+    values = {
+        getattr(m.BookStats, name): getattr(m.BookStats, name) + delta
+        for name, delta in deltas.items()
+    }
+    values[m.BookStats.last_activity_at] = datetime.now()
+    db.session.execute(
+        sa.update(m.BookStats)
+        .where(m.BookStats.book_id == book_id)
+        .values(values)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def _actual_counters(book_id: sa.Column) -> dict:
+    """Counters of the book with book_id computed from the source tables,
+    by book_stats column name"""
+    return {
+        "stars_count": sa.select(sa.func.count(m.BookStar.id))
+        .where(m.BookStar.book_id == book_id, m.BookStar.is_deleted.is_(False))
+        .scalar_subquery(),
+        "interpretations_count": sa.select(sa.func.count(m.Interpretation.id))
+        .where(
+            m.Interpretation.book_id == book_id,
+            m.Interpretation.is_deleted.is_(False),
+        )
+        .scalar_subquery(),
+        "comments_count": sa.select(sa.func.count(m.Comment.id))
+        .where(m.Comment.book_id == book_id, m.Comment.is_deleted.is_(False))
+        .scalar_subquery(),
+        "contributors_count": sa.select(sa.func.count(m.BookContributor.id))
+        .where(m.BookContributor.book_id == book_id)
+        .scalar_subquery(),
+    }
+
+
+def recount_book_stats(book_id: int):
+    """Counters of the book from the source tables, after bulk changes of its
+    content. Marks the book active. Does not commit"""
+    db.session.execute(
+        sa.update(m.BookStats)
+        .where(m.BookStats.book_id == book_id)
+        .values(
+            last_activity_at=datetime.now(),
+            **_actual_counters(m.BookStats.book_id),
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+
+def reconcile_book_stats() -> tuple[int, int]:
+    """Add missing stats rows and fix counters which drifted from the source
+    tables. Commits. Returns numbers of added and fixed rows"""
+    counters = _actual_counters(m.Book.id)
+    added = db.session.execute(
+        sa.insert(m.BookStats).from_select(
+            ["book_id", "last_activity_at", "created_at", "is_deleted", *counters],
+            sa.select(
+                m.Book.id,
+                m.Book.created_at,
+                m.Book.created_at,
+                sa.false(),
+                *counters.values(),
+            ).where(~sa.exists().where(m.BookStats.book_id == m.Book.id)),
+        )
+    ).rowcount
+
+    counters = _actual_counters(m.BookStats.book_id)
+    fixed = db.session.execute(
+        sa.update(m.BookStats)
+        .where(
+            sa.or_(
+                *[
+                    getattr(m.BookStats, name) != actual
+                    for name, actual in counters.items()
+                ]
+            )
+        )
+        .values(counters)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    db.session.commit()
+    log(log.INFO, "Book stats: [%d] added, [%d] fixed", added, fixed)
+    return added, fixed
+
+
+def sort_books(query: Query, sort: str | None) -> tuple[s.Pagination, Page]:
+    """Page of the books query in one of BOOK_ORDERINGS, the biggest first.
+    Orders by an indexed column of book_stats or books, nothing is grouped"""
+    sort_key, book_id = BOOK_ORDERINGS.get(sort, BOOK_ORDERINGS[DEFAULT_ORDERING])
+    query = query.join(m.BookStats, m.BookStats.book_id == m.Book.id).order_by(
+        sort_key.desc(), book_id.desc()
+    )
+    return paginate(query, estimate=True)
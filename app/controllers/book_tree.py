@@ -0,0 +1,178 @@
+from sqlalchemy.orm import joinedload, selectinload
+
+from app import models as m
+from app.controllers.featured_interpretation import choose_featured_interpretation
+from app.logger import log
+
+
+class TreeNode:
+    """In-memory wrapper around a loaded model.
+
+    Attributes which are not precomputed by the tree are taken from the model,
+    so templates can use a node the same way as the model itself.
+    """
+
+    def __init__(self, model):
+        self.model = model
+
+    def __getattr__(self, name):
+        return getattr(self.model, name)
+
+    def __eq__(self, other):
+        return self.model == getattr(other, "model", other)
+
+    def __hash__(self):
+        return hash(self.model)
+
+    def __repr__(self):
+        return f"<Node {self.model!r}>"
+
+
+class TreeSection(TreeNode):
+    def __init__(self, section: m.Section):
+        super().__init__(section)
+        self.active_interpretations: list[m.Interpretation] = []
+        self.approved_interpretation: m.Interpretation | None = None
+        self.approved_comments: list[m.Comment] = []
+
+
+class TreeCollection(TreeNode):
+    def __init__(self, collection: m.Collection):
+        super().__init__(collection)
+        self.children: list[TreeCollection] = []
+        self.sections: list[TreeSection] = []
+
+    @property
+    def active_children(self):
+        return sorted(self.children, key=lambda item: item.position)
+
+    @property
+    def active_sections(self):
+        return sorted(self.sections, key=lambda item: item.position)
+
+    @property
+    def sub_collections(self):
+        return self.children
+
+    @property
+    def children_collections(self):
+        return self.children
+
+
+class BookTree:
+    """Whole book version loaded in a fixed number of queries
+
+    Using:
+        tree = BookTree.load(book.active_version)
+        for collection in tree.children_collections:
+            ...
+    """
+
+    def __init__(self, version: m.BookVersion):
+        self.version = version
+        self.root: TreeCollection = None
+        self.collections: dict[int, TreeCollection] = {}
+        self.sections: dict[int, TreeSection] = {}
+
+    @property
+    def children_collections(self) -> list[TreeCollection]:
+        if not self.root:
+            return []
+        return self.root.children_collections
+
+    @classmethod
+    def load(cls, version: m.BookVersion) -> "BookTree":
+        tree = cls(version)
+        log(log.INFO, "Load tree of version [%s]", version)
+
+        collections: list[m.Collection] = (
+            m.Collection.query.filter_by(version_id=version.id, is_deleted=False)
+            .options(selectinload(m.Collection.access_groups))
+            .order_by(m.Collection.id)
+            .all()
+        )
+        nodes = {
+            collection.id: TreeCollection(collection) for collection in collections
+        }
+        for node in nodes.values():
+            if node.is_root:
+                tree.root = node
+            elif node.parent_id in nodes:
+                nodes[node.parent_id].children.append(node)
+
+        # collections under a deleted parent are not reachable from the root
+        stack = [tree.root] if tree.root else []
+        while stack:
+            node = stack.pop()
+            tree.collections[node.id] = node
+            stack.extend(node.children)
+
+        sections: list[m.Section] = (
+            m.Section.query.filter_by(version_id=version.id, is_deleted=False)
+            .options(
+                selectinload(m.Section.access_groups),
+                selectinload(m.Section.tags),
+            )
+            .order_by(m.Section.id)
+            .all()
+        )
+        for section in sections:
+            if section.collection_id not in tree.collections:
+                continue
+            node = TreeSection(section)
+            tree.sections[section.id] = node
+            tree.collections[section.collection_id].sections.append(node)
+
+        tree._load_interpretations()
+        tree._load_comments()
+
+        return tree
+
+    def _load_interpretations(self):
+        interpretations: list[m.Interpretation] = (
+            m.Interpretation.query.join(
+                m.Section, m.Section.id == m.Interpretation.section_id
+            )
+            .filter(
+                m.Section.version_id == self.version.id,
+                m.Interpretation.is_deleted.is_(False),
+            )
+            .options(
+                joinedload(m.Interpretation.user),
+                selectinload(m.Interpretation.tags),
+            )
+            .order_by(m.Interpretation.id.desc())
+            .all()
+        )
+        for interpretation in interpretations:
+            section = self.sections.get(interpretation.section_id)
+            if section:
+                section.active_interpretations.append(interpretation)
+                if interpretation.id == section.featured_interpretation_id:
+                    section.approved_interpretation = interpretation
+
+        # pointer can be stale if interpretations were changed bypassing the views
+        for section in self.sections.values():
+            if section.active_interpretations and not section.approved_interpretation:
+                section.approved_interpretation = choose_featured_interpretation(
+                    section.active_interpretations
+                )
+
+    def _load_comments(self):
+        comments: list[m.Comment] = (
+            m.Comment.query.join(
+                m.Interpretation, m.Interpretation.id == m.Comment.interpretation_id
+            )
+            .join(m.Section, m.Section.id == m.Interpretation.section_id)
+            .filter(
+                m.Section.version_id == self.version.id,
+                m.Comment.approved.is_(True),
+            )
+            .options(joinedload(m.Comment.user), joinedload(m.Comment.interpretation))
+            .order_by(m.Comment.id)
+            .all()
+        )
+        for comment in comments:
+            section = self.sections.get(comment.interpretation.section_id)
+            if section:
+                section.approved_comments.append(comment)
@@ -0,0 +1,41 @@
+import time
+from collections import OrderedDict
+from threading import Lock
+
+MISSING = object()
+
+
+class LRUCache:
+    """In-process cache of a worker. The least recently used items are evicted
+    over maxsize, every item expires ttl seconds after it was set"""
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 60.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._items: OrderedDict = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            expires_at, value = self._items.get(key, (0, MISSING))
+            if value is MISSING:
+                return default
+            if expires_at < time.monotonic():
+                del self._items[key]
+                return default
+            self._items.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._items[key] = (time.monotonic() + self.ttl, value)
+            self._items.move_to_end(key)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+    def __len__(self):
+        return len(self._items)
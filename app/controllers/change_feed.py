@@ -0,0 +1,60 @@
+from typing import Callable
+
+from flask import has_app_context
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.logger import log
+
+# Tables changed by committed transactions. Caches subscribe to it to know
+# what is stale. Writes are collected from the session: flushed objects and
+# insert()/update()/delete() statements, so every write path is covered
+
+_subscribers: list[Callable[[set[str]], None]] = []
+
+
+def subscribe(callback: Callable[[set[str]], None]):
+    """Call back with the names of changed tables after every commit"""
+    _subscribers.append(callback)
+    return callback
+
+
+def publish(tables: set[str]):
+    log(log.DEBUG, "Tables [%s] changed", tables)
+    for callback in _subscribers:
+        callback(tables)
+
+
+def _collect(session: Session, tables: set[str]):
+    session.info.setdefault("changed_tables", set()).update(tables)
+
+
+@event.listens_for(Session, "after_flush")
+def collect_flushed(session: Session, _flush_context):
+    _collect(
+        session,
+        {
+            obj.__table__.name
+            for obj in (*session.new, *session.dirty, *session.deleted)
+            if hasattr(obj, "__table__")
+        },
+    )
+
+
+@event.listens_for(Session, "do_orm_execute")
+def collect_bulk_write(orm_execute_state):
+    state = orm_execute_state
+    if (state.is_insert or state.is_update or state.is_delete) and state.bind_mapper:
+        _collect(state.session, {state.bind_mapper.local_table.name})
+
+
+@event.listens_for(Session, "after_commit")
+def publish_committed(session: Session):
+    tables = session.info.pop("changed_tables", None)
+    if tables and has_app_context():
+        publish(tables)
+
+
+@event.listens_for(Session, "after_rollback")
+def forget_rolled_back(session: Session):
+    session.info.pop("changed_tables", None)
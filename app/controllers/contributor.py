@@ -1,6 +1,7 @@
 from flask import flash, redirect, url_for
 
 from app import forms as f, models as m, db
+from app.controllers.book_stats import add_book_stats
 from app.logger import log
 
 
@@ -25,6 +26,7 @@ def add_contributor_to_book(
     role = m.BookContributor.Roles(int(form.role.data))
     contributor = m.BookContributor(user_id=user_id, book_id=book_id, role=role)
     log(log.INFO, "New contributor [%s]", contributor)
+    add_book_stats(book_id, contributors_count=1)
     contributor.save()
 
     groups = (
@@ -88,6 +90,7 @@ def delete_contributor_from_book(
 
     log(log.INFO, "Delete BookContributor [%s]", book_contributor)
     db.session.delete(book_contributor)
+    add_book_stats(book_id, contributors_count=-1)
     db.session.commit()
 
     flash("Success!", "success")
@@ -1,22 +1,26 @@
-from app import models as m
+from app import models as m, db
 from app.logger import log
 from .get_or_create_permission import get_or_create_permission
 
 
-def create_moderator_group(book_id: int):
+def create_moderator_group(book_id: int, commit: bool = True):
     log(log.INFO, "Create moderator access group")
-    group: m.AccessGroup = m.AccessGroup(name="moderator", book_id=book_id).save()
+    group: m.AccessGroup = m.AccessGroup(name="moderator", book_id=book_id).save(commit)
+    if not commit:
+        db.session.flush()
     permissions = []
 
     comment_DA = get_or_create_permission(
         access=m.Permission.Access.D | m.Permission.Access.A,
         entity_type=m.Permission.Entity.COMMENT,
+        commit=commit,
     )
     permissions.append(comment_DA)
 
     interpretation_DA = get_or_create_permission(
         access=m.Permission.Access.D | m.Permission.Access.A,
         entity_type=m.Permission.Entity.INTERPRETATION,
+        commit=commit,
     )
     permissions.append(interpretation_DA)
 
@@ -24,43 +28,50 @@ def create_moderator_group(book_id: int):
         log(log.INFO, "Add permission [%d] to group[%d]", permission.id, group.id)
         m.PermissionAccessGroups(
             permission_id=permission.id, access_group_id=group.id
-        ).save()
+        ).save(commit)
 
     return group
 
 
-def create_editor_group(book_id: int):
+def create_editor_group(book_id: int, commit: bool = True):
     log(log.INFO, "Create editor access group")
-    group: m.AccessGroup = m.AccessGroup(name="editor", book_id=book_id).save()
+    group: m.AccessGroup = m.AccessGroup(name="editor", book_id=book_id).save(commit)
+    if not commit:
+        db.session.flush()
     permissions = []
 
     comment_DA = get_or_create_permission(
         access=m.Permission.Access.D | m.Permission.Access.A,
         entity_type=m.Permission.Entity.COMMENT,
+        commit=commit,
     )
     permissions.append(comment_DA)
 
     interpretation_DA = get_or_create_permission(
         access=m.Permission.Access.D | m.Permission.Access.A,
         entity_type=m.Permission.Entity.INTERPRETATION,
+        commit=commit,
     )
     permissions.append(interpretation_DA)
 
     section_CUD = get_or_create_permission(
         access=m.Permission.Access.C | m.Permission.Access.U | m.Permission.Access.D,
         entity_type=m.Permission.Entity.SECTION,
+        commit=commit,
     )
     permissions.append(section_CUD)
 
     collection_CUD = get_or_create_permission(
         access=m.Permission.Access.C | m.Permission.Access.U | m.Permission.Access.D,
         entity_type=m.Permission.Entity.COLLECTION,
+        commit=commit,
     )
     permissions.append(collection_CUD)
 
     book_U = get_or_create_permission(
         access=m.Permission.Access.U,
         entity_type=m.Permission.Entity.BOOK,
+        commit=commit,
     )
     permissions.append(book_U)
 
@@ -68,5 +79,5 @@ def create_editor_group(book_id: int):
         log(log.INFO, "Add permission [%d] to group[%d]", permission.id, group.id)
         m.PermissionAccessGroups(
             permission_id=permission.id, access_group_id=group.id
-        ).save()
+        ).save(commit)
     return group
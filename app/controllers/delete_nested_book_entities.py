@@ -1,71 +1,105 @@
-from app import models as m
+from sqlalchemy import select, update
+
+from app import models as m, db
 from app.logger import log
 
+# Every function marks the whole subtree of the entity deleted with a few
+# UPDATE ... WHERE id IN (subquery) statements. The entity itself is marked
+# by the caller. Entities already loaded into the session are synchronized.
 
-def delete_nested_book_entities(book: m.Book):
-    for version in book.versions:
-        version: m.BookVersion
-        version.is_deleted = True
-        log(log.INFO, "Delete version [%s]", version.id)
-        version.save(False)
 
-        delete_nested_version_entities(version)
+def _mark_deleted(model, condition) -> int:
+    result = db.session.execute(
+        update(model)
+        .where(condition, model.is_deleted.is_(False))
+        .values(is_deleted=True)
+        .execution_options(synchronize_session="fetch")
+    )
+    return result.rowcount
 
 
-def delete_nested_version_entities(book_version: m.BookVersion):
-    root_collection: m.Collection = book_version.root_collection
-    root_collection.is_deleted = True
-    log(log.INFO, "Delete root collection [%s]", root_collection.id)
-    root_collection.save(False)
+def _delete_comments(condition) -> int:
+    thread = select(m.Comment.id).where(condition).cte("comment_thread", recursive=True)
+    thread = thread.union_all(
+        select(m.Comment.id).where(m.Comment.parent_id == thread.c.id)
+    )
+    return _mark_deleted(m.Comment, m.Comment.id.in_(select(thread.c.id)))
 
-    for collection in root_collection.children:
-        collection: m.Collection
-        collection.is_deleted = True
-        log(log.INFO, "Delete collection [%s]", collection.id)
-        collection.save(False)
 
-        delete_nested_collection_entities(collection)
+def _delete_interpretations(condition) -> int:
+    interpretation_ids = select(m.Interpretation.id).where(condition)
+    comments = _delete_comments(m.Comment.interpretation_id.in_(interpretation_ids))
+    log(log.INFO, "Deleted [%d] comments", comments)
+    return _mark_deleted(m.Interpretation, condition)
 
 
-def delete_nested_collection_entities(collection: m.Collection):
-    for sub_collection in collection.children:
-        collection.is_deleted = True
-        collection.save(False)
-        sub_collection.is_deleted = True
-        sub_collection.save(False)
-        delete_nested_collection_entities(sub_collection)
-    for section in collection.sections:
-        section: m.Section
-        section.is_deleted = True
-        log(log.INFO, "Delete section [%s]", section.id)
-        section.save(False)
+def _delete_sections(condition) -> int:
+    section_ids = select(m.Section.id).where(condition)
+    interpretations = _delete_interpretations(
+        m.Interpretation.section_id.in_(section_ids)
+    )
+    log(log.INFO, "Deleted [%d] interpretations", interpretations)
+    return _mark_deleted(m.Section, condition)
 
-        delete_nested_section_entities(section)
 
+def delete_nested_book_entities(book: m.Book):
+    version_ids = select(m.BookVersion.id).where(m.BookVersion.book_id == book.id)
+    log(log.INFO, "Delete versions of book [%s]", book.id)
+    sections = _delete_sections(m.Section.version_id.in_(version_ids))
+    log(log.INFO, "Deleted [%d] sections", sections)
+    collections = _mark_deleted(m.Collection, m.Collection.version_id.in_(version_ids))
+    log(log.INFO, "Deleted [%d] collections", collections)
+    _mark_deleted(m.BookVersion, m.BookVersion.book_id == book.id)
 
-def delete_nested_section_entities(section: m.Section):
-    for interpretation in section.interpretations:
-        interpretation: m.Interpretation
-        interpretation.is_deleted = True
-        log(log.INFO, "Delete interpretation [%s]", interpretation.id)
-        interpretation.save(False)
 
-        delete_nested_interpretation_entities(interpretation)
+def delete_nested_version_entities(book_version: m.BookVersion):
+    log(log.INFO, "Delete content of version [%s]", book_version.id)
+    sections = _delete_sections(m.Section.version_id == book_version.id)
+    log(log.INFO, "Deleted [%d] sections", sections)
+    collections = _mark_deleted(
+        m.Collection, m.Collection.version_id == book_version.id
+    )
+    log(log.INFO, "Deleted [%d] collections", collections)
+
+
+def collection_subtree_ids(collection_id: int):
+    """Ids of all sub collections of the collection, at any depth"""
+    subtree = (
+        select(m.Collection.id)
+        .where(m.Collection.parent_id == collection_id)
+        .cte("collection_subtree", recursive=True)
+    )
+    subtree = subtree.union_all(
+        select(m.Collection.id).where(m.Collection.parent_id == subtree.c.id)
+    )
+    return select(subtree.c.id)
+
 
+def delete_nested_collection_entities(collection: m.Collection):
+    subtree_ids = collection_subtree_ids(collection.id)
+    log(log.INFO, "Delete sub collections of collection [%s]", collection.id)
+    sections = _delete_sections(
+        (m.Section.collection_id == collection.id)
+        | m.Section.collection_id.in_(subtree_ids)
+    )
+    log(log.INFO, "Deleted [%d] sections", sections)
+    collections = _mark_deleted(m.Collection, m.Collection.id.in_(subtree_ids))
+    log(log.INFO, "Deleted [%d] collections", collections)
 
-def delete_nested_interpretation_entities(interpretation: m.Interpretation):
-    for comment in interpretation.comments:
-        comment: m.Comment
-        comment.is_deleted = True
-        log(log.INFO, "Delete comment [%s]", comment.id)
-        comment.save(False)
 
-        delete_nested_comment_entities(comment)
+def delete_nested_section_entities(section: m.Section):
+    log(log.INFO, "Delete interpretations of section [%s]", section.id)
+    interpretations = _delete_interpretations(m.Interpretation.section_id == section.id)
+    log(log.INFO, "Deleted [%d] interpretations", interpretations)
+
+
+def delete_nested_interpretation_entities(interpretation: m.Interpretation):
+    log(log.INFO, "Delete comments of interpretation [%s]", interpretation.id)
+    comments = _delete_comments(m.Comment.interpretation_id == interpretation.id)
+    log(log.INFO, "Deleted [%d] comments", comments)
 
 
 def delete_nested_comment_entities(comment: m.Comment):
-    for child in comment.children:
-        child: m.Comment
-        child.is_deleted = True
-        log(log.INFO, "Delete sub comment [%s]", comment.id)
-        child.save(False)
+    log(log.INFO, "Delete replies of comment [%s]", comment.id)
+    comments = _delete_comments(m.Comment.parent_id == comment.id)
+    log(log.INFO, "Deleted [%d] sub comments", comments)
@@ -6,3 +6,10 @@ def create_error_flash(form):
         field_label = form._fields[field].label.text
         for error in errors:
             flash(error.replace("Field", field_label), "danger")
+
+
+def create_job_flash(job, started_message: str):
+    if job.status == job.Statuses.DONE:
+        flash("Success!", "success")
+    else:
+        flash(started_message, "success")
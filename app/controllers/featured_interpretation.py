@@ -0,0 +1,81 @@
+from app import models as m, db
+from app.logger import log
+
+
+def choose_featured_interpretation(
+    interpretations: list[m.Interpretation],
+) -> m.Interpretation | None:
+    """Approved interpretation, otherwise the most voted one, otherwise the oldest"""
+    if not interpretations:
+        return None
+
+    for interpretation in interpretations:
+        if interpretation.approved:
+            return interpretation
+
+    voted = [
+        interpretation
+        for interpretation in interpretations
+        if interpretation.up_votes or interpretation.down_votes
+    ]
+    if voted:
+        return max(voted, key=lambda item: (item.up_votes + item.down_votes, -item.id))
+
+    return min(interpretations, key=lambda item: (item.created_at, item.id))
+
+
+def update_featured_interpretation(section: m.Section):
+    """Recalculate section.featured_interpretation_id. Does not commit"""
+    interpretations: list[m.Interpretation] = m.Interpretation.query.filter_by(
+        section_id=section.id, is_deleted=False
+    ).all()
+    featured = choose_featured_interpretation(interpretations)
+    featured_id = featured.id if featured else None
+    if section.featured_interpretation_id != featured_id:
+        log(
+            log.INFO,
+            "Set featured interpretation of section [%s] to [%s]",
+            section,
+            featured_id,
+        )
+        section.featured_interpretation_id = featured_id
+        db.session.add(section)
+
+
+def backfill_featured_interpretations(batch_size: int = 1000) -> int:
+    """Fill featured_interpretation_id for all sections. Returns number of sections"""
+    last_id = 0
+    total = 0
+    while True:
+        sections: list[m.Section] = (
+            m.Section.query.filter(m.Section.id > last_id)
+            .order_by(m.Section.id)
+            .limit(batch_size)
+            .all()
+        )
+        if not sections:
+            break
+
+        section_ids = [section.id for section in sections]
+        interpretations: list[m.Interpretation] = m.Interpretation.query.filter(
+            m.Interpretation.section_id.in_(section_ids),
+            m.Interpretation.is_deleted.is_(False),
+        ).all()
+        interpretations_by_section: dict[int, list[m.Interpretation]] = {}
+        for interpretation in interpretations:
+            interpretations_by_section.setdefault(interpretation.section_id, []).append(
+                interpretation
+            )
+
+        for section in sections:
+            featured = choose_featured_interpretation(
+                interpretations_by_section.get(section.id, [])
+            )
+            section.featured_interpretation_id = featured.id if featured else None
+        db.session.commit()
+
+        total += len(sections)
+        last_id = section_ids[-1]
+        log(log.INFO, "Backfilled featured interpretations of [%d] sections", total)
+
+    return total
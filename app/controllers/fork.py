@@ -1,96 +1,148 @@
-from flask_login import current_user
+from typing import Callable
 
-from app import models as m
+from app import models as m, db
 from app.logger import log
 from app.controllers.create_access_groups import (
     create_editor_group,
     create_moderator_group,
 )
-from .recursive_copy_functions import recursive_copy_collection, copy_book_version
-
-
-def fork_book(book: m.Book, label: str, about: str):
+from app.controllers.tags import add_tag_usage
+from .recursive_copy_functions import copy_book_version
+from .version_copy import copy_version_content
+
+
+def fork_book(
+    book: m.Book,
+    label: str,
+    about: str,
+    user: m.User,
+    on_progress: Callable[[int, int], None] = None,
+    on_create: Callable[[m.Book], None] = None,
+):
     book_active_version: m.BookVersion = book.active_version
-    book_root_collection: m.Collection = book_active_version.root_collection
+    book_versions: list[m.BookVersion] = book.actual_versions
 
     book_copy: m.Book = m.Book(
-        label=label, about=about, user_id=current_user.id, original_book_id=book.id
+        label=label, about=about, user_id=user.id, original_book_id=book.id
     )
+    # the fork is one transaction, failed copy leaves nothing behind
     log(log.INFO, "Create fork of book [%s]", book)
-    book_copy.save()
+    book_copy.save(False)
+    db.session.flush()
 
     version = m.BookVersion(
-        semver="Active", book_id=book_copy.id, is_active=True
-    ).save()
+        semver="Active",
+        book_id=book_copy.id,
+        is_active=True,
+    ).save(False, user)
     log(log.INFO, "Create new version for book [%s]", book)
-    version.save()
+    db.session.flush()
+    book_copy.active_version_id = version.id
 
     root_collection = m.Collection(
         label="Root Collection", version_id=version.id, is_root=True
-    ).save()
+    ).save(False)
+    db.session.flush()
 
     # access groups
-    editor_access_group = create_editor_group(book_id=book_copy.id)
-    moderator_access_group = create_moderator_group(book_id=book_copy.id)
+    editor_access_group = create_editor_group(book_id=book_copy.id, commit=False)
+    moderator_access_group = create_moderator_group(book_id=book_copy.id, commit=False)
     access_groups = [editor_access_group, moderator_access_group]
 
     for access_group in access_groups:
-        m.BookAccessGroups(book_id=book_copy.id, access_group_id=access_group.id).save()
+        m.BookAccessGroups(
+            book_id=book_copy.id,
+            access_group_id=access_group.id,
+        ).save(False)
         m.CollectionAccessGroups(
             collection_id=root_collection.id, access_group_id=access_group.id
-        ).save()
+        ).save(False)
     # -------------
 
     # tags
     for tag in book.tags:
-        m.BookTags(tag_id=tag.id, book_id=book_copy.id).save()
+        m.BookTags(tag_id=tag.id, book_id=book_copy.id).save(False)
+    add_tag_usage(m.Tag.books_count, [tag.id for tag in book.tags])
     # ----
 
-    for collection in book_root_collection.active_children:
-        recursive_copy_collection(
-            collection, root_collection.id, version.id, False, book=book_copy
-        )
-    for version in book.actual_versions:
-        copy_book_version(book_copy, version)
+    copy_version_content(
+        book_active_version,
+        version.id,
+        root_collection.id,
+        [access_group.id for access_group in access_groups],
+        add_copy_of=False,
+    )
+    db.session.commit()
+    if on_create:
+        on_create(book_copy)
+    if on_progress:
+        on_progress(1, len(book_versions) + 1)
+    for done, book_version in enumerate(book_versions, start=2):
+        copy_book_version(book_copy, book_version, user)
+        if on_progress:
+            on_progress(done, len(book_versions) + 1)
 
     return version
 
 
-def fork_version(book: m.Book, label: str, about: str, version: m.BookVersion):
+def fork_version(
+    book: m.Book,
+    label: str,
+    about: str,
+    version: m.BookVersion,
+    user: m.User,
+    on_create: Callable[[m.Book], None] = None,
+):
     book_copy: m.Book = m.Book(
-        label=label, about=about, user_id=current_user.id, original_book_id=book.id
+        label=label, about=about, user_id=user.id, original_book_id=book.id
     )
+    # the fork is one transaction, failed copy leaves nothing behind
     log(log.INFO, "Create fork of book [%s]", book)
-    book_copy.save()
+    book_copy.save(False)
+    db.session.flush()
 
     active_version = m.BookVersion(
         semver="Active", book_id=book_copy.id, is_active=True
-    ).save()
+    ).save(False, user)
     log(log.INFO, "Create new version for book [%s]", book)
-    active_version.save()
+    db.session.flush()
+    book_copy.active_version_id = active_version.id
 
     root_collection = m.Collection(
         label="Root Collection", version_id=active_version.id, is_root=True
-    ).save()
+    ).save(False)
+    db.session.flush()
 
     # access groups
-    editor_access_group = create_editor_group(book_id=book_copy.id)
-    moderator_access_group = create_moderator_group(book_id=book_copy.id)
+    editor_access_group = create_editor_group(book_id=book_copy.id, commit=False)
+    moderator_access_group = create_moderator_group(book_id=book_copy.id, commit=False)
     access_groups = [editor_access_group, moderator_access_group]
 
     for access_group in access_groups:
-        m.BookAccessGroups(book_id=book_copy.id, access_group_id=access_group.id).save()
+        m.BookAccessGroups(
+            book_id=book_copy.id,
+            access_group_id=access_group.id,
+        ).save(False)
         m.CollectionAccessGroups(
             collection_id=root_collection.id, access_group_id=access_group.id
-        ).save()
+        ).save(False)
     # -------------
 
     # tags
     for tag in book.tags:
-        m.BookTags(tag_id=tag.id, book_id=book_copy.id).save()
+        m.BookTags(tag_id=tag.id, book_id=book_copy.id).save(False)
+    add_tag_usage(m.Tag.books_count, [tag.id for tag in book.tags])
     # ----
 
-    for collection in version.root_collection.active_children:
-        recursive_copy_collection(
-            collection, root_collection.id, active_version.id, False, book=book_copy
-        )
+    copy_version_content(
+        version,
+        active_version.id,
+        root_collection.id,
+        [access_group.id for access_group in access_groups],
+        add_copy_of=False,
+    )
+    db.session.commit()
+    if on_create:
+        on_create(book_copy)
+
+    return active_version
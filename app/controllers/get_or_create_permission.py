@@ -1,8 +1,10 @@
-from app import models as m
+from app import models as m, db
 from app.logger import log
 
 
-def get_or_create_permission(access: int, entity_type: m.Permission.Entity):
+def get_or_create_permission(
+    access: int, entity_type: m.Permission.Entity, commit: bool = True
+):
     permission: m.Permission = m.Permission.query.filter_by(
         access=access, entity_type=entity_type
     ).first()
@@ -10,5 +12,7 @@ def get_or_create_permission(access: int, entity_type: m.Permission.Entity):
         log(log.INFO, "Create permission [%d] for entity [%s]", access, entity_type)
         permission: m.Permission = m.Permission(
             access=access, entity_type=entity_type
-        ).save()
+        ).save(commit)
+        if not commit:
+            db.session.flush()
     return permission
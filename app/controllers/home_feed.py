@@ -0,0 +1,86 @@
+import sqlalchemy as sa
+
+from app import models as m, db
+from app.controllers.loader_profiles import with_profile
+from app.controllers.pagination import Page, keyset_page
+
+# Home page feed of interpretations. Every ordering is a (sort key, id) pair
+# served by ix_interpretations_active_<sort key>_id, pages are read by keyset
+# cursors, so any page costs the same as the first one. RANKED_ORDERINGS have
+# no sort key column, they are read from the ranking snapshots of
+# app/controllers/rankings.py by position and end after RANKINGS_SIZE items
+
+FEED_ORDERINGS = {
+    "recent": m.Interpretation.created_at,
+    "upvoted": m.Interpretation.score,
+    "commented": m.Interpretation.comments_count,
+}
+DEFAULT_ORDERING = "recent"
+RANKED_ORDERINGS = {
+    "trending": m.InterpretationRanking.Orderings.TRENDING,
+}
+
+
+def ranked_feed(
+    ordering: m.InterpretationRanking.Orderings, profile: str
+) -> Page | None:
+    """Page of the ranking snapshot of the ordering, the top first. None before
+    the first refresh. Interpretations deleted since the refresh are skipped"""
+    ranking = m.InterpretationRanking
+    query = (
+        db.session.query(m.Interpretation, ranking.position)
+        .join(ranking, ranking.interpretation_id == m.Interpretation.id)
+        .filter(
+            ranking.ordering == ordering,
+            m.Interpretation.is_deleted.is_(False),
+        )
+    )
+    page = keyset_page(with_profile(query, profile), [ranking.position])
+    if not page.items and not db.session.scalar(
+        sa.select(sa.exists().where(ranking.ordering == ordering))
+    ):
+        return None
+    page.items = [interpretation for interpretation, _ in page.items]
+    return page
+
+
+def interpretation_feed(sort: str | None, profile: str) -> Page:
+    """Page of active interpretations, the biggest sort key first, loaded by
+    the loader profile. Ranked orderings are served as the recent feed until
+    their first snapshot"""
+    if sort in RANKED_ORDERINGS:
+        page = ranked_feed(RANKED_ORDERINGS[sort], profile)
+        if page:
+            return page
+    sort_key = FEED_ORDERINGS.get(sort, FEED_ORDERINGS[DEFAULT_ORDERING])
+    query = m.Interpretation.query.filter(m.Interpretation.is_deleted.is_(False))
+    query = with_profile(query, profile)
+    return keyset_page(query, [sort_key, m.Interpretation.id], descending=True)
+
+
+def add_comments_count(interpretation_id: int, delta: int):
+    """Move comments_count of the interpretation by delta. Does not commit"""
+    db.session.execute(
+        sa.update(m.Interpretation)
+        .where(m.Interpretation.id == interpretation_id)
+        .values(comments_count=m.Interpretation.comments_count + delta)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def recount_comments(condition=sa.true()):
+    """Set comments_count of the interpretations matching condition from the
+    comments table. Does not commit"""
+    db.session.execute(
+        sa.update(m.Interpretation)
+        .where(condition)
+        .values(
+            comments_count=sa.select(sa.func.count(m.Comment.id))
+            .where(
+                m.Comment.interpretation_id == m.Interpretation.id,
+                m.Comment.is_deleted.is_(False),
+            )
+            .scalar_subquery()
+        )
+        .execution_options(synchronize_session=False)
+    )
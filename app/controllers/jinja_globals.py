@@ -7,6 +7,8 @@ from flask_login import current_user
 from sqlalchemy import func
 
 from app import models as m
+from app.controllers.book_tree import TreeNode
+from app.controllers.permission_resolver import PermissionResolver, get_book_id
 
 TAG_REGEX = re.compile(r"\[.*?\]")
 
@@ -63,15 +65,9 @@ def display_inline_elements(text: str):
 
 # Using: {{ build_qa_url(interpretation) }}
 def build_qa_url_using_interpretation(interpretation: m.Interpretation):
-    section: m.Section = interpretation.section
-    collection: m.Collection = section.collection
-    if collection.parent and not collection.parent.is_root:
-        collection: m.Collection = collection.parent
-    book: m.Book = section.version.book
-
     url = url_for(
         "book.qa_view",
-        book_id=book.id,
+        book_id=interpretation.book_id,
         interpretation_id=interpretation.copy_of or interpretation.id,
     )
     return url
@@ -96,47 +92,18 @@ def recursive_render(
 
 # Using: {{ has_permission(entity=book, required_permissions=[Access.create]) }}
 def has_permission(
-    entity: m.Book | m.Collection | m.Section | m.Interpretation,
+    entity: m.Book | m.Collection | m.Section | m.Interpretation | TreeNode,
     required_permissions: m.Permission.Access | list[m.Permission.Access],
     entity_type: m.Permission.Entity = None,
 ) -> bool:
     if not current_user.is_authenticated:
         return False
 
-    # check if user is owner of book
-    match type(entity):
-        case m.Book:
-            if entity.user_id == current_user.id:
-                return True
-        case m.Collection | m.Section:
-            if entity.version.book.user_id == current_user.id:
-                return True
-        case m.Interpretation:
-            if entity.book.user_id == current_user.id:
-                return True
-        case _:
-            ...
+    if isinstance(entity, TreeNode):
+        entity = entity.model
 
     if type(required_permissions) == m.Permission.Access:
         required_permissions = [required_permissions]
 
-    access_groups: list[m.AccessGroup] = list(
-        set(entity.access_groups).intersection(current_user.access_groups)
-    )
-
-    if not access_groups:
-        return False
-
-    if not entity_type:
-        entity_type = m.Permission.Entity[type(entity).__name__.upper()]
-
-    for access_group in access_groups:
-        for permission in access_group.permissions:
-            permission: m.Permission
-            if permission.entity_type != entity_type:
-                continue
-            for required_permission in required_permissions:
-                if permission.access & required_permission:
-                    return True
-
-    return False
+    resolver = PermissionResolver.get(get_book_id(entity))
+    return resolver.has_permission(entity, required_permissions, entity_type)
@@ -0,0 +1,285 @@
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from functools import partial
+
+from flask import current_app
+from flask_login import current_user
+from sqlalchemy import and_, or_, select, update
+
+from app import models as m, db
+from app.logger import log
+from app.controllers.fork import fork_book, fork_version
+from app.controllers.version import create_new_version
+from app.controllers.book_stats import recount_book_stats
+from app.controllers.rankings import refresh_rankings_if_due
+from app.controllers.search_index import index_book, index_version
+from app.controllers.delete_nested_book_entities import (
+    delete_nested_book_entities,
+    delete_nested_version_entities,
+)
+
+
+def start_job(kind: m.Job.Kinds, **payload) -> m.Job:
+    """Put the job of the current user into the queue.
+
+    With JOBS_RUN_INLINE the job is run right away inside the request
+    """
+    job = m.Job(kind=kind, payload=payload, user_id=current_user.id)
+    log(log.INFO, "Start job [%s] with [%s]", kind.name, payload)
+    job.save()
+    if current_app.config["JOBS_RUN_INLINE"] and claim_job(job.id, "inline"):
+        run_job(job)
+    return job
+
+
+def _claimable(stale_before: datetime):
+    # running job without heartbeat was left by a crashed worker
+    return or_(
+        and_(
+            m.Job.status == m.Job.Statuses.PENDING,
+            or_(m.Job.run_after.is_(None), m.Job.run_after <= datetime.now()),
+        ),
+        and_(
+            m.Job.status == m.Job.Statuses.RUNNING,
+            m.Job.heartbeat_at < stale_before,
+        ),
+    )
+
+
+def claim_job(job_id: int, worker: str) -> bool:
+    """Mark the job as running by the worker. Conditional update, so only one
+    of concurrent workers gets the job"""
+    now = datetime.now()
+    stale_before = now - timedelta(seconds=current_app.config["JOBS_LOCK_TIMEOUT"])
+    claimed = db.session.execute(
+        update(m.Job)
+        .where(m.Job.id == job_id, _claimable(stale_before))
+        .values(
+            status=m.Job.Statuses.RUNNING,
+            worker=worker,
+            attempts=m.Job.attempts + 1,
+            started_at=now,
+            heartbeat_at=now,
+        )
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    db.session.commit()
+    return bool(claimed)
+
+
+def next_job(worker: str) -> m.Job | None:
+    stale_before = datetime.now() - timedelta(
+        seconds=current_app.config["JOBS_LOCK_TIMEOUT"]
+    )
+    job_ids = db.session.scalars(
+        select(m.Job.id).where(_claimable(stale_before)).order_by(m.Job.id).limit(10)
+    ).all()
+    for job_id in job_ids:
+        if not claim_job(job_id, worker):
+            continue
+        job: m.Job = db.session.get(m.Job, job_id)
+        if job.attempts > current_app.config["JOBS_MAX_ATTEMPTS"]:
+            log(log.ERROR, "Job [%s] is out of attempts", job)
+            # the last attempt crashed, its leftover is not retried
+            discard = DISCARDS.get(job.kind)
+            if discard:
+                discard(job)
+            job.status = m.Job.Statuses.FAILED
+            job.finished_at = datetime.now()
+            db.session.commit()
+            continue
+        return job
+    return None
+
+
+def set_progress(job: m.Job, progress: int, total: int):
+    job.progress = progress
+    job.total = total
+    job.heartbeat_at = datetime.now()
+    log(log.INFO, "Job [%s] progress [%d/%d]", job.id, progress, total)
+    db.session.commit()
+
+
+def record_created(job: m.Job, key: str, obj: db.Model):
+    """Keep id of the object made by the attempt, so only it is discarded
+    when the attempt crashes or fails"""
+    job.result = {**(job.result or {}), key: obj.id}
+    db.session.commit()
+
+
+@contextmanager
+def heartbeat(job: m.Job):
+    """Beat from own thread and connection while the handler runs, long
+    copies without progress are not taken by other workers"""
+    engine = db.engine
+    interval = current_app.config["JOBS_HEARTBEAT_INTERVAL"]
+    stop = threading.Event()
+
+    def beat(job_id: int):
+        while not stop.wait(interval):
+            try:
+                with engine.begin() as conn:
+                    conn.execute(
+                        update(m.Job)
+                        .where(m.Job.id == job_id)
+                        .values(heartbeat_at=datetime.now())
+                    )
+            except Exception as e:
+                log(log.WARNING, "Job [%s] heartbeat failed: [%s]", job_id, e)
+
+    thread = threading.Thread(target=beat, args=(job.id,), daemon=True)
+    thread.start()
+    try:
+        yield
+    finally:
+        stop.set()
+        thread.join()
+
+
+def run_job(job: m.Job) -> m.Job:
+    log(log.INFO, "Run job [%s] attempt [%d]", job, job.attempts)
+    discard = DISCARDS.get(job.kind)
+    try:
+        if discard and job.attempts > 1:
+            discard(job)
+        with heartbeat(job):
+            result = HANDLERS[job.kind](job)
+    except Exception as e:
+        db.session.rollback()
+        log(log.ERROR, "Job [%s] failed: [%s]", job, e)
+        job.error = str(e)
+        if job.attempts < current_app.config["JOBS_MAX_ATTEMPTS"]:
+            job.status = m.Job.Statuses.PENDING
+            job.run_after = datetime.now() + timedelta(
+                seconds=current_app.config["JOBS_RETRY_DELAY"] * job.attempts
+            )
+        else:
+            job.status = m.Job.Statuses.FAILED
+            job.finished_at = datetime.now()
+            if discard:
+                discard(job)
+        db.session.commit()
+        return job
+
+    job.result = result
+    job.status = m.Job.Statuses.DONE
+    job.progress = job.total
+    job.finished_at = datetime.now()
+    db.session.commit()
+    log(log.INFO, "Job [%s] done: [%s]", job, result)
+    return job
+
+
+def work(worker: str, once: bool = False, poll_interval: float = 5.0) -> int:
+    """Run queued jobs one by one. Returns number of processed jobs.
+    Ranking snapshots are refreshed between the jobs when they are due"""
+    processed = 0
+    while True:
+        refresh_rankings_if_due()
+        job = next_job(worker)
+        if not job:
+            if once:
+                return processed
+            time.sleep(poll_interval)
+            continue
+
+        run_job(job)
+        processed += 1
+
+
+def _discard_forks(job: m.Job):
+    """Fork recorded by a crashed or failed attempt is its leftover"""
+    book_id = (job.result or {}).get("book_id")
+    fork: m.Book = db.session.get(m.Book, book_id) if book_id else None
+    if fork and not fork.is_deleted:
+        log(log.INFO, "Discard fork [%s] of job [%s]", fork, job)
+        fork.is_deleted = True
+        delete_nested_book_entities(fork)
+    job.result = None
+    db.session.commit()
+
+
+def _fork_book(job: m.Job) -> dict:
+    book: m.Book = db.session.get(m.Book, job.payload["book_id"])
+    version = fork_book(
+        book,
+        job.payload["label"],
+        job.payload["about"],
+        job.user,
+        on_progress=partial(set_progress, job),
+        on_create=partial(record_created, job, "book_id"),
+    )
+    recount_book_stats(version.book_id)
+    index_book(version.book, nested=True)
+    return {"book_id": version.book_id}
+
+
+def _fork_version(job: m.Job) -> dict:
+    book: m.Book = db.session.get(m.Book, job.payload["book_id"])
+    version: m.BookVersion = db.session.get(m.BookVersion, job.payload["version_id"])
+    active_version = fork_version(
+        book,
+        job.payload["label"],
+        job.payload["about"],
+        version,
+        job.user,
+        on_create=partial(record_created, job, "book_id"),
+    )
+    recount_book_stats(active_version.book_id)
+    index_book(active_version.book, nested=True)
+    return {"book_id": active_version.book_id}
+
+
+def _discard_versions(job: m.Job):
+    """Version recorded by a crashed or failed attempt is its leftover"""
+    version_id = (job.result or {}).get("version_id")
+    version: m.BookVersion = (
+        db.session.get(m.BookVersion, version_id) if version_id else None
+    )
+    if version and not version.is_deleted:
+        log(log.INFO, "Discard version [%s] of job [%s]", version, job)
+        version.is_deleted = True
+        delete_nested_version_entities(version)
+        recount_book_stats(version.book_id)
+    job.result = None
+    db.session.commit()
+
+
+def _create_version(job: m.Job) -> dict:
+    book: m.Book = db.session.get(m.Book, job.payload["book_id"])
+    version = create_new_version(
+        book,
+        job.payload["semver"],
+        job.user,
+        on_create=partial(record_created, job, "version_id"),
+    )
+    recount_book_stats(book.id)
+    index_version(version)
+    return {"book_id": book.id, "version_id": version.id}
+
+
+def _delete_book(job: m.Job) -> dict:
+    # deleted flags are set again on retry, nothing to clean up
+    book: m.Book = db.session.get(m.Book, job.payload["book_id"])
+    book.is_deleted = True
+    delete_nested_book_entities(book)
+    db.session.commit()
+    index_book(book, nested=True)
+    return {"book_id": book.id}
+
+
+HANDLERS = {
+    m.Job.Kinds.FORK_BOOK: _fork_book,
+    m.Job.Kinds.FORK_VERSION: _fork_version,
+    m.Job.Kinds.CREATE_VERSION: _create_version,
+    m.Job.Kinds.DELETE_BOOK: _delete_book,
+}
+
+# undo partial result of the previous attempt, jobs without it are idempotent
+DISCARDS = {
+    m.Job.Kinds.FORK_BOOK: _discard_forks,
+    m.Job.Kinds.FORK_VERSION: _discard_forks,
+    m.Job.Kinds.CREATE_VERSION: _discard_versions,
+}
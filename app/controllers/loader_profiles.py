@@ -0,0 +1,93 @@
+import sqlalchemy as sa
+from flask_login import current_user
+from sqlalchemy.orm import Query, defer, selectinload, with_expression
+
+from app import models as m
+
+# Loader profiles of the listing templates. A listing view declares the
+# profile of the items it renders, the profile loads everything the template
+# reads in a fixed number of queries per page instead of lazy loads per item.
+# Relationships are selectin loaded and subqueries correlate only the item
+# table, so profiles work with grouped and joined listing queries
+
+
+def _current_user_id() -> int | None:
+    return current_user.id if current_user.is_authenticated else None
+
+
+def book_card() -> list:
+    """book/components/book_list_item.html"""
+    return [
+        defer(m.Book.about),
+        selectinload(m.Book.owner),
+        selectinload(m.Book.original_book),
+        selectinload(m.Book.stats),
+        selectinload(m.Book.active_version).selectinload(m.BookVersion.updated_by_user),
+        selectinload(m.Book.contributors).selectinload(m.BookContributor.user),
+        with_expression(
+            m.Book.card_has_star,
+            sa.exists()
+            .where(
+                m.BookStar.book_id == m.Book.id,
+                m.BookStar.user_id == _current_user_id(),
+            )
+            .correlate(m.Book),
+        ),
+        with_expression(
+            m.Book.card_interpretations_count,
+            sa.select(sa.func.count(m.Interpretation.id))
+            .where(
+                m.Interpretation.version_id == m.Book.active_version_id,
+                m.Interpretation.is_deleted.is_(False),
+            )
+            .correlate(m.Book)
+            .scalar_subquery(),
+        ),
+        with_expression(
+            m.Book.card_approved_comments_count,
+            sa.select(sa.func.count(m.Comment.id))
+            .where(
+                m.Comment.version_id == m.Book.active_version_id,
+                m.Comment.approved.is_(True),
+                m.Comment.is_deleted.is_(False),
+            )
+            .correlate(m.Book)
+            .scalar_subquery(),
+        ),
+    ]
+
+
+def interpretation_card() -> list:
+    """book/components/interpretation_list_item.html with its breadcrumbs,
+    the collections above the section are loaded up to the root one"""
+    section = selectinload(m.Interpretation.section)
+    return [
+        defer(m.Interpretation.plain_text),
+        selectinload(m.Interpretation.user),
+        selectinload(m.Interpretation.book).selectinload(m.Book.owner),
+        section.selectinload(m.Section.version),
+        section.selectinload(m.Section.collection)
+        .selectinload(m.Collection.parent)
+        .selectinload(m.Collection.parent),
+        with_expression(
+            m.Interpretation.card_current_user_vote,
+            sa.select(m.InterpretationVote.positive)
+            .where(
+                m.InterpretationVote.interpretation_id == m.Interpretation.id,
+                m.InterpretationVote.user_id == _current_user_id(),
+            )
+            .correlate(m.Interpretation)
+            .scalar_subquery(),
+        ),
+    ]
+
+
+LOADER_PROFILES = {
+    "book_card": book_card,
+    "interpretation_card": interpretation_card,
+}
+
+
+def with_profile(query: Query, profile: str) -> Query:
+    """The query loading its items for the template of the profile"""
+    return query.options(*LOADER_PROFILES[profile]())
@@ -0,0 +1,53 @@
+from sqlalchemy import select, update
+
+from app import models as m, db
+from app.logger import log
+from .delete_nested_book_entities import collection_subtree_ids
+
+
+def _update(model, condition, **values):
+    db.session.execute(
+        update(model)
+        .where(condition)
+        .values(**values)
+        .execution_options(synchronize_session="fetch")
+    )
+
+
+def _move_sections(condition, version: m.BookVersion):
+    """Keep denormalized version_id and book_id of the sections content in sync"""
+    interpretation_ids = select(m.Interpretation.id).where(
+        m.Interpretation.section_id.in_(select(m.Section.id).where(condition))
+    )
+    values = dict(version_id=version.id, book_id=version.book_id)
+    _update(m.Comment, m.Comment.interpretation_id.in_(interpretation_ids), **values)
+    _update(
+        m.Interpretation,
+        m.Interpretation.section_id.in_(select(m.Section.id).where(condition)),
+        **values,
+    )
+    _update(m.Section, condition, version_id=version.id)
+
+
+def move_section_to_version(section: m.Section, version: m.BookVersion):
+    if section.version_id == version.id:
+        return
+    log(log.INFO, "Move section [%s] to version [%s]", section, version)
+    _move_sections(m.Section.id == section.id, version)
+
+
+def move_collection_to_version(collection: m.Collection, version: m.BookVersion):
+    if collection.version_id == version.id:
+        return
+    log(log.INFO, "Move collection [%s] to version [%s]", collection, version)
+    subtree_ids = collection_subtree_ids(collection.id)
+    _move_sections(
+        (m.Section.collection_id == collection.id)
+        | m.Section.collection_id.in_(subtree_ids),
+        version,
+    )
+    _update(
+        m.Collection,
+        (m.Collection.id == collection.id) | m.Collection.id.in_(subtree_ids),
+        version_id=version.id,
+    )
@@ -95,7 +95,7 @@ def interpretation_notification(
     link = None
     interpretation: m.Interpretation = db.session.get(m.Interpretation, entity_id)
     section: m.Section = db.session.get(m.Section, interpretation.section_id)
-    book: m.Book = db.session.get(m.Book, interpretation.book.id)
+    book: m.Book = db.session.get(m.Book, interpretation.book_id)
     match action:
         case m.Notification.Actions.CREATE:
             text = f"New interpretation to {section.label} on {book.label}"
@@ -186,7 +186,7 @@ def comment_notification(action: m.Notification.Actions, entity_id: int, user_id
         m.Interpretation, comment.interpretation_id
     )
     section: m.Section = db.session.get(m.Section, interpretation.section_id)
-    book: m.Book = db.session.get(m.Book, comment.book.id)
+    book: m.Book = db.session.get(m.Book, comment.book_id)
     match action:
         case m.Notification.Actions.CREATE:
             text = "New comment to your interpretation"
@@ -209,14 +209,14 @@ def comment_notification(action: m.Notification.Actions, entity_id: int, user_id
                 text = f"Your comment has been approved for {section.label} on {book.label}"
                 link = url_for(
                     "book.qa_view",
-                    book_id=comment.book.id,
+                    book_id=comment.book_id,
                     interpretation_id=comment.interpretation_id,
                 )
             elif user_id == book.owner.id:
                 text = f"{current_user.username} approved an comment for {section.label} on {book.label}"
                 link = url_for(
                     "book.qa_view",
-                    book_id=comment.book.id,
+                    book_id=comment.book_id,
                     interpretation_id=comment.interpretation_id,
                 )
             else:
@@ -1,6 +1,15 @@
+import base64
+import json
+from dataclasses import dataclass
+from datetime import datetime
+
+import sqlalchemy as sa
 from flask import request
 from flask import current_app as app
-from app import schema as s
+from sqlalchemy.orm import Query
+
+from app import schema as s, db
+from app.logger import log
 
 
 def create_pagination(total: int, page_size: int = 0) -> s.Pagination:
@@ -34,3 +43,162 @@ def create_pagination(total: int, page_size: int = 0) -> s.Pagination:
         skip=(page - 1) * page_size,
         pages_for_links=pages_for_links,
     )
+
+
+@dataclass
+class Page:
+    """Items of the current page. Iterable with total like flask_sqlalchemy
+    Pagination, so templates work with both"""
+
+    items: list
+    total: int | None  # None when not counted, see keyset_page
+    next_cursor: str | None = None  # keyset mode only
+    prev_cursor: str | None = None  # keyset_page only
+
+    def __iter__(self):
+        return iter(self.items)
+
+
+def estimated_count(query: Query) -> int:
+    """Rows of the query by the planner estimate, without running it"""
+    connection = db.session.connection()
+    compiled = query.statement.compile(
+        dialect=db.engine.dialect, compile_kwargs={"render_postcompile": True}
+    )
+    plan = connection.exec_driver_sql(
+        f"EXPLAIN (FORMAT JSON) {compiled.string}", compiled.params
+    ).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def count_query(query: Query, estimate: bool = False) -> int:
+    if estimate and db.engine.dialect.name == "postgresql":
+        rows = estimated_count(query)
+        if rows >= app.config["PAGINATION_ESTIMATE_OVER"]:
+            log(log.INFO, "Estimated count [%d]", rows)
+            return rows
+    return query.order_by(None).count()
+
+
+def encode_cursor(values: list) -> str:
+    return base64.urlsafe_b64encode(json.dumps(values, default=str).encode()).decode()
+
+
+def decode_cursor(cursor: str, keys: list) -> list | None:
+    """Values of the keys from the cursor, None for a broken cursor"""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if not isinstance(values, list) or len(values) != len(keys):
+            raise ValueError("wrong number of values")
+        return [
+            datetime.fromisoformat(value)
+            if isinstance(key.type, sa.DateTime)
+            else value
+            for key, value in zip(keys, values)
+        ]
+    except (ValueError, TypeError) as e:
+        log(log.WARNING, "Wrong cursor [%s]: [%s]", cursor, e)
+        return None
+
+
+def _keyset_order(keyset: list, descending: bool) -> list:
+    return [key.desc() if descending else key.asc() for key in keyset]
+
+
+def _keyset_after(keyset: list, values: list, descending: bool):
+    """Rows following the values in the order of the keyset"""
+    position = sa.tuple_(*keyset)
+    after = sa.tuple_(
+        *[sa.literal(value, key.type) for key, value in zip(keyset, values)]
+    )
+    return position < after if descending else position > after
+
+
+def _cursor_of(item, keyset: list) -> str:
+    return encode_cursor([getattr(item, key.key) for key in keyset])
+
+
+def paginate(
+    query: Query,
+    page_size: int = 0,
+    total: int | None = None,
+    estimate: bool = False,
+    keyset: list | None = None,
+    descending: bool = False,
+) -> tuple[s.Pagination, Page]:
+    """Pagination and items of the current page. The query is counted once,
+    not at all with known total.
+
+    estimate - count big results by the planner estimate
+    keyset - columns of a unique order of the query. With `cursor` request
+    argument the page is read right after the cursor instead of OFFSET,
+    every page gives the cursor of the next one
+    """
+    if total is None:
+        total = count_query(query, estimate)
+    pagination = create_pagination(total, page_size)
+    if not keyset:
+        items = query.limit(pagination.per_page).offset(pagination.skip).all()
+        return pagination, Page(items, total)
+
+    query = query.order_by(None).order_by(*_keyset_order(keyset, descending))
+    cursor = request.args.get("cursor", type=str, default="")
+    values = decode_cursor(cursor, keyset) if cursor else None
+    if values:
+        query = query.filter(_keyset_after(keyset, values, descending))
+    else:
+        query = query.offset(pagination.skip)
+
+    items = query.limit(pagination.per_page + 1).all()
+    next_cursor = None
+    if len(items) > pagination.per_page:
+        items = items[: pagination.per_page]
+        next_cursor = _cursor_of(items[-1], keyset)
+    return pagination, Page(items, total, next_cursor)
+
+
+def keyset_page(
+    query: Query, keyset: list, page_size: int = 0, descending: bool = False
+) -> Page:
+    """Page of the query in the order of the keyset, without OFFSET and
+    without counting, so every page costs one indexed range scan.
+
+    `cursor` request argument reads the page after it, `before` - the page
+    before it. The page gives cursors of its neighbours, None at the ends
+    """
+    page_size = page_size or app.config["DEFAULT_PAGE_SIZE"]
+    query = query.order_by(None)
+    after = request.args.get("cursor", type=str, default="")
+    before = request.args.get("before", type=str, default="")
+    after_values = decode_cursor(after, keyset) if after else None
+    before_values = decode_cursor(before, keyset) if before else None
+
+    if before_values:
+        # read backwards from the cursor and turn the rows around
+        items = (
+            query.filter(_keyset_after(keyset, before_values, not descending))
+            .order_by(*_keyset_order(keyset, not descending))
+            .limit(page_size + 1)
+            .all()
+        )
+        has_prev, has_next = len(items) > page_size, True
+        items = items[:page_size][::-1]
+    else:
+        if after_values:
+            query = query.filter(_keyset_after(keyset, after_values, descending))
+        items = (
+            query.order_by(*_keyset_order(keyset, descending))
+            .limit(page_size + 1)
+            .all()
+        )
+        has_prev, has_next = bool(after_values), len(items) > page_size
+        items = items[:page_size]
+
+    return Page(
+        items,
+        None,
+        next_cursor=_cursor_of(items[-1], keyset) if items and has_next else None,
+        prev_cursor=_cursor_of(items[0], keyset) if items and has_prev else None,
+    )
@@ -0,0 +1,170 @@
+from flask import g, has_app_context
+from flask_login import current_user
+from sqlalchemy import event, union_all, select, literal
+
+from app import models as m, db
+from app.logger import log
+
+Entity = m.Book | m.Collection | m.Section | m.Interpretation
+
+# entity model -> (join table model, entity id field)
+ENTITY_ACCESS_GROUPS = {
+    m.Book: (m.BookAccessGroups, "book_id"),
+    m.Collection: (m.CollectionAccessGroups, "collection_id"),
+    m.Section: (m.SectionAccessGroups, "section_id"),
+    m.Interpretation: (m.InterpretationAccessGroups, "interpretation_id"),
+}
+
+
+class PermissionResolver:
+    """Effective access of the current user inside one book
+
+    Loads user access groups of the book with their permissions and the entities
+    those groups are attached to in two queries. Every check after that is answered
+    from memory. Cached per request:
+        resolver = PermissionResolver.get(book_id)
+        resolver.has_permission(collection, [m.Permission.Access.U])
+    """
+
+    def __init__(self, book_id: int, user_id: int, is_owner: bool):
+        self.book_id = book_id
+        self.user_id = user_id
+        self.is_owner = is_owner
+        # access_group_id -> entity_type -> permissions access bitmasks
+        self.group_access: dict[int, dict[m.Permission.Entity, list[int]]] = {}
+        # (entity model name, entity id) -> access_group_ids
+        self.entity_groups: dict[tuple[str, int], set[int]] = {}
+
+    @classmethod
+    def get(cls, book_id: int) -> "PermissionResolver":
+        resolvers: dict[tuple[int, int], PermissionResolver] = g.setdefault(
+            "permission_resolvers", {}
+        )
+        key = (current_user.id, book_id)
+        if key not in resolvers:
+            resolvers[key] = cls.load(book_id, current_user.id)
+        return resolvers[key]
+
+    @classmethod
+    def load(cls, book_id: int, user_id: int) -> "PermissionResolver":
+        book: m.Book = db.session.get(m.Book, book_id)
+        resolver = cls(book_id, user_id, bool(book) and book.user_id == user_id)
+        if resolver.is_owner:
+            return resolver
+
+        log(log.INFO, "Load permissions of user [%s] in book [%s]", user_id, book_id)
+        rows = db.session.execute(
+            select(
+                m.UserAccessGroups.access_group_id,
+                m.Permission.entity_type,
+                m.Permission.access,
+            )
+            .join(m.AccessGroup, m.AccessGroup.id == m.UserAccessGroups.access_group_id)
+            .join(
+                m.PermissionAccessGroups,
+                m.PermissionAccessGroups.access_group_id == m.AccessGroup.id,
+            )
+            .join(
+                m.Permission, m.Permission.id == m.PermissionAccessGroups.permission_id
+            )
+            .where(
+                m.UserAccessGroups.user_id == user_id,
+                m.AccessGroup.book_id == book_id,
+            )
+        ).all()
+        for access_group_id, entity_type, access in rows:
+            resolver.group_access.setdefault(access_group_id, {}).setdefault(
+                entity_type, []
+            ).append(access)
+        if not resolver.group_access:
+            return resolver
+
+        group_ids = list(resolver.group_access)
+        query = union_all(
+            *[
+                select(
+                    literal(model.__name__),
+                    getattr(join_model, entity_field),
+                    join_model.access_group_id,
+                ).where(join_model.access_group_id.in_(group_ids))
+                for model, (join_model, entity_field) in ENTITY_ACCESS_GROUPS.items()
+            ]
+        )
+        for model_name, entity_id, access_group_id in db.session.execute(query):
+            resolver.entity_groups.setdefault((model_name, entity_id), set()).add(
+                access_group_id
+            )
+        return resolver
+
+    def access_masks(
+        self, entity: Entity, entity_type: m.Permission.Entity = None
+    ) -> list[int]:
+        if not entity_type:
+            entity_type = m.Permission.Entity[type(entity).__name__.upper()]
+        masks = []
+        for access_group_id in self.entity_groups.get(
+            (type(entity).__name__, entity.id), ()
+        ):
+            masks += self.group_access[access_group_id].get(entity_type, [])
+        return masks
+
+    def has_permission(
+        self,
+        entity: Entity,
+        required_permissions: list[m.Permission.Access],
+        entity_type: m.Permission.Entity = None,
+    ) -> bool:
+        """True if user has any of required permissions"""
+        if self.is_owner:
+            return True
+        required = 0
+        for required_permission in required_permissions:
+            required |= required_permission
+        return any(mask & required for mask in self.access_masks(entity, entity_type))
+
+    def has_all_permissions(
+        self,
+        entity: Entity,
+        required_permissions: list[m.Permission.Access],
+        entity_type: m.Permission.Entity = None,
+    ) -> bool:
+        """True if one of user permissions grants all required permissions"""
+        if self.is_owner:
+            return True
+        required = 0
+        for required_permission in required_permissions:
+            required |= required_permission
+        return any(
+            mask & required == required
+            for mask in self.access_masks(entity, entity_type)
+        )
+
+    def has_permissions(
+        self,
+        entities: list[Entity],
+        required_permissions: list[m.Permission.Access],
+        entity_type: m.Permission.Entity = None,
+    ) -> dict[Entity, bool]:
+        """Batch version of has_permission"""
+        return {
+            entity: self.has_permission(entity, required_permissions, entity_type)
+            for entity in entities
+        }
+
+
+def get_book_id(entity: Entity) -> int:
+    match type(entity):
+        case m.Book:
+            return entity.id
+        case m.Collection | m.Section:
+            return entity.version.book_id
+        case m.Interpretation | m.Comment:
+            return entity.book_id
+    raise ValueError(f"Unknown entity [{entity}]")
+
+
+@event.listens_for(db.session, "after_commit")
+def reset_permission_resolvers(_session):
+    # access groups could be changed by the request, load them again on next check
+    if has_app_context():
+        g.pop("permission_resolvers", None)
@@ -0,0 +1,169 @@
+import json
+
+import sqlalchemy as sa
+
+from app import models as m, db
+from app.logger import log
+from app.controllers.book_stats import BOOK_ORDERINGS
+from app.controllers.home_feed import FEED_ORDERINGS
+from app.controllers.user_activity import CONTRIBUTION_ORDERINGS
+from app.controllers.trigram_search import trigram_match
+
+
+def hot_queries() -> dict[str, sa.Select]:
+    """Main filter paths of the pages. Every one of them must be served by an index"""
+    queries = {
+        "sections of version": sa.select(m.Section).filter_by(
+            version_id=1, is_deleted=False
+        ),
+        "sections of collection": sa.select(m.Section)
+        .filter_by(collection_id=1, is_deleted=False)
+        .order_by(m.Section.position),
+        "collections of version": sa.select(m.Collection).filter_by(
+            version_id=1, is_deleted=False
+        ),
+        "children of collection": sa.select(m.Collection)
+        .filter_by(parent_id=1, is_deleted=False)
+        .order_by(m.Collection.position),
+        "interpretations of section": sa.select(m.Interpretation).filter_by(
+            section_id=1, is_deleted=False
+        ),
+        "comments of interpretation": sa.select(m.Comment).filter_by(
+            interpretation_id=1, is_deleted=False
+        ),
+        "interpretations of version": sa.select(m.Interpretation).filter_by(
+            version_id=1, is_deleted=False
+        ),
+        "comments of version": sa.select(m.Comment).filter_by(
+            version_id=1, approved=True, is_deleted=False
+        ),
+        "unread notifications": sa.select(m.Notification).filter_by(
+            user_id=1, is_read=False
+        ),
+        "interpretation vote of user": sa.select(m.InterpretationVote).filter_by(
+            user_id=1, interpretation_id=1
+        ),
+        "comment vote of user": sa.select(m.CommentVote).filter_by(
+            user_id=1, comment_id=1
+        ),
+        "contributor of book": sa.select(m.BookContributor).filter_by(
+            book_id=1, user_id=1
+        ),
+        "contributions of user": sa.select(m.BookContributor).filter_by(user_id=1),
+        "user typeahead": sa.select(m.User).where(
+            trigram_match(m.User.username, "user", fuzzy=True)
+        ),
+        "tag typeahead": sa.select(m.Tag).where(
+            trigram_match(m.Tag.name, "tag", fuzzy=True)
+        ),
+        "books by label": sa.select(m.Book).where(trigram_match(m.Book.label, "book")),
+        "tag by key": sa.select(m.Tag).filter_by(key="tag"),
+        "top tags": sa.select(m.Tag)
+        .where(m.Tag.usage_count > 0)
+        .order_by(m.Tag.usage_count.desc(), m.Tag.id.desc())
+        .limit(100),
+        "documents of version": sa.select(m.SearchDocument).filter_by(
+            version_id=1, kind=m.SearchDocument.Kinds.SECTION
+        ),
+    }
+    for ordering, sort_key in FEED_ORDERINGS.items():
+        queries[f"home feed {ordering}"] = (
+            sa.select(m.Interpretation)
+            .where(m.Interpretation.is_deleted.is_(False))
+            .order_by(sort_key.desc(), m.Interpretation.id.desc())
+            .limit(10)
+        )
+    for ordering in m.InterpretationRanking.Orderings:
+        queries[f"ranking {ordering.name.lower()}"] = (
+            sa.select(m.Interpretation)
+            .join(
+                m.InterpretationRanking,
+                m.InterpretationRanking.interpretation_id == m.Interpretation.id,
+            )
+            .where(m.InterpretationRanking.ordering == ordering)
+            .order_by(m.InterpretationRanking.position)
+            .limit(10)
+        )
+    for ordering, (sort_key, id_key) in CONTRIBUTION_ORDERINGS.items():
+        queries[f"contributions {ordering}"] = (
+            sa.select(m.Interpretation)
+            .join(
+                m.UserActivity,
+                m.UserActivity.interpretation_id == m.Interpretation.id,
+            )
+            .where(m.UserActivity.user_id == 1)
+            .order_by(sort_key.desc(), id_key.desc())
+            .limit(10)
+        )
+    for ordering, (sort_key, book_id) in BOOK_ORDERINGS.items():
+        queries[f"books by {ordering}"] = (
+            sa.select(m.Book)
+            .join(m.BookStats, m.BookStats.book_id == m.Book.id)
+            .where(m.Book.is_deleted.is_(False))
+            .order_by(sort_key.desc(), book_id.desc())
+            .limit(10)
+        )
+    for model, entity_field in (
+        (m.BookAccessGroups, "book_id"),
+        (m.CollectionAccessGroups, "collection_id"),
+        (m.SectionAccessGroups, "section_id"),
+        (m.InterpretationAccessGroups, "interpretation_id"),
+        (m.PermissionAccessGroups, "permission_id"),
+        (m.UserAccessGroups, "user_id"),
+    ):
+        table = model.__tablename__
+        queries[f"{table} by entity"] = sa.select(model).filter_by(**{entity_field: 1})
+        queries[f"{table} by access group"] = sa.select(model).filter_by(
+            access_group_id=1
+        )
+    return queries
+
+
+def _postgresql_seq_scans(plan: dict) -> list[str]:
+    tables = []
+    if plan["Node Type"] == "Seq Scan":
+        tables.append(plan["Relation Name"])
+    for sub_plan in plan.get("Plans", []):
+        tables += _postgresql_seq_scans(sub_plan)
+    return tables
+
+
+def find_seq_scans(query: sa.Select) -> list[str]:
+    """Names of the tables which are scanned sequentially by the query"""
+    connection = db.session.connection()
+    sql = str(
+        query.compile(dialect=db.engine.dialect, compile_kwargs={"literal_binds": True})
+    )
+    if db.engine.dialect.name == "postgresql":
+        # tables of a seeded database are tiny, make planner use any suitable index
+        connection.exec_driver_sql("SET LOCAL enable_seqscan = off")
+        plan = connection.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {sql}").scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return _postgresql_seq_scans(plan[0]["Plan"])
+
+    # sqlite: "SCAN <table>" is a full scan, "SEARCH <table> USING INDEX" is not.
+    # Scans of subqueries are not table scans
+    return [
+        detail.split()[1]
+        for _, _, _, detail in connection.exec_driver_sql(
+            f"EXPLAIN QUERY PLAN {sql}"
+        ).all()
+        if detail.startswith("SCAN ")
+        and "INDEX" not in detail
+        and detail.split()[1] in db.metadata.tables
+    ]
+
+
+def check_query_plans() -> list[str]:
+    """Run EXPLAIN for the hot queries. Returns names of the queries without index"""
+    failed = []
+    for name, query in hot_queries().items():
+        tables = find_seq_scans(query)
+        if tables:
+            log(log.WARNING, "Query [%s] scans [%s] sequentially", name, tables)
+            failed.append(name)
+        else:
+            log(log.INFO, "Query [%s] uses index", name)
+    db.session.rollback()
+    return failed
@@ -0,0 +1,137 @@
+import sqlalchemy as sa
+from flask import current_app, url_for
+
+from app import models as m, db
+from app.logger import log
+from app.controllers.cache import LRUCache
+from app.controllers.change_feed import subscribe
+from app.controllers.search_backend import rank_interpretations
+from app.controllers.trigram_search import trigram_match, trigram_rank
+
+RESULTS_PER_KIND = 2
+# quick search shows labels of these tables
+CACHED_TABLES = {"books", "interpretations", "sections", "tags", "users"}
+
+
+def get_quick_search_cache() -> LRUCache:
+    cache = current_app.extensions.get("quick_search_cache")
+    if cache is None:
+        cache = LRUCache(
+            current_app.config["QUICK_SEARCH_CACHE_SIZE"],
+            current_app.config["QUICK_SEARCH_CACHE_TTL"],
+        )
+        current_app.extensions["quick_search_cache"] = cache
+    return cache
+
+
+def normalize_query(q: str) -> str:
+    return " ".join(q.lower().split())
+
+
+def _branch(kind: str, label, entity_id, book_id, rank, query) -> sa.Subquery:
+    return (
+        query.with_only_columns(
+            sa.literal(kind).label("kind"),
+            label.label("label"),
+            entity_id.label("id"),
+            book_id.label("book_id"),
+            rank.label("rank"),
+        )
+        .order_by(None)
+        .order_by(rank.desc(), entity_id)
+        .limit(RESULTS_PER_KIND)
+        .subquery(kind)
+    )
+
+
+def quick_search_query(q: str) -> sa.Select:
+    """Best interpretations, books, users and tags for typeahead in one UNION ALL.
+    Rows have the kind, the label to show and ids to build the url"""
+    branches = [
+        _branch(
+            "books",
+            m.Book.label,
+            m.Book.id,
+            m.Book.id,
+            trigram_rank(m.Book.label, q),
+            sa.select(m.Book).where(
+                trigram_match(m.Book.label, q, fuzzy=True),
+                m.Book.is_deleted.is_(False),
+            ),
+        ),
+        _branch(
+            "users",
+            m.User.username,
+            m.User.id,
+            sa.null(),
+            trigram_rank(m.User.username, q),
+            sa.select(m.User).where(
+                sa.or_(
+                    trigram_match(m.User.username, q, fuzzy=True),
+                    trigram_match(m.User.wallet_id, q),
+                )
+            ),
+        ),
+        _branch(
+            "tags",
+            m.Tag.name,
+            m.Tag.id,
+            sa.null(),
+            trigram_rank(m.Tag.name, q),
+            sa.select(m.Tag).where(trigram_match(m.Tag.name, q, fuzzy=True)),
+        ),
+    ]
+    interpretations, interpretation_rank = rank_interpretations(q, prefix_last=True)
+    # no words to look up in the full text index
+    if interpretation_rank is not None:
+        branches.append(
+            _branch(
+                "interpretations",
+                m.Section.label,
+                m.Interpretation.id,
+                m.Interpretation.book_id,
+                interpretation_rank,
+                interpretations.statement.join(
+                    m.Section, m.Section.id == m.Interpretation.section_id
+                ),
+            )
+        )
+    found = sa.union_all(*[sa.select(branch) for branch in branches]).subquery()
+    return sa.select(found).order_by(found.c.rank.desc(), found.c.id)
+
+
+def _url(row) -> str:
+    match row.kind:
+        case "interpretations":
+            return url_for(
+                "book.qa_view", book_id=row.book_id, interpretation_id=row.id
+            )
+        case "books":
+            return url_for("book.collection_view", book_id=row.id)
+        case "users":
+            return url_for("user.profile", user_id=row.id)
+        case _:
+            return url_for("search.tag_search_interpretations", tag_name=row.label)
+
+
+def quick_search(q: str) -> dict[str, list[dict]]:
+    """Labels and urls of the best matches of every kind, cached by the query"""
+    q = normalize_query(q)
+    cache = get_quick_search_cache()
+    result = cache.get(q)
+    if result is not None:
+        log(log.DEBUG, "Quick search [%s] from cache", q)
+        return result
+
+    result = {kind: [] for kind in ("interpretations", "books", "users", "tags")}
+    for row in db.session.execute(quick_search_query(q)):
+        result[row.kind].append({"label": row.label, "url": _url(row)})
+    cache.set(q, result)
+    return result
+
+
+@subscribe
+def clear_quick_search_cache(tables: set[str]):
+    if CACHED_TABLES.intersection(tables):
+        log(log.DEBUG, "Clear quick search cache")
+        get_quick_search_cache().clear()
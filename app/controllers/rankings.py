@@ -0,0 +1,108 @@
+import heapq
+from datetime import datetime, timedelta
+
+import sqlalchemy as sa
+from flask import current_app
+
+from app import models as m, db
+from app.logger import log
+
+# Ranking snapshots of the home feed. The top RANKINGS_SIZE interpretations of
+# the trending ordering are stored with their positions, feed pages are
+# position ranges of a snapshot. Snapshots lag votes and comments until the next
+# refresh by `flask rankings refresh` or the jobs worker. Orderings by the
+# counters of interpretations are read live by their feed indexes, to any depth
+
+Orderings = m.InterpretationRanking.Orderings
+
+# concurrent refreshes wait for each other instead of mixing their rows
+REFRESH_LOCK_ID = 0x72616E6B
+
+
+def trending_score(points: int, age: timedelta, half_life: float) -> float:
+    """Votes and comments of the interpretation halved every half_life hours
+    of its age, so fresh interpretations trend before old popular ones"""
+    hours = age.total_seconds() / 3600
+    return (1 + max(points, 0)) * 0.5 ** (hours / half_life)
+
+
+def _top_trending(limit: int, now: datetime) -> list[tuple[int, float]]:
+    """Only interpretations of the last RANKINGS_TRENDING_DAYS are scored,
+    streamed, so memory does not depend on their number"""
+    since = now - timedelta(days=current_app.config["RANKINGS_TRENDING_DAYS"])
+    half_life = current_app.config["RANKINGS_HALF_LIFE"]
+    rows = db.session.execute(
+        sa.select(
+            m.Interpretation.id,
+            m.Interpretation.score,
+            m.Interpretation.comments_count,
+            m.Interpretation.created_at,
+        )
+        .where(
+            m.Interpretation.is_deleted.is_(False),
+            m.Interpretation.created_at >= since,
+        )
+        .execution_options(stream_results=True, yield_per=1000)
+    )
+    top = heapq.nlargest(
+        limit,
+        (
+            (
+                trending_score(score + comments_count, now - created_at, half_life),
+                interpretation_id,
+            )
+            for interpretation_id, score, comments_count, created_at in rows
+        ),
+    )
+    return [(interpretation_id, score) for score, interpretation_id in top]
+
+
+def refresh_rankings(limit: int = 0) -> dict[Orderings, int]:
+    """Replace all snapshots in one transaction, readers see the previous ones
+    until the commit. Returns number of ranked interpretations by ordering"""
+    limit = limit or current_app.config["RANKINGS_SIZE"]
+    now = datetime.now()
+    if db.engine.dialect.name == "postgresql":
+        db.session.execute(sa.select(sa.func.pg_advisory_xact_lock(REFRESH_LOCK_ID)))
+
+    tops = {Orderings.TRENDING: _top_trending(limit, now)}
+
+    db.session.execute(sa.delete(m.InterpretationRanking))
+    for ordering, top in tops.items():
+        if not top:
+            continue
+        db.session.execute(
+            sa.insert(m.InterpretationRanking),
+            [
+                dict(
+                    ordering=ordering,
+                    position=position,
+                    score=score,
+                    interpretation_id=interpretation_id,
+                    created_at=now,
+                    is_deleted=False,
+                )
+                for position, (interpretation_id, score) in enumerate(top, 1)
+            ],
+        )
+    db.session.commit()
+    counts = {ordering: len(top) for ordering, top in tops.items()}
+    log(log.INFO, "Rankings refreshed: [%s]", counts)
+    return counts
+
+
+def refreshed_at() -> datetime | None:
+    """Time of the current snapshots, None before the first refresh"""
+    return db.session.scalar(sa.select(sa.func.max(m.InterpretationRanking.created_at)))
+
+
+def refresh_rankings_if_due() -> bool:
+    """Refresh the snapshots older than RANKINGS_REFRESH_INTERVAL"""
+    interval = current_app.config["RANKINGS_REFRESH_INTERVAL"]
+    if not interval:
+        return False
+    last = refreshed_at()
+    if last and last > datetime.now() - timedelta(seconds=interval):
+        return False
+    refresh_rankings()
+    return True
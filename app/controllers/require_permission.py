@@ -3,6 +3,7 @@ from flask import flash, redirect, url_for, request, make_response
 import functools
 
 from app import models as m, db
+from app.controllers.permission_resolver import PermissionResolver, get_book_id
 from app.logger import log
 
 
@@ -43,16 +44,6 @@ def check_permissions(
     if type(entity) == m.Comment:
         log(log.INFO, "Entity is Comment. Replace it by entity.interpretation")
         entity = entity.interpretation
-
-        if entity.section.version.book.owner == current_user:
-            # user has access because he is book owner
-            log(
-                log.INFO,
-                "User [%s] is book owner [%s]",
-                current_user,
-                entity.section.version.book,
-            )
-            return None
     elif (
         type(entity) == m.Interpretation
         and entity.user_id == current_user.id
@@ -61,50 +52,13 @@ def check_permissions(
         log(log.INFO, "User [%s] is interpretation creator [%s]", current_user, entity)
         return None
 
-    if not entity or not entity.access_groups:
-        log(
-            log.INFO,
-            "Entity [%s] of entity.access_groups [%s] not found",
-            access,
-            entity,
-        )
-        flash("You do not have permission", "warning")
-        return make_response(redirect(url_for("home.get_all")))
-
-    # check if user is not owner of book
-    if not book_id and entity.access_groups[0].book.user_id == current_user.id:
+    resolver = PermissionResolver.get(get_book_id(entity))
+    if resolver.is_owner:
         # user has access because he is book owner
-        log(
-            log.INFO,
-            "User [%s] is book owner [%s]",
-            current_user,
-            entity.access_groups[0].book,
-        )
+        log(log.INFO, "User [%s] is book owner [%s]", current_user, resolver.book_id)
         return None
 
-    access_group_query = (
-        m.AccessGroup.query.join(
-            m.PermissionAccessGroups,
-            m.PermissionAccessGroups.access_group_id == m.AccessGroup.id,
-        )
-        .join(m.Permission, m.PermissionAccessGroups.permission_id == m.Permission.id)
-        .filter(
-            m.AccessGroup.id.in_(
-                [access_group.id for access_group in entity.access_groups]
-            )
-        )
-        .filter(m.AccessGroup.users.any(id=current_user.id))
-        .filter(m.Permission.entity_type == entity_type)
-    )
-
-    for access in access:
-        access_group_query = access_group_query.filter(
-            m.Permission.access.op("&")(access) > 0
-        )
-
-    access_groups = access_group_query.all()
-
-    if access_groups:
+    if resolver.has_all_permissions(entity, access, entity_type):
         log(
             log.INFO,
             "User [%s] has permission to [%s] [%s]",
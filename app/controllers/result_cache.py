@@ -0,0 +1,189 @@
+import json
+import sqlite3
+import threading
+import time
+from threading import Lock
+
+from flask import current_app, request
+
+from app import schema as s
+from app.logger import log
+from app.controllers.cache import LRUCache
+from app.controllers.change_feed import subscribe
+from app.controllers.loader_profiles import with_profile
+from app.controllers.pagination import Page, create_pagination, paginate
+
+# writes to these tables invalidate cached results depending on them
+CACHED_TABLES = {"books", "book_tags", "interpretations", "interpretation_tags", "tags"}
+
+
+class MemoryBackend:
+    """Cache of a worker process, the default"""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.items = LRUCache(maxsize, ttl)
+        self._generations: dict[str, int] = {}
+        self._lock = Lock()
+
+    def get(self, key: str):
+        return self.items.get(key)
+
+    def put(self, key: str, value):
+        self.items.set(key, value)
+
+    def generations(self, names: list[str]) -> dict[str, int]:
+        return {name: self._generations.get(name, 0) for name in names}
+
+    def bump(self, names: set[str]):
+        with self._lock:
+            for name in names:
+                self._generations[name] = self._generations.get(name, 0) + 1
+
+
+class SqliteBackend:
+    """Cache in a SQLite file shared by all workers of the host"""
+
+    SCHEMA = (
+        "CREATE TABLE IF NOT EXISTS result_cache "
+        "(key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)",
+        "CREATE TABLE IF NOT EXISTS result_cache_generations "
+        "(name TEXT PRIMARY KEY, generation INTEGER NOT NULL)",
+    )
+    # expired items are removed once per this number of writes
+    PURGE_EVERY = 100
+
+    def __init__(self, path: str, ttl: float):
+        self.path = path
+        self.ttl = ttl
+        self._local = threading.local()
+        self._writes = 0
+        with self.connection as connection:
+            connection.execute("PRAGMA journal_mode=WAL")
+            for statement in self.SCHEMA:
+                connection.execute(statement)
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=5)
+            self._local.connection = connection
+        return connection
+
+    def get(self, key: str):
+        row = self.connection.execute(
+            "SELECT value FROM result_cache WHERE key = ? AND expires_at > ?",
+            (key, time.time()),
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put(self, key: str, value):
+        now = time.time()
+        with self.connection as connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO result_cache VALUES (?, ?, ?)",
+                (key, json.dumps(value), now + self.ttl),
+            )
+            self._writes += 1
+            if not self._writes % self.PURGE_EVERY:
+                connection.execute(
+                    "DELETE FROM result_cache WHERE expires_at <= ?", (now,)
+                )
+
+    def generations(self, names: list[str]) -> dict[str, int]:
+        rows = self.connection.execute(
+            "SELECT name, generation FROM result_cache_generations "
+            f"WHERE name IN ({', '.join('?' * len(names))})",
+            names,
+        ).fetchall()
+        return {name: 0 for name in names} | dict(rows)
+
+    def bump(self, names: set[str]):
+        with self.connection as connection:
+            connection.executemany(
+                "INSERT INTO result_cache_generations VALUES (?, 1) "
+                "ON CONFLICT(name) DO UPDATE SET generation = generation + 1",
+                [(name,) for name in names],
+            )
+
+
+class ResultCache:
+    """Results of queries depending on tables. Every table has a generation,
+    a write bumps it, so results computed before the write are not found"""
+
+    def __init__(self, backend: MemoryBackend | SqliteBackend):
+        self.backend = backend
+
+    def _key(self, key: str, tables: set[str]) -> str:
+        generations = self.backend.generations(sorted(tables))
+        return f"{key}@" + ",".join(f"{t}.{g}" for t, g in generations.items())
+
+    def get(self, key: str, tables: set[str]):
+        return self.backend.get(self._key(key, tables))
+
+    def put(self, key: str, tables: set[str], value):
+        self.backend.put(self._key(key, tables), value)
+
+    def invalidate(self, tables: set[str]):
+        self.backend.bump(tables)
+
+
+def get_result_cache() -> ResultCache:
+    cache = current_app.extensions.get("result_cache")
+    if cache is None:
+        url = current_app.config["RESULT_CACHE_URL"]
+        ttl = current_app.config["RESULT_CACHE_TTL"]
+        if url.startswith("sqlite:///"):
+            backend = SqliteBackend(url.removeprefix("sqlite:///"), ttl)
+        else:
+            backend = MemoryBackend(current_app.config["RESULT_CACHE_SIZE"], ttl)
+        log(log.INFO, "Result cache [%s]", type(backend).__name__)
+        cache = ResultCache(backend)
+        current_app.extensions["result_cache"] = cache
+    return cache
+
+
+@subscribe
+def invalidate_results(tables: set[str]):
+    changed = CACHED_TABLES.intersection(tables)
+    if changed:
+        get_result_cache().invalidate(changed)
+
+
+def cached_paginate(
+    key: str, query, model, tables: set[str], profile: str | None = None, **kwargs
+) -> tuple[s.Pagination, Page]:
+    """paginate() keeping ids of the page items, total and next cursor in
+    the result cache. key identifies the query, tables are the tables it reads,
+    profile - loader profile of the items, see app/controllers/loader_profiles.py"""
+    page_key = json.dumps(
+        [
+            key,
+            request.args.get("page", type=int, default=1),
+            request.args.get("cursor", default=""),
+            kwargs.get("page_size", 0),
+        ]
+    )
+    cache = get_result_cache()
+    cached = cache.get(page_key, tables)
+    if cached is None:
+        if profile:
+            query = with_profile(query, profile)
+        pagination, page = paginate(query, **kwargs)
+        cache.put(
+            page_key,
+            tables,
+            [page.total, [item.id for item in page.items], page.next_cursor],
+        )
+        return pagination, page
+
+    log(log.DEBUG, "Page [%s] from cache", page_key)
+    total, ids, next_cursor = cached
+    items = model.query.filter(model.id.in_(ids))
+    if profile:
+        items = with_profile(items, profile)
+    items = {item.id: item for item in items}
+    pagination = create_pagination(total, kwargs.get("page_size", 0))
+    return pagination, Page(
+        [items[id] for id in ids if id in items], total, next_cursor
+    )
@@ -0,0 +1,255 @@
+import html
+import re
+from dataclasses import dataclass
+
+import sqlalchemy as sa
+from markupsafe import Markup, escape
+
+from app import models as m, db
+from app.logger import log
+
+TOKEN_REGEX = re.compile(r'"([^"]*)"|(\S+)')
+WORD_REGEX = re.compile(r"\w+")
+SNIPPET_WORDS = 24
+# highlight bounds put by the database, replaced by <mark> after escaping
+MARK_START, MARK_END = "\x02", "\x03"
+
+
+@dataclass
+class SearchTerm:
+    """Word or phrase of a search query. Prefix term matches words starting with
+    its last word"""
+
+    words: list[str]
+    prefix: bool = False
+
+
+def parse_query(q: str, prefix_last: bool = False) -> list[SearchTerm]:
+    """Split user input into terms:
+    "some phrase" - words next to each other
+    word* - words starting with "word"
+    With prefix_last the last term is matched as prefix (typeahead)
+    """
+    terms = []
+    for phrase, word in TOKEN_REGEX.findall(q.lower()):
+        words = WORD_REGEX.findall(phrase or word)
+        if words:
+            terms.append(SearchTerm(words, prefix=bool(word) and word.endswith("*")))
+    if prefix_last and terms:
+        terms[-1].prefix = True
+    return terms
+
+
+class SearchBackend:
+    """Full text search over interpretations plain_text and search documents
+    of a book version
+
+    *_matches return a subquery with "id" of matched row and its "rank",
+    bigger rank is more relevant
+    """
+
+    def interpretation_matches(self, terms: list[SearchTerm]) -> sa.Subquery:
+        raise NotImplementedError
+
+    def interpretation_snippets(self, terms: list[SearchTerm], ids: list[int]):
+        """Rows of "id" and "snippet": words of plain_text around the matches,
+        the matched words are between MARK_START and MARK_END"""
+        raise NotImplementedError
+
+    def document_matches(self, terms: list[SearchTerm], version_id: int):
+        """search_documents of the version matching terms"""
+        raise NotImplementedError
+
+    def document_snippets(self, terms: list[SearchTerm], ids: list[int]):
+        """Same as interpretation_snippets for search_documents"""
+        raise NotImplementedError
+
+
+class PostgresSearchBackend(SearchBackend):
+    """tsvector search served by GIN indexes ix_interpretations_plain_text_tsv
+    and ix_search_documents_version_id_tsv"""
+
+    # must be the same expressions as in the indexes
+    vector = sa.text("to_tsvector('english'::regconfig, coalesce(plain_text, ''))")
+    document_vector = sa.text(
+        "to_tsvector('english'::regconfig, "
+        "coalesce(title, '') || ' ' || coalesce(body, ''))"
+    )
+
+    @staticmethod
+    def tsquery(terms: list[SearchTerm]) -> str:
+        parts = []
+        for term in terms:
+            lexemes = [f"'{word}'" for word in term.words]
+            if term.prefix:
+                lexemes[-1] += ":*"
+            parts.append(f"({' <-> '.join(lexemes)})")
+        return " & ".join(parts)
+
+    def interpretation_matches(self, terms: list[SearchTerm]) -> sa.Subquery:
+        return (
+            sa.text(
+                "SELECT id, ts_rank_cd("
+                f"{self.vector.text}, to_tsquery('english'::regconfig, :query)"
+                ") AS rank FROM interpretations "
+                f"WHERE {self.vector.text} @@ to_tsquery('english'::regconfig, :query)"
+            )
+            .bindparams(query=self.tsquery(terms))
+            .columns(id=sa.Integer, rank=sa.Float)
+            .subquery("matches")
+        )
+
+    def _headlines(self, terms: list[SearchTerm], ids: list[int], text: str, table):
+        options = (
+            f"StartSel={MARK_START}, StopSel={MARK_END}, "
+            f"MaxWords={SNIPPET_WORDS}, MinWords={SNIPPET_WORDS // 2}"
+        )
+        return sa.text(
+            f"SELECT id, ts_headline('english'::regconfig, {text}, "
+            "to_tsquery('english'::regconfig, :query), :options) AS snippet "
+            f"FROM {table} WHERE id IN :ids"
+        ).bindparams(
+            sa.bindparam("ids", expanding=True),
+            query=self.tsquery(terms),
+            options=options,
+            ids=ids,
+        )
+
+    def interpretation_snippets(self, terms: list[SearchTerm], ids: list[int]):
+        return self._headlines(
+            terms, ids, "coalesce(plain_text, '')", "interpretations"
+        )
+
+    def document_matches(self, terms: list[SearchTerm], version_id: int):
+        return (
+            sa.text(
+                "SELECT id, ts_rank_cd("
+                f"{self.document_vector.text}, "
+                "to_tsquery('english'::regconfig, :query)"
+                ") AS rank FROM search_documents WHERE version_id = :version_id "
+                f"AND {self.document_vector.text} @@ "
+                "to_tsquery('english'::regconfig, :query)"
+            )
+            .bindparams(query=self.tsquery(terms), version_id=version_id)
+            .columns(id=sa.Integer, rank=sa.Float)
+            .subquery("matches")
+        )
+
+    def document_snippets(self, terms: list[SearchTerm], ids: list[int]):
+        return self._headlines(
+            terms, ids, "coalesce(body, title, '')", "search_documents"
+        )
+
+
+class SqliteSearchBackend(SearchBackend):
+    """FTS5 search over interpretations_fts, used in development and tests"""
+
+    @staticmethod
+    def match_query(terms: list[SearchTerm]) -> str:
+        return " ".join(
+            f'"{" ".join(term.words)}"' + ("*" if term.prefix else "") for term in terms
+        )
+
+    def interpretation_matches(self, terms: list[SearchTerm]) -> sa.Subquery:
+        # bm25 is smaller for better matches
+        return (
+            sa.text(
+                "SELECT rowid AS id, -bm25(interpretations_fts) AS rank "
+                "FROM interpretations_fts WHERE interpretations_fts MATCH :query"
+            )
+            .bindparams(query=self.match_query(terms))
+            .columns(id=sa.Integer, rank=sa.Float)
+            .subquery("matches")
+        )
+
+    def _snippets(self, terms: list[SearchTerm], ids: list[int], fts: str, column):
+        return sa.text(
+            f"SELECT rowid AS id, snippet({fts}, {column}, "
+            ":start, :end, '…', :words) AS snippet "
+            f"FROM {fts} WHERE {fts} MATCH :query AND rowid IN :ids"
+        ).bindparams(
+            sa.bindparam("ids", expanding=True),
+            start=MARK_START,
+            end=MARK_END,
+            words=SNIPPET_WORDS,
+            query=self.match_query(terms),
+            ids=ids,
+        )
+
+    def interpretation_snippets(self, terms: list[SearchTerm], ids: list[int]):
+        return self._snippets(terms, ids, "interpretations_fts", 0)
+
+    def document_matches(self, terms: list[SearchTerm], version_id: int):
+        # FTS5 can not filter by version, the caller joins search_documents
+        return (
+            sa.text(
+                "SELECT rowid AS id, -bm25(search_documents_fts) AS rank "
+                "FROM search_documents_fts WHERE search_documents_fts MATCH :query"
+            )
+            .bindparams(query=self.match_query(terms))
+            .columns(id=sa.Integer, rank=sa.Float)
+            .subquery("matches")
+        )
+
+    def document_snippets(self, terms: list[SearchTerm], ids: list[int]):
+        # -1 is the column with the best match
+        return self._snippets(terms, ids, "search_documents_fts", -1)
+
+
+def get_search_backend() -> SearchBackend:
+    if db.engine.dialect.name == "postgresql":
+        return PostgresSearchBackend()
+    return SqliteSearchBackend()
+
+
+def rank_interpretations(q: str, prefix_last: bool = False):
+    """Active original interpretations matching q and the relevance of them,
+    None relevance for an empty q"""
+    query = m.Interpretation.query.filter(
+        m.Interpretation.copy_of == 0,
+        m.Interpretation.is_deleted.is_(False),
+    )
+    terms = parse_query(q, prefix_last)
+    if not terms:
+        return query, None
+
+    matches = get_search_backend().interpretation_matches(terms)
+    return query.join(matches, matches.c.id == m.Interpretation.id), matches.c.rank
+
+
+def search_interpretations(q: str, prefix_last: bool = False):
+    """Active original interpretations matching q, the most relevant first"""
+    query, rank = rank_interpretations(q, prefix_last)
+    if rank is None:
+        return query.order_by(m.Interpretation.id)
+    return query.order_by(rank.desc(), m.Interpretation.id)
+
+
+def highlight(snippet: str) -> Markup:
+    """Escaped snippet with the matched words in <mark>"""
+    return Markup(
+        str(escape(html.unescape(snippet)))
+        .replace(MARK_START, "<mark>")
+        .replace(MARK_END, "</mark>")
+    )
+
+
+def interpretation_snippets(q: str, ids: list[int]) -> dict[int, Markup]:
+    """Highlighted snippets of the interpretations found by q, made by the
+    database only for the shown ids, so full texts are not sent anywhere.
+    Without search words it is the beginning of the text"""
+    if not ids:
+        return {}
+    terms = parse_query(q)
+    if terms:
+        query = get_search_backend().interpretation_snippets(terms, ids)
+    else:
+        query = sa.select(
+            m.Interpretation.id,
+            sa.func.substr(m.Interpretation.plain_text, 1, SNIPPET_WORDS * 8),
+        ).where(m.Interpretation.id.in_(ids))
+    snippets = {
+        id: highlight(snippet or "") for id, snippet in db.session.execute(query)
+    }
+    log(log.DEBUG, "Snippets of [%d] interpretations", len(snippets))
+    return snippets
@@ -0,0 +1,180 @@
+from typing import Callable
+
+import sqlalchemy as sa
+
+from app import models as m, db
+from app.logger import log
+from app.controllers.delete_nested_book_entities import collection_subtree_ids
+
+# search_documents keeps the text of every active book entity. reindex()
+# rebuilds it from scratch, the index_* functions refresh the documents of
+# entities changed by a request or a job
+
+Kinds = m.SearchDocument.Kinds
+BATCH_SIZE = 1000
+
+
+def _model(kind: Kinds):
+    return {
+        Kinds.BOOK: m.Book,
+        Kinds.COLLECTION: m.Collection,
+        Kinds.SECTION: m.Section,
+        Kinds.INTERPRETATION: m.Interpretation,
+    }[kind]
+
+
+def _source(kind: Kinds) -> sa.Select:
+    """Documents of active entities of the kind in id order"""
+    match kind:
+        case Kinds.BOOK:
+            query = sa.select(
+                m.Book.id.label("entity_id"),
+                m.Book.id.label("book_id"),
+                sa.null().label("version_id"),
+                m.Book.label.label("title"),
+                m.Book.about.label("body"),
+            ).where(m.Book.is_deleted.is_(False))
+        case Kinds.COLLECTION:
+            query = (
+                sa.select(
+                    m.Collection.id.label("entity_id"),
+                    m.BookVersion.book_id,
+                    m.Collection.version_id,
+                    m.Collection.label.label("title"),
+                    m.Collection.about.label("body"),
+                )
+                .join(m.BookVersion, m.BookVersion.id == m.Collection.version_id)
+                .where(
+                    m.Collection.is_deleted.is_(False),
+                    m.Collection.is_root.is_(False),
+                )
+            )
+        case Kinds.SECTION:
+            query = (
+                sa.select(
+                    m.Section.id.label("entity_id"),
+                    m.BookVersion.book_id,
+                    m.Section.version_id,
+                    m.Section.label.label("title"),
+                    sa.null().label("body"),
+                )
+                .join(m.BookVersion, m.BookVersion.id == m.Section.version_id)
+                .where(m.Section.is_deleted.is_(False))
+            )
+        case _:
+            query = (
+                sa.select(
+                    m.Interpretation.id.label("entity_id"),
+                    m.Interpretation.book_id,
+                    m.Interpretation.version_id,
+                    m.Section.label.label("title"),
+                    m.Interpretation.plain_text.label("body"),
+                )
+                .join(m.Section, m.Section.id == m.Interpretation.section_id)
+                .where(m.Interpretation.is_deleted.is_(False))
+            )
+    return query.order_by(_model(kind).id)
+
+
+def _insert_documents(kind: Kinds, source: sa.Select, batch_size: int) -> int:
+    """Stream the source rows with a server side cursor and insert them
+    batch by batch, so memory does not depend on the number of rows"""
+    rows = db.session.execute(
+        source.execution_options(stream_results=True, yield_per=batch_size)
+    )
+    total = 0
+    for batch in rows.partitions():
+        db.session.execute(
+            sa.insert(m.SearchDocument),
+            [dict(row._mapping, kind=kind) for row in batch],
+        )
+        total += len(batch)
+    return total
+
+
+def index_documents(kind: Kinds, condition, batch_size: int = BATCH_SIZE) -> int:
+    """Replace documents of the entities of the kind matching condition.
+    Documents of deleted entities are removed. Does not commit"""
+    model = _model(kind)
+    db.session.execute(
+        sa.delete(m.SearchDocument)
+        .where(
+            m.SearchDocument.kind == kind,
+            m.SearchDocument.entity_id.in_(sa.select(model.id).where(condition)),
+        )
+        .execution_options(synchronize_session=False)
+    )
+    return _insert_documents(kind, _source(kind).where(condition), batch_size)
+
+
+def reindex(
+    batch_size: int = BATCH_SIZE, on_progress: Callable[[Kinds, int], None] = None
+) -> dict[str, int]:
+    """Rebuild all documents in one transaction, searches see the old
+    documents until it is committed. Returns number of documents of each kind"""
+    db.session.execute(
+        sa.delete(m.SearchDocument).execution_options(synchronize_session=False)
+    )
+    indexed = {}
+    for kind in Kinds:
+        indexed[kind.name] = _insert_documents(kind, _source(kind), batch_size)
+        log(log.INFO, "Indexed [%d] %s documents", indexed[kind.name], kind.name)
+        if on_progress:
+            on_progress(kind, indexed[kind.name])
+    db.session.commit()
+    return indexed
+
+
+def index_interpretation(interpretation: m.Interpretation):
+    index_documents(Kinds.INTERPRETATION, m.Interpretation.id == interpretation.id)
+    db.session.commit()
+
+
+def index_section(section: m.Section):
+    """The section and its interpretations, they are titled by the section"""
+    index_documents(Kinds.SECTION, m.Section.id == section.id)
+    index_documents(Kinds.INTERPRETATION, m.Interpretation.section_id == section.id)
+    db.session.commit()
+
+
+def index_collection(collection: m.Collection, nested: bool = False):
+    """The collection, with nested=True also everything under it"""
+    if not nested:
+        index_documents(Kinds.COLLECTION, m.Collection.id == collection.id)
+        db.session.commit()
+        return
+
+    collection_ids = collection_subtree_ids(collection.id).union(
+        sa.select(sa.literal(collection.id))
+    )
+    section_ids = sa.select(m.Section.id).where(
+        m.Section.collection_id.in_(collection_ids)
+    )
+    index_documents(Kinds.COLLECTION, m.Collection.id.in_(collection_ids))
+    index_documents(Kinds.SECTION, m.Section.id.in_(section_ids))
+    index_documents(Kinds.INTERPRETATION, m.Interpretation.section_id.in_(section_ids))
+    db.session.commit()
+
+
+def _index_versions(version_ids):
+    for kind, model in (
+        (Kinds.COLLECTION, m.Collection),
+        (Kinds.SECTION, m.Section),
+        (Kinds.INTERPRETATION, m.Interpretation),
+    ):
+        index_documents(kind, model.version_id.in_(version_ids))
+
+
+def index_version(version: m.BookVersion):
+    _index_versions([version.id])
+    db.session.commit()
+
+
+def index_book(book: m.Book, nested: bool = False):
+    """The book, with nested=True also the content of all its versions"""
+    index_documents(Kinds.BOOK, m.Book.id == book.id)
+    if nested:
+        _index_versions(
+            sa.select(m.BookVersion.id).where(m.BookVersion.book_id == book.id)
+        )
+    db.session.commit()
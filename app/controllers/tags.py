@@ -1,5 +1,13 @@
+from collections import Counter
+
+import sqlalchemy as sa
+from flask import url_for
+
 from app import models as m, db
 from app.logger import log
+from app.controllers.result_cache import get_result_cache
+
+TOP_TAGS_LIMIT = 100
 
 
 def get_or_create_tag(tag_name: str):
@@ -12,7 +20,7 @@ def get_or_create_tag(tag_name: str):
         )
         raise ValueError("Exceeded name length")
 
-    tag = m.Tag.query.filter_by(name=tag_name).first()
+    tag = m.Tag.query.filter_by(key=m.Tag.normalize(tag_name)).first()
     if not tag:
         log(log.INFO, "Create Tag: [%s]", tag_name)
         tag = m.Tag(name=tag_name).save()
@@ -20,39 +28,31 @@ def get_or_create_tag(tag_name: str):
     return tag
 
 
-def set_book_tags(book: m.Book, tags: str):
-    book_tags = m.BookTags.query.filter_by(book_id=book.id).all()
-    for book_tag in book_tags:
-        db.session.delete(book_tag)
-
-    tags_names = [tag.lower() for tag in tags.split(",") if len(tag)]
-
-    for tag_name in tags_names:
-        try:
-            tag = get_or_create_tag(tag_name)
-        except ValueError as e:
-            if str(e) == "Exceeded name length":
-                continue
-            log(
-                log.CRITICAL,
-                "Unexpected error [%s]",
-                str(e),
+def add_tag_usage(counter: sa.Column, tag_ids: list[int], sign: int = 1):
+    """Add sign to the counter and usage_count of the tags, once per tag id
+    occurrence. A single UPDATE per distinct number of links. Does not commit"""
+    by_delta: dict[int, list[int]] = {}
+    for tag_id, links in Counter(tag_ids).items():
+        by_delta.setdefault(links * sign, []).append(tag_id)
+    for delta, ids in by_delta.items():
+        db.session.execute(
+            sa.update(m.Tag)
+            .where(m.Tag.id.in_(ids))
+            .values(
+                {
+                    counter: counter + delta,
+                    m.Tag.usage_count: m.Tag.usage_count + delta,
+                }
             )
-            raise e
-
-        book_tag = m.BookTags(tag_id=tag.id, book_id=book.id)
-        log(log.INFO, "Create BookTag: [%s]", book_tag)
-        book_tag.save(False)
-    db.session.commit()
-
+            .execution_options(synchronize_session=False)
+        )
 
-def set_comment_tags(comment: m.Comment, tags: list[str]):
-    comment_tags = m.CommentTags.query.filter_by(comment_id=comment.id).all()
-    for tag in comment_tags:
-        db.session.delete(tag)
-    tags_names = [tag.lower().replace("#", "") for tag in tags]
 
-    for tag_name in set(tags_names):
+def _set_tags(link_model, target_field: sa.Column, target_id: int, counter, names):
+    """Make the target linked to exactly the named tags. Only removed and added
+    links are written and counters of their tags move by one. Commits"""
+    tag_ids: list[int] = []
+    for tag_name in names:
         try:
             tag = get_or_create_tag(tag_name)
         except ValueError as e:
@@ -64,37 +64,126 @@ def set_comment_tags(comment: m.Comment, tags: list[str]):
                 str(e),
             )
             raise e
+        if tag.id not in tag_ids:
+            tag_ids.append(tag.id)
 
-        comment_tag = m.CommentTags(tag_id=tag.id, comment_id=comment.id)
-        log(log.INFO, "Create CommentTags: [%s]", comment_tag)
-        comment_tag.save(False)
+    links = db.session.execute(
+        sa.select(link_model.id, link_model.tag_id).where(target_field == target_id)
+    ).all()
+    linked: set[int] = set()
+    removed_links: list[int] = []
+    removed_tags: list[int] = []
+    for link_id, tag_id in links:
+        if tag_id in tag_ids and tag_id not in linked:
+            linked.add(tag_id)
+        else:
+            removed_links.append(link_id)
+            removed_tags.append(tag_id)
+    added_tags = [tag_id for tag_id in tag_ids if tag_id not in linked]
+
+    if removed_links:
+        log(log.INFO, "Delete [%s] links [%s]", link_model.__name__, removed_links)
+        db.session.execute(
+            sa.delete(link_model)
+            .where(link_model.id.in_(removed_links))
+            .execution_options(synchronize_session=False)
+        )
+        add_tag_usage(counter, removed_tags, -1)
+    if added_tags:
+        log(log.INFO, "Create [%s] for tags [%s]", link_model.__name__, added_tags)
+        db.session.execute(
+            sa.insert(link_model),
+            [{"tag_id": tag_id, target_field.key: target_id} for tag_id in added_tags],
+        )
+        add_tag_usage(counter, added_tags)
     db.session.commit()
 
 
-def set_interpretation_tags(interpretation: m.InterpretationTag, tags: list[str]):
-    interpretation_tags = m.InterpretationTag.query.filter_by(
-        interpretation_id=interpretation.id
-    ).all()
-    for tag in interpretation_tags:
-        db.session.delete(tag)
-    tags_names = [tag.lower().replace("#", "") for tag in tags]
+def set_book_tags(book: m.Book, tags: str):
+    _set_tags(
+        m.BookTags,
+        m.BookTags.book_id,
+        book.id,
+        m.Tag.books_count,
+        [tag.lower() for tag in tags.split(",") if len(tag)],
+    )
 
-    for tag_name in tags_names:
-        try:
-            tag = get_or_create_tag(tag_name)
-        except ValueError as e:
-            if str(e) == "Exceeded name length":
-                continue
-            log(
-                log.CRITICAL,
-                "Unexpected error [%s]",
-                str(e),
-            )
-            raise e
 
-        interpretation_tag = m.InterpretationTag(
-            tag_id=tag.id, interpretation_id=interpretation.id
+def set_comment_tags(comment: m.Comment, tags: list[str]):
+    _set_tags(
+        m.CommentTags,
+        m.CommentTags.comment_id,
+        comment.id,
+        m.Tag.comments_count,
+        [tag.lower().replace("#", "") for tag in tags],
+    )
+
+
+def set_interpretation_tags(interpretation: m.Interpretation, tags: list[str]):
+    _set_tags(
+        m.InterpretationTag,
+        m.InterpretationTag.interpretation_id,
+        interpretation.id,
+        m.Tag.interpretations_count,
+        [tag.lower().replace("#", "") for tag in tags],
+    )
+
+
+def recount_tag_usage() -> int:
+    """Set the counters of all tags from the link tables, for data written
+    around app/controllers/tags.py. Returns number of tags"""
+    counters = {}
+    for counter, link_model in (
+        (m.Tag.books_count, m.BookTags),
+        (m.Tag.interpretations_count, m.InterpretationTag),
+        (m.Tag.comments_count, m.CommentTags),
+        (m.Tag.sections_count, m.SectionTag),
+    ):
+        counters[counter] = (
+            sa.select(sa.func.count(link_model.id))
+            .where(link_model.tag_id == m.Tag.id)
+            .scalar_subquery()
         )
-        log(log.INFO, "Create InterpretationTag: [%s]", interpretation_tag)
-        interpretation_tag.save(False)
+    db.session.execute(
+        sa.update(m.Tag).values(counters).execution_options(synchronize_session=False)
+    )
+    db.session.execute(
+        sa.update(m.Tag)
+        .values(
+            usage_count=m.Tag.books_count
+            + m.Tag.interpretations_count
+            + m.Tag.comments_count
+            + m.Tag.sections_count
+        )
+        .execution_options(synchronize_session=False)
+    )
     db.session.commit()
+    return db.session.scalar(sa.select(sa.func.count(m.Tag.id)))
+
+
+def top_tags(limit: int = TOP_TAGS_LIMIT) -> list[dict]:
+    """Most used tags for tag clouds, read from the counters and cached
+    until any tag changes"""
+    limit = max(1, min(limit, TOP_TAGS_LIMIT))
+    cache = get_result_cache()
+    key = f"top_tags:{limit}"
+    result = cache.get(key, {"tags"})
+    if result is not None:
+        return result
+
+    tags = db.session.execute(
+        sa.select(m.Tag.name, m.Tag.usage_count)
+        .where(m.Tag.usage_count > 0)
+        .order_by(m.Tag.usage_count.desc(), m.Tag.id.desc())
+        .limit(limit)
+    ).all()
+    result = [
+        {
+            "name": name,
+            "count": usage_count,
+            "url": url_for("search.tag_search_interpretations", tag_name=name),
+        }
+        for name, usage_count in tags
+    ]
+    cache.put(key, {"tags"}, result)
+    return result
@@ -0,0 +1,105 @@
+import math
+import re
+import sqlite3
+
+import sqlalchemy as sa
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app import db
+from app.models.utils import trigram_table_name
+
+# pg_trgm.similarity_threshold default, used by the % operator
+SIMILARITY_THRESHOLD = 0.3
+WORD_REGEX = re.compile(r"[^\W_]+")
+
+
+def trigrams(text: str) -> set[str]:
+    """Trigrams of the words of text the same way as pg_trgm makes them"""
+    result = set()
+    for word in WORD_REGEX.findall(text.lower()):
+        padded = f"  {word} "
+        result.update(map("".join, zip(padded, padded[1:], padded[2:])))
+    return result
+
+
+def similarity(text: str | None, other: str | None) -> float:
+    """pg_trgm similarity(): share of common trigrams of two strings"""
+    if not text or not other:
+        return 0.0
+    text_trigrams, other_trigrams = trigrams(text), trigrams(other)
+    if not text_trigrams or not other_trigrams:
+        return 0.0
+    return len(text_trigrams & other_trigrams) / len(text_trigrams | other_trigrams)
+
+
+@event.listens_for(Engine, "connect")
+def add_sqlite_similarity(dbapi_connection, _connection_record):
+    if isinstance(dbapi_connection, sqlite3.Connection):
+        dbapi_connection.create_function(
+            "similarity", 2, similarity, deterministic=True
+        )
+
+
+def _like_pattern(q: str) -> str:
+    escaped = q.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+def _fts_string(text: str) -> str:
+    return '"' + text.replace('"', '""') + '"'
+
+
+def _sqlite_trigram_ids(column: sa.Column, fts_query: str) -> sa.Select:
+    table_name = trigram_table_name(column)
+    trigram_table = sa.table(table_name, sa.column("rowid"))
+    return sa.select(trigram_table.c.rowid).where(
+        sa.literal_column(table_name).op("MATCH")(sa.literal(fts_query))
+    )
+
+
+def _sqlite_similar_ids(column: sa.Column, q: str) -> sa.Select:
+    """Ids of rows sharing enough trigrams with q to be similar,
+    like pg_trgm GIN index does before the similarity check"""
+    q_trigrams = sorted({"".join(chars) for chars in zip(q, q[1:], q[2:])})
+    shared = sa.union_all(
+        *[_sqlite_trigram_ids(column, _fts_string(trigram)) for trigram in q_trigrams]
+    ).subquery()
+    return (
+        sa.select(shared.c.rowid)
+        .group_by(shared.c.rowid)
+        .having(
+            sa.func.count() >= max(1, math.ceil(SIMILARITY_THRESHOLD * len(q_trigrams)))
+        )
+    )
+
+
+def trigram_match(column: sa.Column, q: str, fuzzy: bool = False):
+    """Condition of rows which column contains q, case insensitive.
+
+    With fuzzy also the rows similar to q, for typos in typeahead.
+    Served by the index of add_trigram_index
+    """
+    q = q.lower()
+    lower_column = sa.func.lower(column)
+    contains = lower_column.like(_like_pattern(q), escape="\\")
+    if db.engine.dialect.name == "postgresql":
+        if fuzzy:
+            return sa.or_(contains, lower_column.op("%")(q))
+        return contains
+
+    if len(q) < 3:
+        # shorter than a trigram, can't be looked up in the index
+        return contains
+    ids = column.table.c.id
+    if not fuzzy:
+        return ids.in_(_sqlite_trigram_ids(column, _fts_string(q)))
+    return sa.and_(
+        ids.in_(_sqlite_similar_ids(column, q)),
+        sa.or_(contains, sa.func.similarity(lower_column, q) >= SIMILARITY_THRESHOLD),
+    )
+
+
+def trigram_rank(column: sa.Column, q: str):
+    """Similarity of column to q, bigger is closer"""
+    return sa.func.similarity(sa.func.lower(column), q.lower())
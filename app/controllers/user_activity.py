@@ -0,0 +1,56 @@
+from datetime import datetime
+
+from app import models as m, db
+from app.controllers.loader_profiles import with_profile
+from app.controllers.pagination import Page, keyset_page
+from app.controllers.vote import dialect_insert
+
+# user_activity keeps the first contribution of a user to an interpretation:
+# writing it, commenting on it or voting for it. Rows are never changed, so my
+# contributions are read from the (user_id, created_at) index, and the number
+# of rows read depends on the user only, not on the size of the site
+
+# (sort key, id) pairs of my contributions
+CONTRIBUTION_ORDERINGS = {
+    "recent": (m.UserActivity.created_at, m.UserActivity.id),
+    "upvoted": (m.Interpretation.score, m.Interpretation.id),
+    "commented": (m.Interpretation.comments_count, m.Interpretation.id),
+}
+DEFAULT_ORDERING = "recent"
+
+
+def add_user_activity(user_id: int, interpretation_id: int, kind: m.UserActivity.Kinds):
+    """Log the contribution unless the user has contributed to the
+    interpretation before. Does not commit"""
+    db.session.execute(
+        dialect_insert(m.UserActivity.__table__)
+        .values(
+            user_id=user_id,
+            interpretation_id=interpretation_id,
+            kind=kind,
+            created_at=datetime.now(),
+            is_deleted=False,
+        )
+        .on_conflict_do_nothing()
+    )
+
+
+def user_contributions(user_id: int, sort: str | None, profile: str) -> Page:
+    """Page of active interpretations the user contributed to, the biggest
+    sort key first, loaded by the loader profile"""
+    keyset = CONTRIBUTION_ORDERINGS.get(sort, CONTRIBUTION_ORDERINGS[DEFAULT_ORDERING])
+    query = (
+        db.session.query(m.Interpretation, *keyset)
+        .join(
+            m.UserActivity,
+            m.UserActivity.interpretation_id == m.Interpretation.id,
+        )
+        .filter(
+            m.UserActivity.user_id == user_id,
+            m.Interpretation.is_deleted.is_(False),
+            m.Interpretation.copy_of == 0,
+        )
+    )
+    page = keyset_page(with_profile(query, profile), list(keyset), descending=True)
+    page.items = [row[0] for row in page.items]
+    return page
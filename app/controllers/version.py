@@ -1,11 +1,16 @@
-from flask_login import current_user
+from typing import Callable
 
-from app import models as m
+from app import models as m, db
 from app.logger import log
-from .recursive_copy_functions import recursive_copy_collection
+from .version_copy import copy_version_content
 
 
-def create_new_version(book: m.Book, semver: str):
+def create_new_version(
+    book: m.Book,
+    semver: str,
+    user: m.User,
+    on_create: Callable[[m.BookVersion], None] = None,
+):
     book_active_version: m.BookVersion = book.active_version
     book_root_collection: m.Collection = book_active_version.root_collection
 
@@ -13,19 +18,23 @@ def create_new_version(book: m.Book, semver: str):
         semver=semver,
         derivative_id=book.active_version.id,
         book_id=book.id,
-        user_id=current_user.id,
+        user_id=user.id,
     )
     log(log.INFO, "Create new version for book [%s]", book)
-    version.save()
+    version.save(False, user)
+    db.session.flush()
 
     root_collection = m.Collection(
         label="Root Collection",
         version_id=version.id,
         is_root=True,
         copy_of=book_root_collection.id,
-    ).save()
+    ).save(False)
+    db.session.flush()
 
-    for collection in book_root_collection.active_children:
-        recursive_copy_collection(collection, root_collection.id, version.id)
+    copy_version_content(book_active_version, version.id, root_collection.id)
+    db.session.commit()
+    if on_create:
+        on_create(version)
 
     return version
@@ -0,0 +1,293 @@
+from sqlalchemy import and_, insert, update, select
+
+from app import models as m, db
+from app.logger import log
+from app.controllers.featured_interpretation import choose_featured_interpretation
+from app.controllers.home_feed import recount_comments
+from app.controllers.tags import add_tag_usage
+
+
+def _bulk_insert(model, rows: list[dict]):
+    if rows:
+        db.session.execute(insert(model), rows)
+
+
+def _bulk_copy(model, rows: list[dict], copies_filter) -> dict[int, int]:
+    """INSERT copies in one executemany. Every row has copy_of set to the source id,
+    so the copies are read back by copies_filter. Returns {source id: copy id}"""
+    if not rows:
+        return {}
+    _bulk_insert(model, rows)
+    return dict(
+        db.session.execute(select(model.copy_of, model.id).where(copies_filter)).all()
+    )
+
+
+def copy_version_content(
+    version: m.BookVersion,
+    target_version_id: int,
+    target_root_id: int,
+    access_group_ids: list[int] = None,
+    add_copy_of: bool = True,
+) -> dict[str, int]:
+    """Copy collections, sections, featured interpretations, approved comments,
+    their tags and access groups of the version under the target root collection.
+
+    Works with whole sets of rows: a fixed number of queries per tree level
+    instead of a few commits per entity. Does not commit.
+    Returns number of copied entities
+    """
+    access_group_ids = access_group_ids or []
+    target_book_id = db.session.scalar(
+        select(m.BookVersion.book_id).where(m.BookVersion.id == target_version_id)
+    )
+    log(log.INFO, "Copy content of version [%s] to [%s]", version, target_version_id)
+
+    collections: list[m.Collection] = m.Collection.query.filter_by(
+        version_id=version.id, is_deleted=False
+    ).all()
+    sections: list[m.Section] = (
+        m.Section.query.filter_by(version_id=version.id, is_deleted=False)
+        .order_by(m.Section.id)
+        .all()
+    )
+    version_section_ids = select(m.Section.id).where(m.Section.version_id == version.id)
+    interpretations: list[m.Interpretation] = (
+        m.Interpretation.query.filter(
+            m.Interpretation.section_id.in_(version_section_ids),
+            m.Interpretation.is_deleted.is_(False),
+        )
+        .order_by(m.Interpretation.id)
+        .all()
+    )
+
+    children: dict[int, list[m.Collection]] = {}
+    root = None
+    for collection in collections:
+        if collection.is_root:
+            root = collection
+        else:
+            children.setdefault(collection.parent_id, []).append(collection)
+    sections_by_collection: dict[int, list[m.Section]] = {}
+    for section in sections:
+        sections_by_collection.setdefault(section.collection_id, []).append(section)
+    interpretations_by_section: dict[int, list[m.Interpretation]] = {}
+    for interpretation in interpretations:
+        interpretations_by_section.setdefault(interpretation.section_id, []).append(
+            interpretation
+        )
+
+    target_collections = and_(
+        m.Collection.version_id == target_version_id, m.Collection.is_root.is_(False)
+    )
+    target_sections = m.Section.version_id == target_version_id
+    target_interpretations = m.Interpretation.section_id.in_(
+        select(m.Section.id).where(target_sections)
+    )
+    target_comments = m.Comment.interpretation_id.in_(
+        select(m.Interpretation.id).where(target_interpretations)
+    )
+
+    # collections, level by level so parent ids are already known
+    collection_ids: dict[int, int] = {}
+    copied_sections: list[m.Section] = []
+    level = children.get(root.id, []) if root else []
+    while level:
+        collection_ids.update(
+            _bulk_copy(
+                m.Collection,
+                [
+                    dict(
+                        label=collection.label,
+                        about=collection.about,
+                        is_root=collection.is_root,
+                        is_leaf=collection.is_leaf,
+                        position=collection.position,
+                        parent_id=target_root_id
+                        if collection.parent_id == root.id
+                        else collection_ids[collection.parent_id],
+                        version_id=target_version_id,
+                        copy_of=collection.id,
+                    )
+                    for collection in level
+                ],
+                target_collections,
+            )
+        )
+        next_level = []
+        for collection in level:
+            # collection with sections is a leaf, its sub collections are not copied
+            if collection.id in sections_by_collection:
+                copied_sections += sections_by_collection[collection.id]
+            else:
+                next_level += children.get(collection.id, [])
+        level = next_level
+
+    section_ids = _bulk_copy(
+        m.Section,
+        [
+            dict(
+                label=section.label,
+                collection_id=collection_ids[section.collection_id],
+                user_id=section.user_id,
+                version_id=target_version_id,
+                position=section.position,
+                copy_of=section.id,
+            )
+            for section in copied_sections
+        ],
+        target_sections,
+    )
+
+    # only featured interpretation of a section is copied
+    featured: list[m.Interpretation] = []
+    for section in copied_sections:
+        section_interpretations = interpretations_by_section.get(section.id, [])
+        interpretation = next(
+            (
+                interpretation
+                for interpretation in section_interpretations
+                if interpretation.id == section.featured_interpretation_id
+            ),
+            None,
+        ) or choose_featured_interpretation(section_interpretations)
+        if interpretation:
+            featured.append(interpretation)
+    interpretation_ids = _bulk_copy(
+        m.Interpretation,
+        [
+            dict(
+                text=interpretation.text,
+                plain_text=interpretation.plain_text,
+                approved=interpretation.approved,
+                user_id=interpretation.user_id,
+                section_id=section_ids[interpretation.section_id],
+                version_id=target_version_id,
+                book_id=target_book_id,
+                copy_of=interpretation.id,
+            )
+            for interpretation in featured
+        ],
+        target_interpretations,
+    )
+    if featured:
+        db.session.execute(
+            update(m.Section),
+            [
+                dict(
+                    id=section_ids[interpretation.section_id],
+                    featured_interpretation_id=interpretation_ids[interpretation.id],
+                )
+                for interpretation in featured
+            ],
+        )
+
+    # approved comments of all section interpretations go to the featured copy
+    section_of_interpretation = {
+        interpretation.id: interpretation.section_id
+        for interpretation in interpretations
+    }
+    featured_of_section = {
+        interpretation.section_id: interpretation_ids[interpretation.id]
+        for interpretation in featured
+    }
+    comments: list[m.Comment] = (
+        m.Comment.query.join(
+            m.Interpretation, m.Interpretation.id == m.Comment.interpretation_id
+        )
+        .filter(
+            m.Interpretation.section_id.in_(version_section_ids),
+            m.Interpretation.is_deleted.is_(False),
+            m.Comment.approved.is_(True),
+            m.Comment.is_deleted.is_(False),
+        )
+        .order_by(m.Comment.id)
+        .all()
+    )
+    comment_ids = _bulk_copy(
+        m.Comment,
+        [
+            dict(
+                text=comment.text,
+                approved=comment.approved,
+                edited=comment.edited,
+                user_id=comment.user_id,
+                interpretation_id=featured_of_section[
+                    section_of_interpretation[comment.interpretation_id]
+                ],
+                version_id=target_version_id,
+                book_id=target_book_id,
+                copy_of=comment.id,
+            )
+            for comment in comments
+            if section_of_interpretation[comment.interpretation_id]
+            in featured_of_section
+        ],
+        target_comments,
+    )
+    recount_comments(target_interpretations)
+
+    if not add_copy_of:
+        for model, copies_filter in (
+            (m.Collection, target_collections),
+            (m.Section, target_sections),
+            (m.Interpretation, target_interpretations),
+            (m.Comment, target_comments),
+        ):
+            db.session.execute(
+                update(model)
+                .where(copies_filter)
+                .values(copy_of=0)
+                .execution_options(synchronize_session=False)
+            )
+
+    # tags
+    for tag_model, field, ids, counter in (
+        (m.SectionTag, "section_id", section_ids, m.Tag.sections_count),
+        (
+            m.InterpretationTag,
+            "interpretation_id",
+            interpretation_ids,
+            m.Tag.interpretations_count,
+        ),
+        (m.CommentTags, "comment_id", comment_ids, m.Tag.comments_count),
+    ):
+        if not ids:
+            continue
+        tag_links = db.session.execute(
+            select(tag_model.tag_id, getattr(tag_model, field)).where(
+                getattr(tag_model, field).in_(list(ids))
+            )
+        ).all()
+        _bulk_insert(
+            tag_model,
+            [
+                {"tag_id": tag_id, field: ids[entity_id]}
+                for tag_id, entity_id in tag_links
+            ],
+        )
+        add_tag_usage(counter, [tag_id for tag_id, _ in tag_links])
+
+    # access groups
+    for access_group_model, field, ids in (
+        (m.CollectionAccessGroups, "collection_id", collection_ids),
+        (m.SectionAccessGroups, "section_id", section_ids),
+        (m.InterpretationAccessGroups, "interpretation_id", interpretation_ids),
+    ):
+        _bulk_insert(
+            access_group_model,
+            [
+                {field: entity_id, "access_group_id": access_group_id}
+                for entity_id in ids.values()
+                for access_group_id in access_group_ids
+            ],
+        )
+
+    copied = dict(
+        collections=len(collection_ids),
+        sections=len(section_ids),
+        interpretations=len(interpretation_ids),
+        comments=len(comment_ids),
+    )
+    log(log.INFO, "Copied [%s]", copied)
+    return copied
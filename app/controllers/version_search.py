@@ -0,0 +1,205 @@
+import sqlalchemy as sa
+from flask import url_for
+
+from app import models as m, db
+from app.logger import log
+from app.controllers.search_backend import (
+    get_search_backend,
+    highlight,
+    parse_query,
+)
+
+# Search inside one version of a book over search_documents, see
+# app/controllers/search_index.py. A page costs the same number of queries
+# for any number of hits: matches, snippets, and one query per level of
+# the breadcrumb paths (interpretations, sections, collection ancestors)
+
+Kinds = m.SearchDocument.Kinds
+
+
+def _collection_ancestors(collection_ids: set[int]) -> dict[int, sa.Row]:
+    """Collections and all their parents by id, in one recursive query"""
+    if not collection_ids:
+        return {}
+    tree = (
+        sa.select(
+            m.Collection.id,
+            m.Collection.parent_id,
+            m.Collection.label,
+            m.Collection.is_root,
+        )
+        .where(m.Collection.id.in_(collection_ids))
+        .cte("ancestors", recursive=True)
+    )
+    tree = tree.union(
+        sa.select(
+            m.Collection.id,
+            m.Collection.parent_id,
+            m.Collection.label,
+            m.Collection.is_root,
+        ).join(tree, m.Collection.id == tree.c.parent_id)
+    )
+    return {row.id: row for row in db.session.execute(sa.select(tree))}
+
+
+def _collections_url(book: m.Book, version: m.BookVersion) -> str:
+    if version.id == book.active_version_id:
+        return url_for("book.collection_view", book_id=book.id)
+    version_index = [v.id for v in book.actual_versions].index(version.id) + 1
+    return url_for("book.collection_view", book_id=book.id, version_index=version_index)
+
+
+def _paths(book: m.Book, collections_url: str, documents: list) -> list[list]:
+    """Breadcrumbs from the top level collection to the parent of every
+    document, as lists of {"label", "url"}"""
+    interpretation_ids = [
+        d.entity_id for d in documents if d.kind == Kinds.INTERPRETATION
+    ]
+    section_of: dict[int, int] = {}
+    if interpretation_ids:
+        section_of = dict(
+            db.session.execute(
+                sa.select(m.Interpretation.id, m.Interpretation.section_id).where(
+                    m.Interpretation.id.in_(interpretation_ids)
+                )
+            ).all()
+        )
+
+    section_ids = {d.entity_id for d in documents if d.kind == Kinds.SECTION}
+    section_ids.update(section_of.values())
+    sections: dict[int, sa.Row] = {}
+    if section_ids:
+        sections = {
+            row.id: row
+            for row in db.session.execute(
+                sa.select(m.Section.id, m.Section.collection_id, m.Section.label).where(
+                    m.Section.id.in_(section_ids)
+                )
+            )
+        }
+
+    collection_ids = {d.entity_id for d in documents if d.kind == Kinds.COLLECTION}
+    collection_ids.update(row.collection_id for row in sections.values())
+    collections = _collection_ancestors(collection_ids)
+
+    def collection_path(collection_id: int) -> list[dict]:
+        path = []
+        collection = collections.get(collection_id)
+        while collection and not collection.is_root:
+            path.append(
+                {
+                    "label": collection.label,
+                    "url": f"{collections_url}#collection-{collection.label}",
+                }
+            )
+            collection = collections.get(collection.parent_id)
+        return path[::-1]
+
+    def section_path(section_id: int) -> list[dict]:
+        section = sections.get(section_id)
+        if not section:
+            return []
+        return collection_path(section.collection_id)
+
+    paths = []
+    for document in documents:
+        match document.kind:
+            case Kinds.COLLECTION:
+                collection = collections.get(document.entity_id)
+                path = collection_path(collection.parent_id) if collection else []
+            case Kinds.SECTION:
+                path = section_path(document.entity_id)
+            case _:
+                section_id = section_of.get(document.entity_id)
+                path = section_path(section_id)
+                if section_id in sections:
+                    path.append(
+                        {
+                            "label": sections[section_id].label,
+                            "url": url_for(
+                                "book.interpretation_view",
+                                book_id=book.id,
+                                section_id=section_id,
+                            ),
+                        }
+                    )
+        paths.append(path)
+    return paths
+
+
+def _url(book: m.Book, collections_url: str, document) -> str:
+    match document.kind:
+        case Kinds.COLLECTION:
+            return f"{collections_url}#collection-{document.title}"
+        case Kinds.SECTION:
+            return url_for(
+                "book.interpretation_view",
+                book_id=book.id,
+                section_id=document.entity_id,
+            )
+        case _:
+            return url_for(
+                "book.qa_view", book_id=book.id, interpretation_id=document.entity_id
+            )
+
+
+def search_version(
+    book: m.Book, version: m.BookVersion, q: str, page: int = 1, per_page: int = 10
+) -> dict:
+    """Collections, sections and interpretations of the version matching q,
+    the most relevant first. Returns {"hits", "page", "has_next"}"""
+    result = {"hits": [], "page": page, "has_next": False}
+    terms = parse_query(q)
+    if not terms:
+        return result
+
+    backend = get_search_backend()
+    matches = backend.document_matches(terms, version.id)
+    documents = db.session.execute(
+        sa.select(
+            m.SearchDocument.id,
+            m.SearchDocument.kind,
+            m.SearchDocument.entity_id,
+            m.SearchDocument.title,
+        )
+        .join(matches, matches.c.id == m.SearchDocument.id)
+        .where(
+            m.SearchDocument.version_id == version.id,
+            m.SearchDocument.kind != Kinds.BOOK,
+        )
+        .order_by(matches.c.rank.desc(), m.SearchDocument.id)
+        .limit(per_page + 1)
+        .offset((page - 1) * per_page)
+    ).all()
+    if len(documents) > per_page:
+        documents = documents[:per_page]
+        result["has_next"] = True
+    if not documents:
+        return result
+
+    snippets = dict(
+        db.session.execute(
+            backend.document_snippets(terms, [d.id for d in documents])
+        ).all()
+    )
+    collections_url = _collections_url(book, version)
+    paths = _paths(book, collections_url, documents)
+    result["hits"] = [
+        {
+            "kind": document.kind.name.lower(),
+            "id": document.entity_id,
+            "title": document.title,
+            "snippet": str(highlight(snippets.get(document.id) or "")),
+            "url": _url(book, collections_url, document),
+            "path": path,
+        }
+        for document, path in zip(documents, paths)
+    ]
+    log(
+        log.INFO,
+        "Found [%d] documents in version [%s] by [%s]",
+        len(documents),
+        version.id,
+        q,
+    )
+    return result
@@ -0,0 +1,133 @@
+from datetime import datetime
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql, sqlite
+
+from app import models as m, db
+from app.logger import log
+
+
+def dialect_insert(table: sa.Table):
+    """INSERT of the database dialect, with on_conflict_do_nothing()"""
+    if db.engine.dialect.name == "postgresql":
+        return postgresql.insert(table)
+    return sqlite.insert(table)
+
+
+def toggle_interpretation_vote(
+    interpretation_id: int, user_id: int, positive: bool
+) -> bool | None:
+    return _toggle_vote(
+        m.InterpretationVote,
+        m.InterpretationVote.interpretation_id,
+        m.Interpretation,
+        interpretation_id,
+        user_id,
+        positive,
+    )
+
+
+def toggle_comment_vote(comment_id: int, user_id: int, positive: bool) -> bool | None:
+    return _toggle_vote(
+        m.CommentVote,
+        m.CommentVote.comment_id,
+        m.Comment,
+        comment_id,
+        user_id,
+        positive,
+    )
+
+
+def _toggle_vote(
+    vote_model: type[m.InterpretationVote] | type[m.CommentVote],
+    target_field: sa.Column,
+    target_model: type[m.Interpretation] | type[m.Comment],
+    target_id: int,
+    user_id: int,
+    positive: bool,
+) -> bool | None:
+    """Toggle user vote and update target up_votes/down_votes in place.
+
+    Same vote again removes it, opposite vote flips it. Every write is
+    conditional, so concurrent requests can not count a vote twice.
+    Does not commit. Returns current user vote
+    """
+    current: bool | None = db.session.execute(
+        sa.select(vote_model.positive).where(
+            vote_model.user_id == user_id, target_field == target_id
+        )
+    ).scalar()
+
+    up = down = 0
+    if current is None:
+        result = db.session.execute(
+            dialect_insert(vote_model.__table__)
+            .values(
+                {
+                    vote_model.user_id.key: user_id,
+                    target_field.key: target_id,
+                    vote_model.positive.key: positive,
+                }
+            )
+            .on_conflict_do_nothing()
+        )
+        if result.rowcount:
+            up, down = (1, 0) if positive else (0, 1)
+        user_vote = positive
+    elif current == positive:
+        result = db.session.execute(
+            sa.delete(vote_model).where(
+                vote_model.user_id == user_id,
+                target_field == target_id,
+                vote_model.positive == positive,
+            )
+        )
+        if result.rowcount:
+            up, down = (-1, 0) if positive else (0, -1)
+        user_vote = None
+    else:
+        result = db.session.execute(
+            sa.update(vote_model)
+            .where(
+                vote_model.user_id == user_id,
+                target_field == target_id,
+                vote_model.positive == current,
+            )
+            .values(positive=positive)
+        )
+        if result.rowcount:
+            up, down = (1, -1) if positive else (-1, 1)
+        user_vote = positive
+
+    if up or down:
+        values = {
+            target_model.up_votes: target_model.up_votes + up,
+            target_model.down_votes: target_model.down_votes + down,
+        }
+        if hasattr(target_model, "score"):
+            values[target_model.score] = target_model.score + up - down
+        db.session.execute(
+            sa.update(target_model).where(target_model.id == target_id).values(values)
+        )
+        # votes count as activity of the book
+        db.session.execute(
+            sa.update(m.BookStats)
+            .where(
+                m.BookStats.book_id
+                == sa.select(target_model.book_id)
+                .where(target_model.id == target_id)
+                .scalar_subquery()
+            )
+            .values(last_activity_at=datetime.now())
+            .execution_options(synchronize_session=False)
+        )
+        log(
+            log.INFO,
+            "Votes of [%s:%s] changed: up [%+d] down [%+d]",
+            target_model.__name__,
+            target_id,
+            up,
+            down,
+        )
+
+    return user_vote
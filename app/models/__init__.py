@@ -1,6 +1,7 @@
 # flake8: noqa F401
 from .user import User, AnonymousUser, gen_uniq_id
 from .book import Book
+from .book_stats import BookStats
 from .books_stars import BookStar
 from .book_contributor import BookContributor
 from .book_version import BookVersion
@@ -26,3 +27,7 @@ from .permission import (
 from .book_tag import BookTags
 from .section_tag import SectionTag
 from .notification import Notification
+from .job import Job
+from .search_document import SearchDocument
+from .interpretation_ranking import InterpretationRanking
+from .user_activity import UserActivity
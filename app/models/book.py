@@ -1,12 +1,20 @@
 from flask_login import current_user
-from sqlalchemy import and_
 
 from app import db, models as m
-from app.models.utils import BaseModel
+from app.models.utils import BaseModel, add_trigram_index
 
 
 class Book(BaseModel):
     __tablename__ = "books"
+    __table_args__ = (
+        # book listings, see app/controllers/book_stats.py
+        db.Index(
+            "ix_books_active_created_at_id",
+            "created_at",
+            "id",
+            postgresql_where=db.text("is_deleted = false"),
+        ),
+    )
 
     label = db.Column(db.String(256), unique=False, nullable=False)
     about = db.Column(db.Text, unique=False, nullable=True)
@@ -14,12 +22,27 @@ class Book(BaseModel):
     # Foreign keys
     user_id = db.Column(db.ForeignKey("users.id"))
     original_book_id = db.Column(db.ForeignKey("books.id"))
+    active_version_id = db.Column(
+        db.ForeignKey(
+            "book_versions.id",
+            use_alter=True,
+            name="fk_books_active_version_id",
+        ),
+        index=True,
+    )
 
     # Relationships
     owner = db.relationship("User", viewonly=True)
     stars = db.relationship("User", secondary="books_stars", back_populates="stars")
     contributors = db.relationship("BookContributor")
-    versions = db.relationship("BookVersion", order_by="asc(BookVersion.id)")
+    versions = db.relationship(
+        "BookVersion",
+        order_by="asc(BookVersion.id)",
+        foreign_keys="BookVersion.book_id",
+    )
+    active_version = db.relationship(
+        "BookVersion", foreign_keys=[active_version_id], post_update=True
+    )
     list_access_groups = db.relationship(
         "AccessGroup"
     )  # all access_groups in current book(in nested entities)
@@ -32,6 +55,7 @@ class Book(BaseModel):
         secondary="book_tags",
         back_populates="books",
     )
+    stats = db.relationship("BookStats", uselist=False, viewonly=True)
     forks = db.relationship(
         "Book",
         backref=db.backref("original_book", remote_side="Book.id"),
@@ -39,16 +63,15 @@ class Book(BaseModel):
         order_by="asc(Book.id)",
     )
 
+    # values of the book card, loaded with the listing by the "book_card"
+    # profile of app/controllers/loader_profiles.py
+    card_has_star = db.query_expression()
+    card_interpretations_count = db.query_expression()
+    card_approved_comments_count = db.query_expression()
+
     def __repr__(self):
         return f"<{self.id}: {self.label}>"
 
-    @property
-    def active_version(self):
-        for version in self.versions:
-            if version.is_active:
-                return version
-        raise ValueError("No active version found")
-
     @property
     def actual_versions(self):
         versions = (
@@ -66,6 +89,8 @@ class Book(BaseModel):
 
     @property
     def current_user_has_star(self):
+        if "card_has_star" not in db.inspect(self).unloaded:
+            return self.card_has_star
         if current_user.is_authenticated:
             book_star: m.BookStar = m.BookStar.query.filter_by(
                 user_id=current_user.id, book_id=self.id
@@ -76,23 +101,17 @@ class Book(BaseModel):
     @property
     def approved_comments(self):
         comments = (
-            db.session.query(
-                m.Comment,
-            )
+            m.Comment.query.join(m.Comment.interpretation)
+            .join(m.Interpretation.section)
+            .join(m.Section.collection)
             .filter(
-                and_(
-                    m.BookVersion.id == self.active_version.id,
-                    m.Section.version_id == m.BookVersion.id,
-                    m.Collection.id == m.Section.collection_id,
-                    m.Interpretation.section_id == m.Section.id,
-                    m.Comment.interpretation_id == m.Interpretation.id,
-                    m.Comment.approved.is_(True),
-                    m.Comment.is_deleted.is_(False),
-                    m.BookVersion.is_deleted.is_(False),
-                    m.Interpretation.is_deleted.is_(False),
-                    m.Section.is_deleted.is_(False),
-                    m.Collection.is_deleted.is_(False),
-                ),
+                m.Comment.version_id == self.active_version_id,
+                m.Comment.approved.is_(True),
+                m.Comment.is_deleted.is_(False),
+                # content of deleted parents is hidden until they are restored
+                m.Interpretation.is_deleted.is_(False),
+                m.Section.is_deleted.is_(False),
+                m.Collection.is_deleted.is_(False),
             )
             .order_by(m.Comment.created_at.desc())
             .all()
@@ -103,21 +122,14 @@ class Book(BaseModel):
     @property
     def approved_interpretations(self):
         interpretations = (
-            db.session.query(
-                m.Interpretation,
-            )
+            m.Interpretation.query.join(m.Interpretation.section)
+            .join(m.Section.collection)
             .filter(
-                and_(
-                    m.BookVersion.id == self.active_version.id,
-                    m.Section.version_id == m.BookVersion.id,
-                    m.Collection.id == m.Section.collection_id,
-                    m.Interpretation.section_id == m.Section.id,
-                    m.Interpretation.approved.is_(True),
-                    m.BookVersion.is_deleted.is_(False),
-                    m.Interpretation.is_deleted.is_(False),
-                    m.Section.is_deleted.is_(False),
-                    m.Collection.is_deleted.is_(False),
-                ),
+                m.Interpretation.version_id == self.active_version_id,
+                m.Interpretation.approved.is_(True),
+                m.Interpretation.is_deleted.is_(False),
+                m.Section.is_deleted.is_(False),
+                m.Collection.is_deleted.is_(False),
             )
             .order_by(m.Interpretation.created_at.desc())
             .all()
@@ -128,20 +140,13 @@ class Book(BaseModel):
     @property
     def interpretations(self):
         interpretations = (
-            db.session.query(
-                m.Interpretation,
-            )
+            m.Interpretation.query.join(m.Interpretation.section)
+            .join(m.Section.collection)
             .filter(
-                and_(
-                    m.BookVersion.id == self.active_version.id,
-                    m.Section.version_id == m.BookVersion.id,
-                    m.Collection.id == m.Section.collection_id,
-                    m.Interpretation.section_id == m.Section.id,
-                    m.BookVersion.is_deleted.is_(False),
-                    m.Interpretation.is_deleted.is_(False),
-                    m.Section.is_deleted.is_(False),
-                    m.Collection.is_deleted.is_(False),
-                ),
+                m.Interpretation.version_id == self.active_version_id,
+                m.Interpretation.is_deleted.is_(False),
+                m.Section.is_deleted.is_(False),
+                m.Collection.is_deleted.is_(False),
             )
             .order_by(m.Interpretation.created_at.desc())
             .all()
@@ -149,6 +154,21 @@ class Book(BaseModel):
 
         return interpretations
 
+    @property
+    def interpretations_count(self) -> int:
+        if "card_interpretations_count" not in db.inspect(self).unloaded:
+            return self.card_interpretations_count
+        return len(self.interpretations)
+
+    @property
+    def approved_comments_count(self) -> int:
+        if "card_approved_comments_count" not in db.inspect(self).unloaded:
+            return self.card_approved_comments_count
+        return len(self.approved_comments)
+
     @property
     def contributors_users(self):
         return [contributors.user for contributors in self.contributors]
+
+
+add_trigram_index(Book.__table__.c.label)
@@ -6,6 +6,9 @@ from app.models.utils import BaseModel
 
 class BookContributor(BaseModel):
     __tablename__ = "book_contributors"
+    __table_args__ = (
+        db.Index("ix_book_contributors_book_id_user_id", "book_id", "user_id"),
+    )
 
     class Roles(IntEnum):
         UNKNOWN = 0
@@ -15,7 +18,7 @@ class BookContributor(BaseModel):
     role = db.Column(db.Enum(Roles), default=Roles.MODERATOR)
 
     # Foreign keys
-    user_id = db.Column(db.Integer, db.ForeignKey("users.id"))
+    user_id = db.Column(db.Integer, db.ForeignKey("users.id"), index=True)
     book_id = db.Column(db.Integer, db.ForeignKey("books.id"))
 
     # Relationships
@@ -0,0 +1,51 @@
+from datetime import datetime
+
+from sqlalchemy import event, insert
+
+from app import db
+from app.models.book import Book
+from app.models.utils import BaseModel
+
+
+class BookStats(BaseModel):
+    """Counters of a book for the book listings, kept by
+    app/controllers/book_stats.py"""
+
+    __tablename__ = "book_stats"
+    __table_args__ = (
+        db.Index("ix_book_stats_stars_count_book_id", "stars_count", "book_id"),
+        db.Index(
+            "ix_book_stats_interpretations_count_book_id",
+            "interpretations_count",
+            "book_id",
+        ),
+        db.Index(
+            "ix_book_stats_last_activity_at_book_id", "last_activity_at", "book_id"
+        ),
+    )
+
+    stars_count = db.Column(db.Integer, default=0, server_default="0", nullable=False)
+    interpretations_count = db.Column(
+        db.Integer, default=0, server_default="0", nullable=False
+    )
+    comments_count = db.Column(
+        db.Integer, default=0, server_default="0", nullable=False
+    )
+    contributors_count = db.Column(
+        db.Integer, default=0, server_default="0", nullable=False
+    )
+    last_activity_at = db.Column(db.DateTime, default=datetime.now)
+
+    # Foreign keys
+    book_id = db.Column(db.ForeignKey("books.id"), unique=True, nullable=False)
+
+    def __repr__(self):
+        return f"<BookStats: {self.book_id}>"
+
+
+@event.listens_for(Book, "after_insert")
+def create_book_stats(_mapper, connection, target: Book):
+    """Every book has its stats row, so listings join it"""
+    connection.execute(
+        insert(BookStats).values(book_id=target.id, last_activity_at=target.created_at)
+    )
@@ -1,7 +1,5 @@
 from datetime import datetime
 
-from sqlalchemy import and_
-
 from app import db, models as m
 from app.models.utils import BaseModel
 
@@ -24,7 +22,7 @@ class BookVersion(BaseModel):
     # Relationships
     user = db.relationship("User", viewonly=True, foreign_keys=[user_id])
     updated_by_user = db.relationship("User", viewonly=True, foreign_keys=[updated_by])
-    book = db.relationship("Book", viewonly=True)
+    book = db.relationship("Book", viewonly=True, foreign_keys=[book_id])
     derivative = db.relationship("BookVersion", remote_side=[id])
     sections = db.relationship("Section", viewonly=True, order_by="desc(Section.id)")
     collections = db.relationship(
@@ -51,23 +49,17 @@ class BookVersion(BaseModel):
     @property
     def approved_comments(self):
         comments = (
-            db.session.query(
-                m.Comment,
-            )
+            m.Comment.query.join(m.Comment.interpretation)
+            .join(m.Interpretation.section)
+            .join(m.Section.collection)
             .filter(
-                and_(
-                    m.BookVersion.id == self.id,
-                    m.Section.version_id == m.BookVersion.id,
-                    m.Collection.id == m.Section.collection_id,
-                    m.Interpretation.section_id == m.Section.id,
-                    m.Comment.interpretation_id == m.Interpretation.id,
-                    m.Comment.approved.is_(True),
-                    m.Comment.is_deleted.is_(False),
-                    m.BookVersion.is_deleted.is_(False),
-                    m.Interpretation.is_deleted.is_(False),
-                    m.Section.is_deleted.is_(False),
-                    m.Collection.is_deleted.is_(False),
-                ),
+                m.Comment.version_id == self.id,
+                m.Comment.approved.is_(True),
+                m.Comment.is_deleted.is_(False),
+                # content of deleted parents is hidden until they are restored
+                m.Interpretation.is_deleted.is_(False),
+                m.Section.is_deleted.is_(False),
+                m.Collection.is_deleted.is_(False),
             )
             .order_by(m.Comment.created_at.desc())
             .all()
@@ -78,21 +70,14 @@ class BookVersion(BaseModel):
     @property
     def approved_interpretations(self):
         interpretations = (
-            db.session.query(
-                m.Interpretation,
-            )
+            m.Interpretation.query.join(m.Interpretation.section)
+            .join(m.Section.collection)
             .filter(
-                and_(
-                    m.BookVersion.id == self.id,
-                    m.Section.version_id == m.BookVersion.id,
-                    m.Collection.id == m.Section.collection_id,
-                    m.Interpretation.section_id == m.Section.id,
-                    m.Interpretation.approved.is_(True),
-                    m.BookVersion.is_deleted.is_(False),
-                    m.Interpretation.is_deleted.is_(False),
-                    m.Section.is_deleted.is_(False),
-                    m.Collection.is_deleted.is_(False),
-                ),
+                m.Interpretation.version_id == self.id,
+                m.Interpretation.approved.is_(True),
+                m.Interpretation.is_deleted.is_(False),
+                m.Section.is_deleted.is_(False),
+                m.Collection.is_deleted.is_(False),
             )
             .order_by(m.Interpretation.created_at.desc())
             .all()
@@ -103,20 +88,13 @@ class BookVersion(BaseModel):
     @property
     def interpretations(self):
         interpretations = (
-            db.session.query(
-                m.Interpretation,
-            )
+            m.Interpretation.query.join(m.Interpretation.section)
+            .join(m.Section.collection)
             .filter(
-                and_(
-                    m.BookVersion.id == self.id,
-                    m.Section.version_id == m.BookVersion.id,
-                    m.Collection.id == m.Section.collection_id,
-                    m.Interpretation.section_id == m.Section.id,
-                    m.BookVersion.is_deleted.is_(False),
-                    m.Interpretation.is_deleted.is_(False),
-                    m.Section.is_deleted.is_(False),
-                    m.Collection.is_deleted.is_(False),
-                ),
+                m.Interpretation.version_id == self.id,
+                m.Interpretation.is_deleted.is_(False),
+                m.Section.is_deleted.is_(False),
+                m.Collection.is_deleted.is_(False),
             )
             .order_by(m.Interpretation.created_at.desc())
             .all()
@@ -1,9 +1,17 @@
 from app import db
-from app.models.utils import BaseModel
+from app.models.utils import BaseModel, add_trigram_index
 
 
 class Collection(BaseModel):
     __tablename__ = "collections"
+    __table_args__ = (
+        db.Index(
+            "ix_collections_active_parent_id_position",
+            "parent_id",
+            "position",
+            postgresql_where=db.text("is_deleted = false"),
+        ),
+    )
 
     # need to redeclare id to use it in the parent relationship
     id = db.Column(db.Integer, primary_key=True)
@@ -15,8 +23,8 @@ class Collection(BaseModel):
     copy_of = db.Column(db.Integer, default=0, nullable=True)
 
     # Foreign keys
-    version_id = db.Column(db.ForeignKey("book_versions.id"))
-    parent_id = db.Column(db.ForeignKey("collections.id"))
+    version_id = db.Column(db.ForeignKey("book_versions.id"), index=True)
+    parent_id = db.Column(db.ForeignKey("collections.id"), index=True)
 
     # Relationships
     version = db.relationship("BookVersion")
@@ -58,3 +66,6 @@ class Collection(BaseModel):
             for sub_collection in self.children
             if not sub_collection.is_deleted
         ]
+
+
+add_trigram_index(Collection.__table__.c.label)
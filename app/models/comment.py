@@ -1,4 +1,5 @@
 from flask_login import current_user
+from sqlalchemy import event, select
 
 from app import db, models as m
 from app.models.utils import BaseModel
@@ -6,6 +7,14 @@ from app.models.utils import BaseModel
 
 class Comment(BaseModel):
     __tablename__ = "comments"
+    __table_args__ = (
+        db.Index(
+            "ix_comments_active_interpretation_id_id",
+            "interpretation_id",
+            "id",
+            postgresql_where=db.text("is_deleted = false"),
+        ),
+    )
 
     # need to redeclare id to use it in the parent relationship
     id = db.Column(db.Integer, primary_key=True)
@@ -13,11 +22,16 @@ class Comment(BaseModel):
     approved = db.Column(db.Boolean, default=False)
     edited = db.Column(db.Boolean, default=False)
     copy_of = db.Column(db.Integer, default=0, nullable=True)
+    up_votes = db.Column(db.Integer, default=0, server_default="0", nullable=False)
+    down_votes = db.Column(db.Integer, default=0, server_default="0", nullable=False)
 
     # Foreign keys
     user_id = db.Column(db.ForeignKey("users.id"))
-    parent_id = db.Column(db.ForeignKey("comments.id"))
-    interpretation_id = db.Column(db.ForeignKey("interpretations.id"))
+    parent_id = db.Column(db.ForeignKey("comments.id"), index=True)
+    interpretation_id = db.Column(db.ForeignKey("interpretations.id"), index=True)
+    # denormalized from the interpretation, kept in sync on create, move and fork
+    version_id = db.Column(db.ForeignKey("book_versions.id"), index=True)
+    book_id = db.Column(db.ForeignKey("books.id"), index=True)
 
     # Relationships
     user = db.relationship("User")
@@ -25,6 +39,8 @@ class Comment(BaseModel):
         "Comment", backref=db.backref("parent", remote_side=[id]), viewonly=True
     )
     interpretation = db.relationship("Interpretation")
+    version = db.relationship("BookVersion", viewonly=True, foreign_keys=[version_id])
+    book = db.relationship("Book", viewonly=True, foreign_keys=[book_id])
     votes = db.relationship("CommentVote")
     tags = db.relationship(
         "Tag",
@@ -34,26 +50,32 @@ class Comment(BaseModel):
 
     @property
     def vote_count(self):
-        count = 0
-
-        for vote in self.votes:
-            if vote.positive:
-                count += 1
-                continue
-            count -= 1
-
-        return count
+        return self.up_votes - self.down_votes
 
     @property
     def current_user_vote(self):
-        for vote in self.votes:
-            if vote.user_id == current_user.id:
-                return vote.positive
-        return None
-
-    @property
-    def book(self) -> m.Book:
-        return self.interpretation.book
+        if not current_user or not current_user.is_authenticated:
+            return None
+        return (
+            db.session.query(m.CommentVote.positive)
+            .filter_by(user_id=current_user.id, comment_id=self.id)
+            .scalar()
+        )
 
     def __repr__(self):
         return f"<{self.id}: {self.text[:20]}>"
+
+
+@event.listens_for(Comment, "before_insert")
+@event.listens_for(Comment, "before_update")
+def set_comment_book(_mapper, connection, target: Comment):
+    history = db.inspect(target).attrs.interpretation_id.history
+    if target.version_id and not history.has_changes():
+        return
+    row = connection.execute(
+        select(m.Interpretation.version_id, m.Interpretation.book_id).where(
+            m.Interpretation.id == target.interpretation_id
+        )
+    ).first()
+    if row:
+        target.version_id, target.book_id = row
@@ -4,10 +4,15 @@ from app.models.utils import BaseModel
 
 class CommentVote(BaseModel):
     __tablename__ = "comment_votes"
+    __table_args__ = (
+        db.UniqueConstraint(
+            "user_id", "comment_id", name="uq_comment_votes_user_id_comment_id"
+        ),
+    )
 
     # Foreign keys
     user_id = db.Column(db.Integer, db.ForeignKey("users.id"))
-    comment_id = db.Column(db.Integer, db.ForeignKey("comments.id"))
+    comment_id = db.Column(db.Integer, db.ForeignKey("comments.id"), index=True)
     positive = db.Column(db.Boolean, default=True)
 
     # Relationships
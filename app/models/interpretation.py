@@ -1,4 +1,5 @@
 from flask_login import current_user
+from sqlalchemy import DDL, event, select
 
 from app import db, models as m
 from app.models.utils import BaseModel
@@ -6,6 +7,30 @@ from app.models.utils import BaseModel
 
 class Interpretation(BaseModel):
     __tablename__ = "interpretations"
+    __table_args__ = (
+        db.Index(
+            "ix_interpretations_active_section_id_id",
+            "section_id",
+            "id",
+            postgresql_where=db.text("is_deleted = false"),
+        ),
+        # home feed orderings, see app/controllers/home_feed.py
+        *[
+            db.Index(
+                f"ix_interpretations_active_{column}_id",
+                column,
+                "id",
+                postgresql_where=db.text("is_deleted = false"),
+            )
+            for column in ("created_at", "score", "comments_count")
+        ],
+        # full text search, see app/controllers/search_backend.py
+        db.Index(
+            "ix_interpretations_plain_text_tsv",
+            db.text("to_tsvector('english'::regconfig, coalesce(plain_text, ''))"),
+            postgresql_using="gin",
+        ).ddl_if(dialect="postgresql"),
+    )
 
     text = db.Column(db.Text, unique=False, nullable=False)
     plain_text = db.Column(db.Text, unique=False)
@@ -14,12 +39,23 @@ class Interpretation(BaseModel):
 
     # Foreign keys
     user_id = db.Column(db.ForeignKey("users.id"))
-    section_id = db.Column(db.ForeignKey("sections.id"))
+    section_id = db.Column(db.ForeignKey("sections.id"), index=True)
+    # denormalized from the section, kept in sync on create, move and fork
+    version_id = db.Column(db.ForeignKey("book_versions.id"), index=True)
+    book_id = db.Column(db.ForeignKey("books.id"), index=True)
     score = db.Column(db.Integer(), default=0)
+    up_votes = db.Column(db.Integer, default=0, server_default="0", nullable=False)
+    down_votes = db.Column(db.Integer, default=0, server_default="0", nullable=False)
+    # active top level comments, kept by app/controllers/home_feed.py
+    comments_count = db.Column(
+        db.Integer, default=0, server_default="0", nullable=False
+    )
 
     # Relationships
     user = db.relationship("User")
-    section = db.relationship("Section")
+    section = db.relationship("Section", foreign_keys=[section_id])
+    version = db.relationship("BookVersion", viewonly=True, foreign_keys=[version_id])
+    book = db.relationship("Book", viewonly=True, foreign_keys=[book_id])
     comments = db.relationship("Comment", viewonly=True, order_by="desc(Comment.id)")
     votes = db.relationship("InterpretationVote", viewonly=True)
     tags = db.relationship(
@@ -32,32 +68,78 @@ class Interpretation(BaseModel):
         secondary="interpretations_access_groups",
     )  # access_groups related to current entity
 
+    # vote of the current user, loaded with the listing by the
+    # "interpretation_card" profile of app/controllers/loader_profiles.py
+    card_current_user_vote = db.query_expression()
+
     @property
     def vote_count(self):
-        count = 0
-
-        for vote in self.votes:
-            if vote.positive:
-                count += 1
-                continue
-            count -= 1
-
-        return count
+        return self.up_votes - self.down_votes
 
     @property
     def current_user_vote(self):
-        for vote in self.votes:
-            if vote.user_id == current_user.id:
-                return vote.positive
-        return None
+        if "card_current_user_vote" not in db.inspect(self).unloaded:
+            return self.card_current_user_vote
+        if not current_user or not current_user.is_authenticated:
+            return None
+        return (
+            db.session.query(m.InterpretationVote.positive)
+            .filter_by(user_id=current_user.id, interpretation_id=self.id)
+            .scalar()
+        )
 
     @property
     def active_comments(self):
         return [comment for comment in self.comments if not comment.is_deleted]
 
-    @property
-    def book(self) -> m.Book:
-        return self.section.version.book
-
     def __repr__(self):
         return f"<Interpretation: {self.id}>"
+
+
+@event.listens_for(Interpretation, "before_insert")
+@event.listens_for(Interpretation, "before_update")
+def set_interpretation_book(_mapper, connection, target: Interpretation):
+    history = db.inspect(target).attrs.section_id.history
+    if target.version_id and not history.has_changes():
+        return
+    row = connection.execute(
+        select(m.Section.version_id, m.BookVersion.book_id)
+        .join(m.BookVersion, m.BookVersion.id == m.Section.version_id)
+        .where(m.Section.id == target.section_id)
+    ).first()
+    if row:
+        target.version_id, target.book_id = row
+
+
+# SQLite full text search index, PostgreSQL uses the GIN index above
+SQLITE_FTS_DDL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS interpretations_fts USING fts5("
+    "plain_text, content='interpretations', content_rowid='id', "
+    "tokenize='porter unicode61')",
+    "CREATE TRIGGER IF NOT EXISTS interpretations_fts_insert "
+    "AFTER INSERT ON interpretations BEGIN "
+    "INSERT INTO interpretations_fts(rowid, plain_text) "
+    "VALUES (new.id, new.plain_text); END",
+    "CREATE TRIGGER IF NOT EXISTS interpretations_fts_delete "
+    "AFTER DELETE ON interpretations BEGIN "
+    "INSERT INTO interpretations_fts(interpretations_fts, rowid, plain_text) "
+    "VALUES ('delete', old.id, old.plain_text); END",
+    "CREATE TRIGGER IF NOT EXISTS interpretations_fts_update "
+    "AFTER UPDATE OF plain_text ON interpretations BEGIN "
+    "INSERT INTO interpretations_fts(interpretations_fts, rowid, plain_text) "
+    "VALUES ('delete', old.id, old.plain_text); "
+    "INSERT INTO interpretations_fts(rowid, plain_text) "
+    "VALUES (new.id, new.plain_text); END",
+)
+
+for statement in SQLITE_FTS_DDL:
+    event.listen(
+        Interpretation.__table__,
+        "after_create",
+        DDL(statement).execute_if(dialect="sqlite"),
+    )
+event.listen(
+    Interpretation.__table__,
+    "before_drop",
+    DDL("DROP TABLE IF EXISTS interpretations_fts").execute_if(dialect="sqlite"),
+)
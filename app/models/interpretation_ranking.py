@@ -0,0 +1,32 @@
+from enum import IntEnum
+
+from app import db
+from app.models.utils import BaseModel
+
+
+class InterpretationRanking(BaseModel):
+    """Position of an interpretation in a ranking snapshot, rebuilt by
+    `flask rankings refresh`, see app/controllers/rankings.py"""
+
+    __tablename__ = "interpretation_rankings"
+    __table_args__ = (
+        db.Index(
+            "ix_interpretation_rankings_ordering_position", "ordering", "position"
+        ),
+    )
+
+    class Orderings(IntEnum):
+        # not ranked anymore, the feed reads them by the counter indexes
+        UPVOTED = 1
+        COMMENTED = 2
+        TRENDING = 3
+
+    ordering = db.Column(db.Enum(Orderings, name="ranking_orderings"), nullable=False)
+    position = db.Column(db.Integer, nullable=False)  # 1 is the top
+    score = db.Column(db.Float, nullable=False)  # sort key of the ordering
+
+    # Foreign keys
+    interpretation_id = db.Column(db.ForeignKey("interpretations.id"), nullable=False)
+
+    def __repr__(self):
+        return f"<InterpretationRanking: {self.ordering.name} {self.position}>"
@@ -4,10 +4,19 @@ from app.models.utils import BaseModel
 
 class InterpretationVote(BaseModel):
     __tablename__ = "interpretation_votes"
+    __table_args__ = (
+        db.UniqueConstraint(
+            "user_id",
+            "interpretation_id",
+            name="uq_interpretation_votes_user_id_interpretation_id",
+        ),
+    )
 
     # Foreign keys
     user_id = db.Column(db.Integer, db.ForeignKey("users.id"))
-    interpretation_id = db.Column(db.Integer, db.ForeignKey("interpretations.id"))
+    interpretation_id = db.Column(
+        db.Integer, db.ForeignKey("interpretations.id"), index=True
+    )
     positive = db.Column(db.Boolean, default=True)
 
     # Relationships
@@ -0,0 +1,50 @@
+from enum import IntEnum
+
+from app import db
+from app.models.utils import BaseModel
+
+
+class Job(BaseModel):
+    """Long running book operation executed by `flask jobs worker`"""
+
+    __tablename__ = "jobs"
+    __table_args__ = (db.Index("ix_jobs_status_id", "status", "id"),)
+
+    class Kinds(IntEnum):
+        FORK_BOOK = 1
+        FORK_VERSION = 2
+        CREATE_VERSION = 3
+        DELETE_BOOK = 4
+
+    class Statuses(IntEnum):
+        PENDING = 1
+        RUNNING = 2
+        DONE = 3
+        FAILED = 4
+
+    kind = db.Column(db.Enum(Kinds, name="job_kinds"), nullable=False)
+    status = db.Column(
+        db.Enum(Statuses, name="job_statuses"),
+        default=Statuses.PENDING,
+        nullable=False,
+    )
+    payload = db.Column(db.JSON, default=dict)
+    result = db.Column(db.JSON, nullable=True)
+    error = db.Column(db.Text, nullable=True)
+    progress = db.Column(db.Integer, default=0)
+    total = db.Column(db.Integer, default=1)
+    attempts = db.Column(db.Integer, default=0)
+    worker = db.Column(db.String(64), nullable=True)
+    run_after = db.Column(db.DateTime, nullable=True)  # retry delay
+    started_at = db.Column(db.DateTime, nullable=True)
+    heartbeat_at = db.Column(db.DateTime, nullable=True)
+    finished_at = db.Column(db.DateTime, nullable=True)
+
+    # Foreign keys
+    user_id = db.Column(db.ForeignKey("users.id"), index=True)
+
+    # Relationships
+    user = db.relationship("User", viewonly=True)
+
+    def __repr__(self):
+        return f"<{self.id}: {self.kind.name} {self.status.name}>"
@@ -6,6 +6,9 @@ from app import db
 
 class Notification(BaseModel):
     __tablename__ = "notifications"
+    __table_args__ = (
+        db.Index("ix_notifications_user_id_is_read", "user_id", "is_read"),
+    )
 
     class Actions(IntEnum):
         CREATE = 1
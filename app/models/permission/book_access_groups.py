@@ -4,10 +4,19 @@ from app.models.utils import BaseModel
 
 class BookAccessGroups(BaseModel):
     __tablename__ = "books_access_groups"
+    __table_args__ = (
+        db.Index(
+            "ix_books_access_groups_book_id_access_group_id",
+            "book_id",
+            "access_group_id",
+        ),
+    )
 
     # Foreign keys
     book_id = db.Column(db.Integer, db.ForeignKey("books.id"))
-    access_group_id = db.Column(db.Integer, db.ForeignKey("access_groups.id"))
+    access_group_id = db.Column(
+        db.Integer, db.ForeignKey("access_groups.id"), index=True
+    )
 
     def __repr__(self):
         return f"<b:{self.book_id} to a_g:{self.access_group_id}"
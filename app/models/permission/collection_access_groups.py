@@ -4,10 +4,19 @@ from app.models.utils import BaseModel
 
 class CollectionAccessGroups(BaseModel):
     __tablename__ = "collections_access_groups"
+    __table_args__ = (
+        db.Index(
+            "ix_collections_access_groups_collection_id_access_group_id",
+            "collection_id",
+            "access_group_id",
+        ),
+    )
 
     # Foreign keys
     collection_id = db.Column(db.Integer, db.ForeignKey("collections.id"))
-    access_group_id = db.Column(db.Integer, db.ForeignKey("access_groups.id"))
+    access_group_id = db.Column(
+        db.Integer, db.ForeignKey("access_groups.id"), index=True
+    )
 
     def __repr__(self):
         return f"<c:{self.collection_id} to a_g:{self.access_group_id}"
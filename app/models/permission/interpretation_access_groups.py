@@ -4,10 +4,19 @@ from app.models.utils import BaseModel
 
 class InterpretationAccessGroups(BaseModel):
     __tablename__ = "interpretations_access_groups"
+    __table_args__ = (
+        db.Index(
+            "ix_interpretations_access_groups_ids",
+            "interpretation_id",
+            "access_group_id",
+        ),
+    )
 
     # Foreign keys
     interpretation_id = db.Column(db.Integer, db.ForeignKey("interpretations.id"))
-    access_group_id = db.Column(db.Integer, db.ForeignKey("access_groups.id"))
+    access_group_id = db.Column(
+        db.Integer, db.ForeignKey("access_groups.id"), index=True
+    )
 
     def __repr__(self):
         return f"<c:{self.interpretation_id} to a_g:{self.access_group_id}"
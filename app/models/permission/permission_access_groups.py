@@ -4,10 +4,19 @@ from app.models.utils import BaseModel
 
 class PermissionAccessGroups(BaseModel):
     __tablename__ = "permissions_access_groups"
+    __table_args__ = (
+        db.Index(
+            "ix_permissions_access_groups_permission_id_access_group_id",
+            "permission_id",
+            "access_group_id",
+        ),
+    )
 
     # Foreign keys
     permission_id = db.Column(db.Integer, db.ForeignKey("permissions.id"))
-    access_group_id = db.Column(db.Integer, db.ForeignKey("access_groups.id"))
+    access_group_id = db.Column(
+        db.Integer, db.ForeignKey("access_groups.id"), index=True
+    )
 
     def __repr__(self):
         return f"<p:{self.permission_id} to a_g:{self.access_group_id}"
@@ -4,10 +4,19 @@ from app.models.utils import BaseModel
 
 class SectionAccessGroups(BaseModel):
     __tablename__ = "sections_access_groups"
+    __table_args__ = (
+        db.Index(
+            "ix_sections_access_groups_section_id_access_group_id",
+            "section_id",
+            "access_group_id",
+        ),
+    )
 
     # Foreign keys
     section_id = db.Column(db.Integer, db.ForeignKey("sections.id"))
-    access_group_id = db.Column(db.Integer, db.ForeignKey("access_groups.id"))
+    access_group_id = db.Column(
+        db.Integer, db.ForeignKey("access_groups.id"), index=True
+    )
 
     def __repr__(self):
         return f"<s:{self.section_id} to a_g:{self.access_group_id}"
@@ -4,10 +4,19 @@ from app.models.utils import BaseModel
 
 class UserAccessGroups(BaseModel):
     __tablename__ = "users_access_groups"
+    __table_args__ = (
+        db.Index(
+            "ix_users_access_groups_user_id_access_group_id",
+            "user_id",
+            "access_group_id",
+        ),
+    )
 
     # Foreign keys
     user_id = db.Column(db.Integer, db.ForeignKey("users.id"))
-    access_group_id = db.Column(db.Integer, db.ForeignKey("access_groups.id"))
+    access_group_id = db.Column(
+        db.Integer, db.ForeignKey("access_groups.id"), index=True
+    )
 
     def __repr__(self):
         return f"<u:{self.user_id} to a_g:{self.access_group_id}"
@@ -0,0 +1,84 @@
+from enum import IntEnum
+
+from sqlalchemy import DDL, event
+
+from app import db
+from app.models.utils import BaseModel
+
+
+class SearchDocument(BaseModel):
+    """Searchable text of a book entity, kept by app/controllers/search_index.py"""
+
+    __tablename__ = "search_documents"
+    __table_args__ = (
+        db.UniqueConstraint("kind", "entity_id"),
+        db.Index("ix_search_documents_version_id_kind", "version_id", "kind"),
+        # search inside a version, see app/controllers/version_search.py.
+        # GIN over the integer column needs btree_gin
+        db.Index(
+            "ix_search_documents_version_id_tsv",
+            "version_id",
+            db.text(
+                "to_tsvector('english'::regconfig, "
+                "coalesce(title, '') || ' ' || coalesce(body, ''))"
+            ),
+            postgresql_using="gin",
+        ).ddl_if(dialect="postgresql"),
+    )
+
+    class Kinds(IntEnum):
+        BOOK = 1
+        COLLECTION = 2
+        SECTION = 3
+        INTERPRETATION = 4
+
+    kind = db.Column(db.Enum(Kinds, name="search_document_kinds"), nullable=False)
+    entity_id = db.Column(db.Integer, nullable=False)
+    title = db.Column(db.Text, nullable=True)
+    body = db.Column(db.Text, nullable=True)
+
+    # Foreign keys
+    book_id = db.Column(db.ForeignKey("books.id"), index=True)
+    version_id = db.Column(db.ForeignKey("book_versions.id"))
+
+    def __repr__(self):
+        return f"<SearchDocument: {self.kind.name} {self.entity_id}>"
+
+
+# SQLite full text search index, PostgreSQL uses the GIN index above
+SQLITE_FTS_DDL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS search_documents_fts USING fts5("
+    "title, body, content='search_documents', content_rowid='id', "
+    "tokenize='porter unicode61')",
+    "CREATE TRIGGER IF NOT EXISTS search_documents_fts_insert "
+    "AFTER INSERT ON search_documents BEGIN "
+    "INSERT INTO search_documents_fts(rowid, title, body) "
+    "VALUES (new.id, new.title, new.body); END",
+    "CREATE TRIGGER IF NOT EXISTS search_documents_fts_delete "
+    "AFTER DELETE ON search_documents BEGIN "
+    "INSERT INTO search_documents_fts(search_documents_fts, rowid, title, body) "
+    "VALUES ('delete', old.id, old.title, old.body); END",
+    "CREATE TRIGGER IF NOT EXISTS search_documents_fts_update "
+    "AFTER UPDATE OF title, body ON search_documents BEGIN "
+    "INSERT INTO search_documents_fts(search_documents_fts, rowid, title, body) "
+    "VALUES ('delete', old.id, old.title, old.body); "
+    "INSERT INTO search_documents_fts(rowid, title, body) "
+    "VALUES (new.id, new.title, new.body); END",
+)
+
+for statement in SQLITE_FTS_DDL:
+    event.listen(
+        SearchDocument.__table__,
+        "after_create",
+        DDL(statement).execute_if(dialect="sqlite"),
+    )
+event.listen(
+    SearchDocument.__table__,
+    "before_drop",
+    DDL("DROP TABLE IF EXISTS search_documents_fts").execute_if(dialect="sqlite"),
+)
+event.listen(
+    db.metadata,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS btree_gin").execute_if(dialect="postgresql"),
+)
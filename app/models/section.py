@@ -1,32 +1,49 @@
-from sqlalchemy import func, text
-
 from app import db
-from app.models.utils import BaseModel
+from app.models.utils import BaseModel, add_trigram_index
 from app.controllers import create_breadcrumbs
-from .interpretation import Interpretation
 from .comment import Comment
-from .interpretation_vote import InterpretationVote
 from app.controllers.next_prev_section import recursive_move_down, recursive_move_up
 
 
 class Section(BaseModel):
     __tablename__ = "sections"
+    __table_args__ = (
+        db.Index(
+            "ix_sections_active_collection_id_position",
+            "collection_id",
+            "position",
+            postgresql_where=db.text("is_deleted = false"),
+        ),
+    )
 
     label = db.Column(db.String(256), unique=False, nullable=False)
     position = db.Column(db.Integer, default=-1, nullable=True)
     copy_of = db.Column(db.Integer, default=0, nullable=True)
 
     # Foreign keys
-    collection_id = db.Column(db.ForeignKey("collections.id"))
+    collection_id = db.Column(db.ForeignKey("collections.id"), index=True)
     user_id = db.Column(db.ForeignKey("users.id"))
-    version_id = db.Column(db.ForeignKey("book_versions.id"))
+    version_id = db.Column(db.ForeignKey("book_versions.id"), index=True)
+    featured_interpretation_id = db.Column(
+        db.ForeignKey(
+            "interpretations.id",
+            use_alter=True,
+            name="fk_sections_featured_interpretation_id",
+        )
+    )
 
     # Relationships
     collection = db.relationship("Collection", viewonly=True)
     user = db.relationship("User", viewonly=True)
     version = db.relationship("BookVersion", viewonly=True)
     interpretations = db.relationship(
-        "Interpretation", viewonly=True, order_by="desc(Interpretation.id)"
+        "Interpretation",
+        viewonly=True,
+        order_by="desc(Interpretation.id)",
+        foreign_keys="Interpretation.section_id",
+    )
+    featured_interpretation = db.relationship(
+        "Interpretation", viewonly=True, foreign_keys=[featured_interpretation_id]
     )
     access_groups = db.relationship(
         "AccessGroup",
@@ -82,37 +99,15 @@ class Section(BaseModel):
 
     @property
     def approved_interpretation(self):
-        interpretation = Interpretation.query.filter_by(
-            approved=True, section_id=self.id, is_deleted=False
-        ).first()
-
-        if interpretation:
-            return interpretation
-
-        # most upvoted
-        result = (
-            db.session.query(
-                Interpretation, func.count(Interpretation.votes).label("total_votes")
-            )
-            .join(InterpretationVote)
-            .filter(
-                Interpretation.section_id == self.id, Interpretation.is_deleted is False
-            )
-            .group_by(Interpretation.id)
-            .order_by(text("total_votes DESC"))
-        ).first()
-        if result:
-            return result[0]
-
-        # oldest
-        interpretation = (
-            Interpretation.query.filter_by(section_id=self.id, is_deleted=False)
-            .order_by(Interpretation.created_at)
-            .first()
+        featured = self.featured_interpretation
+        if featured and not featured.is_deleted:
+            return featured
+        # pointer is stale, choose by the same rule as when it is updated
+        from app.controllers.featured_interpretation import (
+            choose_featured_interpretation,
         )
 
-        if interpretation:
-            return interpretation
+        return choose_featured_interpretation(self.active_interpretations)
 
     @property
     def approved_comments(self):
@@ -161,3 +156,6 @@ class Section(BaseModel):
 
     def __repr__(self):
         return f"<{self.id}: {self.label}>"
+
+
+add_trigram_index(Section.__table__.c.label)
@@ -1,11 +1,37 @@
 from app import db
-from app.models.utils import BaseModel
+from app.models.utils import BaseModel, add_trigram_index
 
 
 class Tag(BaseModel):
     __tablename__ = "tags"
+    __table_args__ = (
+        # tag cloud, see app/controllers/tags.py:top_tags
+        db.Index("ix_tags_usage_count_id", "usage_count", "id"),
+    )
 
     name = db.Column(db.String(32), unique=True, nullable=False)
+    # normalized name, tags are looked up by it
+    key = db.Column(
+        db.String(32),
+        unique=True,
+        index=True,
+        nullable=False,
+        default=lambda context: Tag.normalize(context.get_current_parameters()["name"]),
+    )
+
+    # links to books, interpretations, comments and sections,
+    # kept by app/controllers/tags.py
+    books_count = db.Column(db.Integer, default=0, server_default="0", nullable=False)
+    interpretations_count = db.Column(
+        db.Integer, default=0, server_default="0", nullable=False
+    )
+    comments_count = db.Column(
+        db.Integer, default=0, server_default="0", nullable=False
+    )
+    sections_count = db.Column(
+        db.Integer, default=0, server_default="0", nullable=False
+    )
+    usage_count = db.Column(db.Integer, default=0, server_default="0", nullable=False)
 
     # Relationships
     sections = db.relationship(
@@ -19,5 +45,12 @@ class Tag(BaseModel):
     )
     books = db.relationship("Book", secondary="book_tags", back_populates="tags")
 
+    @staticmethod
+    def normalize(name: str) -> str:
+        return name.strip().lstrip("#").lower()
+
     def __repr__(self):
         return f"<{self.id}: {self.name}>"
+
+
+add_trigram_index(Tag.__table__.c.name)
@@ -6,7 +6,7 @@ from sqlalchemy.ext.hybrid import hybrid_property
 from werkzeug.security import generate_password_hash, check_password_hash
 
 from app import db
-from app.models.utils import BaseModel
+from app.models.utils import BaseModel, add_trigram_index
 from app.logger import log
 from app import schema as s, models as m
 
@@ -82,5 +82,9 @@ class User(BaseModel, UserMixin):
         return items
 
 
+add_trigram_index(User.__table__.c.username)
+add_trigram_index(User.__table__.c.wallet_id)
+
+
 class AnonymousUser(AnonymousUserMixin):
     pass
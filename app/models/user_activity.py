@@ -0,0 +1,36 @@
+from enum import IntEnum
+
+from app import db
+from app.models.utils import BaseModel
+
+
+class UserActivity(BaseModel):
+    """First contribution of a user to an interpretation. Append only, kept
+    by app/controllers/user_activity.py"""
+
+    __tablename__ = "user_activity"
+    __table_args__ = (
+        db.Index("ix_user_activity_user_id_created_at", "user_id", "created_at"),
+        db.Index(
+            "ix_user_activity_user_id_interpretation_id",
+            "user_id",
+            "interpretation_id",
+            unique=True,
+        ),
+    )
+
+    class Kinds(IntEnum):
+        INTERPRETATION = 1
+        COMMENT = 2
+        VOTE = 3
+
+    kind = db.Column(db.Enum(Kinds, name="user_activity_kinds"), nullable=False)
+
+    # Foreign keys
+    user_id = db.Column(db.ForeignKey("users.id"), nullable=False)
+    interpretation_id = db.Column(db.ForeignKey("interpretations.id"), nullable=False)
+
+    def __repr__(self):
+        return (
+            f"<UserActivity: {self.user_id} {self.kind.name} {self.interpretation_id}>"
+        )
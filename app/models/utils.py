@@ -1,16 +1,18 @@
 from datetime import datetime
 
 from flask_login import current_user
+from sqlalchemy import DDL, event, func
 
 from app import db
 
 
 class ModelMixin(object):
-    def save(self, commit=True):
-        # Save this model to the database.
+    def save(self, commit=True, user=None):
+        # Save this model to the database. Changes are made by the user,
+        # current_user by default
         if hasattr(self, "updated_at"):
             self.updated_at = datetime.now()
-            self.updated_by = current_user.id
+            self.updated_by = (user or current_user).id
 
         db.session.add(self)
         if commit:
@@ -27,3 +29,59 @@ class BaseModel(db.Model, ModelMixin):
 
 
 # Add your own utility classes and functions here.
+
+
+def trigram_table_name(column: db.Column) -> str:
+    return f"{column.table.name}_{column.name}_trgm"
+
+
+def add_trigram_index(column: db.Column):
+    """Index lower(column) by trigrams for substring and fuzzy search,
+    see app/controllers/trigram_search.py
+
+    PostgreSQL gets pg_trgm GIN index, SQLite - FTS5 table with trigram tokenizer
+    kept in sync by triggers
+    """
+    table = column.table
+    db.Index(
+        f"ix_{table.name}_{column.name}_trgm",
+        func.lower(column).label(f"lower_{column.name}"),
+        postgresql_using="gin",
+        postgresql_ops={f"lower_{column.name}": "gin_trgm_ops"},
+    ).ddl_if(dialect="postgresql")
+
+    for statement in sqlite_trigram_ddl(table.name, column.name):
+        event.listen(table, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+    event.listen(
+        table,
+        "before_drop",
+        DDL(f"DROP TABLE IF EXISTS {trigram_table_name(column)}").execute_if(
+            dialect="sqlite"
+        ),
+    )
+
+
+def sqlite_trigram_ddl(table: str, column: str) -> tuple[str, ...]:
+    fts = f"{table}_{column}_trgm"
+    return (
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5("
+        f"{column}, content='{table}', content_rowid='id', tokenize='trigram')",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_insert AFTER INSERT ON {table} BEGIN "
+        f"INSERT INTO {fts}(rowid, {column}) VALUES (new.id, new.{column}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_delete AFTER DELETE ON {table} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {column}) "
+        f"VALUES ('delete', old.id, old.{column}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_update "
+        f"AFTER UPDATE OF {column} ON {table} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {column}) "
+        f"VALUES ('delete', old.id, old.{column}); "
+        f"INSERT INTO {fts}(rowid, {column}) VALUES (new.id, new.{column}); END",
+    )
+
+
+# trigram indexes need the extension
+event.listen(
+    db.metadata,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql"),
+)
@@ -2,3 +2,4 @@
 from .pagination import Pagination
 from .user import User
 from .breadcrumbs import BreadCrumbType, BreadCrumb
+from .job import Job
@@ -0,0 +1,21 @@
+from pydantic import BaseModel, validator
+
+
+class Job(BaseModel):
+    """Status of a background job"""
+
+    id: int
+    kind: str
+    status: str
+    progress: int
+    total: int
+    attempts: int
+    error: str | None
+    result: dict | None
+
+    @validator("kind", "status", pre=True)
+    def enum_name(cls, value):
+        return getattr(value, "name", value)
+
+    class Config:
+        orm_mode = True
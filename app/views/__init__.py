@@ -10,3 +10,4 @@ from .star import bp as star_blueprint
 from .permission import bp as permissions_blueprint
 from .search import bp as search_blueprint
 from .notifications import bp as notifications_blueprint
+from .job import bp as job_blueprint
@@ -10,6 +10,7 @@ from app.controllers.notification_producer import (
     comment_notification,
 )
 from app.controllers.require_permission import require_permission
+from app.controllers.featured_interpretation import update_featured_interpretation
 from app.logger import log
 
 bp = Blueprint("approve", __name__, url_prefix="/approve")
@@ -29,7 +30,7 @@ def approve_interpretation(interpretation_id: int):
     interpretation: m.Interpretation = db.session.get(
         m.Interpretation, interpretation_id
     )
-    book: m.Book = db.session.get(m.Book, interpretation.book.id)
+    book: m.Book = db.session.get(m.Book, interpretation.book_id)
     if not interpretation:
         log(log.WARNING, "Interpretation with id [%s] not found", interpretation_id)
         return jsonify({"message": "Interpretation not found"}), 404
@@ -69,6 +70,7 @@ def approve_interpretation(interpretation_id: int):
             m.Notification.Actions.APPROVE, interpretation.id, interpretation.user_id
         )
 
+    update_featured_interpretation(interpretation.section)
     interpretation.save()
 
     return jsonify({"message": "success", "approve": interpretation.approved})
@@ -86,7 +88,7 @@ def approve_interpretation(interpretation_id: int):
 @login_required
 def approve_comment(comment_id: int):
     comment: m.Comment = db.session.get(m.Comment, comment_id)
-    book: m.Book = db.session.get(m.Book, comment.book.id)
+    book: m.Book = db.session.get(m.Book, comment.book_id)
     if not comment:
         log(log.WARNING, "Comment with id [%s] not found", comment_id)
         return jsonify({"message": "Comment not found"}), 404
@@ -10,3 +10,4 @@ from . import interpretation
 from . import comment
 from . import version
 from . import fork
+from . import search
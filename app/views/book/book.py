@@ -2,7 +2,8 @@ from datetime import datetime
 
 from flask import render_template, flash, redirect, url_for, request
 from flask_login import login_required, current_user
-from sqlalchemy import and_, or_, func, distinct
+import sqlalchemy as sa
+from sqlalchemy import or_
 
 from app.controllers import (
     register_book_verify_route,
@@ -10,15 +11,20 @@ from app.controllers import (
 from app.controllers.tags import (
     set_book_tags,
 )
-from app.controllers.delete_nested_book_entities import (
-    delete_nested_book_entities,
-)
+from app.controllers.jobs import start_job
 from app.controllers.create_access_groups import (
     create_editor_group,
     create_moderator_group,
 )
+from app.controllers.book_stats import sort_books
+from app.controllers.loader_profiles import with_profile
 from app.controllers.require_permission import require_permission
-from app.controllers.sorting import sort_by
+from app.controllers.search_index import index_book
+from app.controllers.user_activity import (
+    CONTRIBUTION_ORDERINGS,
+    DEFAULT_ORDERING,
+    user_contributions,
+)
 from app.controllers.error_flashes import create_error_flash
 from app import models as m, db, forms as f
 from app.logger import log
@@ -31,59 +37,16 @@ def my_library():
         log(log.INFO, "Create query for my_library page for books")
         sort = request.args.get("sort")
 
-        books: m.Book = (
-            db.session.query(
-                m.Book,
-                m.Book.created_at.label("created_at"),
-                func.count(distinct(m.Interpretation.id)).label(
-                    "interpretations_count"
-                ),
-                func.count(distinct(m.BookStar.id)).label("stars_count"),
-            )
-            .join(
-                m.BookStar,
-                and_(
-                    m.BookStar.book_id == m.Book.id,
-                    m.BookStar.is_deleted == False,  # noqa: E712
-                ),
-                full=True,
-            )
-            .join(
-                m.BookVersion,
-                and_(
-                    m.BookVersion.book_id == m.Book.id,
-                    m.BookVersion.is_deleted == False,  # noqa: E712
-                ),
-                full=True,
-            )
-            .join(
-                m.Section,
-                and_(
-                    m.BookVersion.id == m.Section.version_id,
-                    m.Section.is_deleted == False,  # noqa: E712
-                ),
-                full=True,
-            )
-            .join(
-                m.Interpretation,
-                and_(
-                    m.Interpretation.section_id == m.Section.id,
-                    m.Interpretation.is_deleted == False,  # noqa: E712
-                ),
-                full=True,
-            )
-            .join(m.BookContributor, m.BookContributor.book_id == m.Book.id, full=True)
-            .filter(
-                or_(
-                    m.Book.user_id == current_user.id,
-                    m.BookContributor.user_id == current_user.id,
-                ),
-                m.Book.is_deleted == False,  # noqa: E712
-            )
-            .group_by(m.Book.id)
+        contributed = sa.select(m.BookContributor.book_id).where(
+            m.BookContributor.user_id == current_user.id
         )
+        books = m.Book.query.filter(
+            or_(m.Book.user_id == current_user.id, m.Book.id.in_(contributed)),
+            m.Book.is_deleted.is_(False),
+        )
+        books = with_profile(books, "book_card")
 
-        pagination, books = sort_by(books, sort)
+        pagination, books = sort_books(books, sort)
 
         log(log.INFO, "Returns data for front end")
 
@@ -111,9 +74,12 @@ def create():
         log(log.INFO, "Form submitted. Book: [%s]", book)
         book.save()
         version = m.BookVersion(semver="Active", book_id=book.id, is_active=True).save()
+        book.active_version_id = version.id
+        book.save()
         root_collection = m.Collection(
             label="Root Collection", version_id=version.id, is_root=True
         ).save()
+        index_book(book)
         tags = form.tags.data or ""
         set_book_tags(book, tags)
 
@@ -162,6 +128,7 @@ def edit(book_id: int):
         book.about = about
         log(log.INFO, "Update Book: [%s]", book)
         book.save()
+        index_book(book)
         log(log.INFO, "Update version updated at: [%s]", active_version)
         active_version.save()
         flash("Success!", "success")
@@ -188,9 +155,10 @@ def delete(book_id: int):
         return redirect(url_for("book.my_library"))
 
     book.is_deleted = True
-    delete_nested_book_entities(book)
     log(log.INFO, "Book deleted: [%s]", book)
     book.save()
+    # nested entities of a big book take long to delete
+    start_job(m.Job.Kinds.DELETE_BOOK, book_id=book.id)
     flash("Success!", "success")
     return redirect(url_for("book.my_library"))
 
@@ -212,55 +180,17 @@ def favorite_books():
         log(log.INFO, "Creating query for books")
         sort = request.args.get("sort")
 
-        books = (
-            db.session.query(
-                m.Book,
-                m.Book.created_at.label("created_at"),
-                func.count(distinct(m.Interpretation.id)).label(
-                    "interpretations_count"
-                ),
-                func.count(distinct(m.BookStar.id)).label("stars_count"),
-            )
-            .join(
-                m.BookStar,
-                and_(
-                    m.BookStar.book_id == m.Book.id,
-                    m.BookStar.is_deleted == False,  # noqa: E712
-                ),
-                full=True,
-            )
-            .join(
-                m.BookVersion,
-                and_(
-                    m.BookVersion.book_id == m.Book.id,
-                    m.BookVersion.is_deleted == False,  # noqa: E712
-                ),
-            )
-            .join(
-                m.Section,
-                and_(
-                    m.BookVersion.id == m.Section.version_id,
-                    m.Section.is_deleted == False,  # noqa: E712
-                ),
-                full=True,
-            )
-            .join(
-                m.Interpretation,
-                and_(
-                    m.Interpretation.section_id == m.Section.id,
-                    m.Interpretation.is_deleted == False,  # noqa: E712
-                ),
-                full=True,
-            )
-            .filter(
-                m.Book.id == m.BookStar.book_id,
-                m.BookStar.user_id == current_user.id,
-                m.Book.is_deleted == False,  # noqa: E712
-            )
-            .group_by(m.Book.id)
+        starred = sa.select(m.BookStar.book_id).where(
+            m.BookStar.user_id == current_user.id,
+            m.BookStar.is_deleted.is_(False),
         )
+        books = m.Book.query.filter(
+            m.Book.id.in_(starred),
+            m.Book.is_deleted.is_(False),
+        )
+        books = with_profile(books, "book_card")
 
-        pagination, books = sort_by(books, sort)
+        pagination, books = sort_books(books, sort)
 
         log(log.INFO, "Returns data for front end")
 
@@ -278,59 +208,15 @@ def my_contributions():
         log(log.INFO, "Creating query for interpretations")
         sort = request.args.get("sort")
 
-        interpretations = (
-            db.session.query(
-                m.Interpretation,
-                m.Interpretation.score.label("score"),
-                m.Interpretation.created_at.label("created_at"),
-                func.count(distinct(m.Comment.interpretation_id)).label(
-                    "comments_count"
-                ),
-            )
-            .join(
-                m.Comment,
-                and_(
-                    m.Comment.interpretation_id == m.Interpretation.id,
-                    m.Comment.is_deleted == False,  # noqa: E712
-                ),
-                full=True,
-            )
-            .join(
-                m.InterpretationVote,
-                and_(
-                    m.InterpretationVote.interpretation_id == m.Interpretation.id,
-                    m.Interpretation.is_deleted == False,  # noqa: E712
-                ),
-                full=True,
-            )
-            .filter(
-                or_(
-                    and_(
-                        m.Comment.user_id == current_user.id,
-                        m.Comment.is_deleted.is_(False),
-                    ),
-                    and_(
-                        m.Interpretation.user_id == current_user.id,
-                        m.Interpretation.is_deleted.is_(False),
-                    ),
-                    and_(
-                        m.InterpretationVote.user_id == current_user.id,
-                        m.InterpretationVote.interpretation_id == m.Interpretation.id,
-                    ),
-                ),
-                m.Interpretation.is_deleted == False,  # noqa: E712
-                m.Interpretation.copy_of == 0,
-            )
-            .group_by(m.Interpretation.id)
+        interpretations = user_contributions(
+            current_user.id, sort, "interpretation_card"
         )
 
-        pagination, interpretations = sort_by(interpretations, sort)
-
         log(log.INFO, "Returns data for front end")
 
         return render_template(
             "book/my_contributions.html",
             interpretations=interpretations,
-            page=pagination,
+            sort=sort if sort in CONTRIBUTION_ORDERINGS else DEFAULT_ORDERING,
         )
     return render_template("book/my_contributions.html", interpretations=[])
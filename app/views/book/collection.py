@@ -5,14 +5,18 @@ from app.controllers import (
     create_breadcrumbs,
     register_book_verify_route,
 )
+from app.controllers.book_tree import BookTree
 from app.controllers.copy_access_groups import recursive_copy_access_groups
 from app.controllers.notification_producer import collection_notification
 from app.controllers.delete_nested_book_entities import (
     delete_nested_collection_entities,
 )
+from app.controllers.move_to_version import move_collection_to_version
 from app.controllers.error_flashes import create_error_flash
 from app import models as m, db, forms as f
 from app.controllers.require_permission import require_permission
+from app.controllers.book_stats import recount_book_stats
+from app.controllers.search_index import index_collection
 from app.logger import log
 from .bp import bp
 
@@ -33,11 +37,13 @@ def collection_view(book_id: int, version_index: int = None):
         flash("Book not found", "danger")
         return redirect(url_for("book.my_library"))
     else:
+        tree = BookTree.load(version or book.active_version)
         return render_template(
             "book/collection_view.html",
             book=book,
             breadcrumbs=breadcrumbs,
             version=version,
+            tree=tree,
         )
 
 
@@ -112,6 +118,7 @@ def collection_create(book_id: int, collection_id: int | None = None):
         log(log.INFO, "Create collection [%s]. Book: [%s]", collection, book.id)
 
         collection.save()
+        index_collection(collection)
         # notifications
         if current_user.id != book.owner.id:
             collection_notification(
@@ -181,6 +188,7 @@ def collection_edit(book_id: int, collection_id: int):
 
         log(log.INFO, "Edit collection [%s]", collection.id)
         collection.save()
+        index_collection(collection)
 
         # notifications
         if current_user.id != book.owner.id:
@@ -214,14 +222,10 @@ def collection_delete(book_id: int, collection_id: int):
     )
 
     collection.is_deleted = True
-    if collection.active_children:
-        for child in collection.active_children:
-            child: m.Collection
-            delete_nested_collection_entities(child)
-            log(log.INFO, "Delete subcollection [%s]", collection.id)
-            child.save()
     delete_nested_collection_entities(collection)
+    recount_book_stats(book_id)
     collection.save()
+    index_collection(collection, nested=True)
 
     # notifications
     if current_user.id != book.owner.id:
@@ -264,6 +268,7 @@ def change_collection_position(book_id: int, collection_id: int):
             collection_id,
         )
         collection.parent_id = collection_id
+        move_collection_to_version(collection, new_parent.version)
 
         recursive_copy_access_groups(new_parent, collection)
 
@@ -7,6 +7,9 @@ from app.controllers.delete_nested_book_entities import (
     delete_nested_comment_entities,
 )
 from app import models as m, db, forms as f
+from app.controllers.book_stats import add_book_stats
+from app.controllers.home_feed import add_comments_count
+from app.controllers.user_activity import add_user_activity
 from app.controllers.tags import set_comment_tags
 from app.logger import log
 from .bp import bp
@@ -50,6 +53,14 @@ def create_comment(
         if form.parent_id.data:
             comment.parent_id = form.parent_id.data
             comment.interpretation = None
+            add_book_stats(book_id)
+        else:
+            add_comments_count(interpretation_id, 1)
+            add_book_stats(book_id, comments_count=1)
+        # replies count as contributions to the interpretation too
+        add_user_activity(
+            current_user.id, interpretation_id, m.UserActivity.Kinds.COMMENT
+        )
 
         log(
             log.INFO,
@@ -109,6 +120,9 @@ def comment_delete(book_id: int, interpretation_id: int):
     )
 
     if form.validate_on_submit():
+        if comment.interpretation_id and not comment.is_deleted:
+            add_comments_count(comment.interpretation_id, -1)
+            add_book_stats(comment.book_id, comments_count=-1)
         comment.is_deleted = True
         delete_nested_comment_entities(comment)
         log(log.INFO, "Delete comment [%s]", comment)
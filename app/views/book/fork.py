@@ -2,8 +2,8 @@ from flask import flash, redirect, url_for
 from flask_login import login_required
 
 from app import models as m, db, forms as f
-from app.controllers.fork import fork_book, fork_version
-from app.controllers.error_flashes import create_error_flash
+from app.controllers.jobs import start_job
+from app.controllers.error_flashes import create_error_flash, create_job_flash
 from app.logger import log
 from .bp import bp
 
@@ -16,8 +16,13 @@ def fork(book_id):
     book = db.session.get(m.Book, book_id)
     redirect_url = url_for("book.statistic_view", book_id=book.id, active_tab="forks")
     if form.validate_on_submit():
-        fork_book(book, form.label.data, form.about.data)
-        flash("Success!", "success")
+        job = start_job(
+            m.Job.Kinds.FORK_BOOK,
+            book_id=book.id,
+            label=form.label.data,
+            about=form.about.data,
+        )
+        create_job_flash(job, "Fork is started, it will appear in the list soon")
         return redirect(redirect_url)
     else:
         log(log.ERROR, "Fork book errors: [%s]", form.errors)
@@ -39,8 +44,14 @@ def fork_specific_version(book_id):
         if not book_version or book_version.book_id != book_id:
             flash("Invalid version data", "warning")
         else:
-            fork_version(book, form.label.data, form.about.data, book_version)
-            flash("Success!", "success")
+            job = start_job(
+                m.Job.Kinds.FORK_VERSION,
+                book_id=book.id,
+                version_id=book_version.id,
+                label=form.label.data,
+                about=form.about.data,
+            )
+            create_job_flash(job, "Fork is started, it will appear in the list soon")
         return redirect(redirect_url)
     else:
         log(log.ERROR, "Fork book errors: [%s]", form.errors)
@@ -17,8 +17,12 @@ from app.controllers.delete_nested_book_entities import (
     delete_nested_interpretation_entities,
 )
 from app.controllers.error_flashes import create_error_flash
+from app.controllers.featured_interpretation import update_featured_interpretation
 from app import models as m, db, forms as f
 from app.controllers.require_permission import require_permission
+from app.controllers.book_stats import add_book_stats
+from app.controllers.user_activity import add_user_activity
+from app.controllers.search_index import index_interpretation
 from app.controllers.tags import set_interpretation_tags
 from app.logger import log
 from .bp import bp
@@ -101,6 +105,10 @@ def interpretation_create(
             section,
         )
         interpretation.save()
+        add_book_stats(interpretation.book_id, interpretations_count=1)
+        add_user_activity(
+            current_user.id, interpretation.id, m.UserActivity.Kinds.INTERPRETATION
+        )
 
         # access groups
         for access_group in interpretation.section.access_groups:
@@ -109,6 +117,9 @@ def interpretation_create(
             ).save()
         # -------------
 
+        update_featured_interpretation(section)
+        section.save()
+
         # notifications
         if current_user.id != book.owner.id:
             interpretation_notification(
@@ -118,6 +129,7 @@ def interpretation_create(
 
         tags = current_app.config["TAG_REGEX"].findall(text)
         set_interpretation_tags(interpretation, tags)
+        index_interpretation(interpretation)
 
         flash("Success!", "success")
         return redirect(redirect_url)
@@ -175,6 +187,7 @@ def interpretation_edit(
 
         log(log.INFO, "Edit interpretation [%s]", interpretation.id)
         interpretation.save()
+        index_interpretation(interpretation)
 
         flash("Success!", "success")
         return redirect(redirect_url)
@@ -209,9 +222,16 @@ def interpretation_delete(
     form = f.DeleteInterpretationForm()
     if form.validate_on_submit():
         interpretation.is_deleted = True
+        add_book_stats(
+            interpretation.book_id,
+            interpretations_count=-1,
+            comments_count=-interpretation.comments_count,
+        )
         delete_nested_interpretation_entities(interpretation)
+        update_featured_interpretation(interpretation.section)
         log(log.INFO, "Delete interpretation [%s]", interpretation)
         interpretation.save()
+        index_interpretation(interpretation)
         redirect_url = url_for(
             "book.interpretation_view",
             book_id=book_id,
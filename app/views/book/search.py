@@ -0,0 +1,29 @@
+from flask import current_app, jsonify, request
+
+from app import models as m, db
+from app.controllers.version_search import search_version
+from app.logger import log
+from .bp import bp
+
+
+@bp.route("/<int:book_id>/search", methods=["GET"])
+def search(book_id: int):
+    book: m.Book = db.session.get(m.Book, book_id)
+    if not book or book.is_deleted:
+        log(log.WARNING, "Book with id [%s] not found", book_id)
+        return jsonify({"message": "Book not found"}), 404
+
+    version_id = request.args.get("version_id", type=int)
+    version: m.BookVersion = (
+        db.session.get(m.BookVersion, version_id) if version_id else book.active_version
+    )
+    if not version or version.is_deleted or version.book_id != book.id:
+        log(log.WARNING, "Version [%s] of book [%s] not found", version_id, book_id)
+        return jsonify({"message": "Version not found"}), 404
+
+    q = request.args.get("q", type=str, default="")
+    page = max(1, request.args.get("page", type=int, default=1))
+    log(log.INFO, "Search [%s] in version [%s] of book [%s]", q, version.id, book_id)
+    return jsonify(
+        search_version(book, version, q, page, current_app.config["DEFAULT_PAGE_SIZE"])
+    )
@@ -5,9 +5,12 @@ from app.controllers import register_book_verify_route
 from app.controllers.copy_access_groups import recursive_copy_access_groups
 from app.controllers.notification_producer import section_notification
 from app.controllers.delete_nested_book_entities import delete_nested_section_entities
+from app.controllers.move_to_version import move_section_to_version
 from app.controllers.error_flashes import create_error_flash
 from app import models as m, db, forms as f
 from app.controllers.require_permission import require_permission
+from app.controllers.book_stats import recount_book_stats
+from app.controllers.search_index import index_section
 from app.logger import log
 from .bp import bp
 
@@ -42,6 +45,7 @@ def section_create(book_id: int, collection_id: int):
         collection.is_leaf = True
         log(log.INFO, "Create section [%s]. Collection: [%s]", section, collection_id)
         section.save()
+        index_section(section)
 
         # access groups
         for access_group in section.collection.access_groups:
@@ -86,6 +90,7 @@ def section_edit(book_id: int, section_id: int):
 
         log(log.INFO, "Edit section [%s]", section.id)
         section.save()
+        index_section(section)
 
         if current_user.id != book.owner.id:
             # notifications
@@ -127,7 +132,9 @@ def section_delete(
         section.collection.is_leaf = False
 
     log(log.INFO, "Delete section [%s]", section.id)
+    recount_book_stats(book_id)
     section.save()
+    index_section(section)
 
     if current_user.id != book.owner.id:
         # notifications
@@ -160,6 +167,7 @@ def change_section_position(book_id: int, section_id: int):
             collection_id,
         )
         section.collection_id = collection_id
+        move_section_to_version(section, collection.version)
 
         recursive_copy_access_groups(collection, section)
 
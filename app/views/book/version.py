@@ -6,9 +6,10 @@ from app.controllers import (
 )
 
 from app import models as m, db, forms as f
-from app.controllers.version import create_new_version
+from app.controllers.jobs import start_job
+from app.controllers.book_stats import recount_book_stats
 from app.controllers.delete_nested_book_entities import delete_nested_version_entities
-from app.controllers.error_flashes import create_error_flash
+from app.controllers.error_flashes import create_error_flash, create_job_flash
 from app.logger import log
 from .bp import bp
 
@@ -24,8 +25,10 @@ def create_version(book_id):
         if book.user_id != current_user.id:
             flash("You are not owner of this book", "warning")
             return redirect(redirect_url)
-        create_new_version(book, form.semver.data)
-        flash("Success!", "success")
+        job = start_job(
+            m.Job.Kinds.CREATE_VERSION, book_id=book.id, semver=form.semver.data
+        )
+        create_job_flash(job, "Version is being created, it will appear soon")
         return redirect(redirect_url)
     else:
         log(log.ERROR, "Create version errors: [%s]", form.errors)
@@ -91,6 +94,7 @@ def delete_version(book_id: int):
         version.is_deleted = True
         delete_nested_version_entities(version)
         log(log.INFO, "Delete version [%s]", version)
+        recount_book_stats(book_id)
         version.save()
 
         flash("Success!", "success")
@@ -3,10 +3,16 @@ from flask import (
     render_template,
     request,
 )
-from sqlalchemy import and_, func, distinct
-from app import models as m, db
+from app import models as m
 from app.logger import log
-from app.controllers.sorting import sort_by
+from app.controllers.home_feed import (
+    DEFAULT_ORDERING,
+    FEED_ORDERINGS,
+    RANKED_ORDERINGS,
+    interpretation_feed,
+)
+from app.controllers.book_stats import sort_books
+from app.controllers.loader_profiles import with_profile
 
 
 bp = Blueprint("home", __name__, url_prefix="/home")
@@ -15,32 +21,15 @@ bp = Blueprint("home", __name__, url_prefix="/home")
 @bp.route("/", methods=["GET"])
 def get_all():
     sort = request.args.get("sort")
-    interpretations = (
-        db.session.query(
-            m.Interpretation,
-            m.Interpretation.score.label("score"),
-            m.Interpretation.created_at.label("created_at"),
-            func.count(distinct(m.Comment.interpretation_id)).label("comments_count"),
-        )
-        .join(
-            m.Comment,
-            and_(
-                m.Comment.interpretation_id == m.Interpretation.id,
-                m.Comment.is_deleted == False,  # noqa: E712
-            ),
-            isouter=True,
-        )
-        .filter(
-            m.Interpretation.is_deleted == False,  # noqa: E712
-        )
-        .group_by(m.Interpretation.id)
-    )
-    pagination, interpretations = sort_by(interpretations, sort)
+    log(log.INFO, "Home feed sorted by [%s]", sort)
+    interpretations = interpretation_feed(sort, "interpretation_card")
 
     return render_template(
         "home/index.html",
         interpretations=interpretations,
-        page=pagination,
+        sort=sort
+        if sort in FEED_ORDERINGS or sort in RANKED_ORDERINGS
+        else DEFAULT_ORDERING,
     )
 
 
@@ -49,51 +38,10 @@ def explore_books():
     log(log.INFO, "Create query for home page for books")
     sort = request.args.get("sort")
 
-    books: m.Book = (
-        db.session.query(
-            m.Book,
-            m.Book.created_at.label("created_at"),
-            func.count(distinct(m.Interpretation.id)).label("interpretations_count"),
-            func.count(distinct(m.BookStar.id)).label("stars_count"),
-        )
-        .join(
-            m.BookStar,
-            and_(
-                m.BookStar.book_id == m.Book.id,
-                m.BookStar.is_deleted == False,  # noqa: E712
-            ),
-            full=True,
-        )
-        .join(
-            m.BookVersion,
-            and_(
-                m.BookVersion.book_id == m.Book.id,
-                m.BookVersion.is_deleted == False,  # noqa: E712
-            ),
-        )
-        .join(
-            m.Section,
-            and_(
-                m.BookVersion.id == m.Section.version_id,
-                m.Section.is_deleted == False,  # noqa: E712
-            ),
-            full=True,
-        )
-        .join(
-            m.Interpretation,
-            and_(
-                m.Interpretation.section_id == m.Section.id,
-                m.Interpretation.is_deleted == False,  # noqa: E712
-            ),
-            full=True,
-        )
-        .filter(
-            m.Book.is_deleted == False,  # noqa: E712
-        )
-        .group_by(m.Book.id)
-    )
+    books = m.Book.query.filter(m.Book.is_deleted.is_(False))
+    books = with_profile(books, "book_card")
     log(log.INFO, "Creating pagination for books")
-    pagination, books = sort_by(books, sort)
+    pagination, books = sort_books(books, sort)
     return render_template(
         "home/explore_books.html",
         books=books,
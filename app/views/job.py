@@ -0,0 +1,18 @@
+from flask import Blueprint, jsonify
+from flask_login import login_required, current_user
+
+from app import models as m, schema as s, db
+from app.logger import log
+
+bp = Blueprint("job", __name__, url_prefix="/jobs")
+
+
+@bp.route("/<int:job_id>", methods=["GET"])
+@login_required
+def job_status(job_id: int):
+    job: m.Job = db.session.get(m.Job, job_id)
+    if not job or job.user_id != current_user.id:
+        log(log.WARNING, "Job with id [%s] not found", job_id)
+        return jsonify({"message": "Job not found"}), 404
+
+    return jsonify(s.Job.from_orm(job).dict())
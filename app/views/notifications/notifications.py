@@ -4,9 +4,7 @@ from flask import Blueprint, render_template, redirect, url_for
 from flask_login import login_required, current_user
 
 
-from app.controllers import (
-    create_pagination,
-)
+from app.controllers import paginate
 
 
 from app import models as m, db
@@ -24,18 +22,16 @@ def get_all():
             m.Notification.created_at <= datetime.now() + timedelta(days=30)
         )
         .filter_by(user_id=current_user.id)
-        .order_by(m.Notification.created_at.desc())
+        .order_by(m.Notification.created_at.desc(), m.Notification.id.desc())
     )
     log(log.INFO, "Create pagination for books")
 
-    pagination = create_pagination(total=notifications.count())
+    pagination, notifications = paginate(notifications)
     log(log.INFO, "Returning data for front end")
 
     return render_template(
         "notifications/index.html",
-        notifications=notifications.paginate(
-            page=pagination.page, per_page=pagination.per_page
-        ),
+        notifications=notifications,
         page=pagination,
     )
 
@@ -1,11 +1,19 @@
-from flask import Blueprint, render_template, request, jsonify, url_for
-from sqlalchemy import func, and_, or_
+from flask import Blueprint, render_template, request, jsonify
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import defer
 
 from app import models as m, db
-from app.controllers import create_pagination
-from app.controllers.build_qa_url_using_interpretation import (
-    build_qa_url_using_interpretation,
+from app.controllers import paginate
+from app.controllers.book_search import search_books as find_books
+from app.controllers.loader_profiles import with_profile
+from app.controllers.result_cache import cached_paginate
+from app.controllers.quick_search import quick_search as find_quick_search
+from app.controllers.tags import TOP_TAGS_LIMIT, top_tags as find_top_tags
+from app.controllers.search_backend import (
+    interpretation_snippets,
+    search_interpretations as find_interpretations,
 )
+from app.controllers.trigram_search import trigram_match, trigram_rank
 from app.logger import log
 
 
@@ -16,24 +24,22 @@ bp = Blueprint("search", __name__)
 def search_interpretations():
     q = request.args.get("q", type=str, default="").lower()
     log(log.INFO, "Starting to build query for interpretations")
-    interpretations = m.Interpretation.query.order_by(m.Interpretation.id).filter(
-        (func.lower(m.Interpretation.plain_text).like(f"%{q}%")),
-        m.Interpretation.copy_of == 0,
-    )
-    log(log.INFO, "Get count of interpretations")
-    count = interpretations.count()
     log(log.INFO, "Creating pagination")
-    pagination = create_pagination(total=interpretations.count())
+    # the page shows snippets, full texts are not loaded
+    interpretations = find_interpretations(q).options(
+        defer(m.Interpretation.text), defer(m.Interpretation.plain_text)
+    )
+    pagination, interpretations = paginate(interpretations, estimate=True)
+    snippets = interpretation_snippets(q, [item.id for item in interpretations])
     log(log.INFO, "Returning data to front")
 
     return render_template(
         "search/search_results_interpretations.html",
         query=q,
-        interpretations=interpretations.paginate(
-            page=pagination.page, per_page=pagination.per_page
-        ),
+        interpretations=interpretations,
+        snippets=snippets,
         page=pagination,
-        count=count,
+        count=pagination.total,
         search_query=q,
     )
 
@@ -43,51 +49,17 @@ def search_books():
     q = request.args.get("q", type=str, default="").lower()
     log(log.INFO, "Starting to build query for books")
 
-    books = (
-        m.Book.query.join(m.BookVersion, m.BookVersion.book_id == m.Book.id)
-        .join(m.Collection, m.BookVersion.id == m.Collection.version_id, full=True)
-        .join(m.Section, m.BookVersion.id == m.Section.version_id, full=True)
-        .join(m.Interpretation, m.Interpretation.section_id == m.Section.id, full=True)
-        .filter(
-            or_(
-                and_(
-                    func.lower(m.Book.label).like(f"%{q}%"),
-                ),
-                and_(
-                    func.lower(m.Collection.label).like(f"%{q}%"),
-                    m.Collection.is_deleted == False,  # noqa: E712
-                    m.Collection.copy_of == 0,
-                    m.Collection.is_root == False,  # noqa: E712
-                ),
-                and_(
-                    func.lower(m.Section.label).like(f"%{q}%"),
-                    m.Section.copy_of == 0,
-                    m.Section.is_deleted == False,  # noqa: E712
-                ),
-                and_(
-                    func.lower(m.Interpretation.plain_text).like(f"%{q}%"),
-                    m.Interpretation.is_deleted == False,  # noqa: E712
-                    m.Interpretation.copy_of == 0,
-                    m.Section.is_deleted == False,  # noqa: E712
-                ),
-            ),
-            m.Book.is_deleted == False,  # noqa: E712
-        )
-        .group_by(m.Book.id)
-    )
-
-    log(log.INFO, "Get count of books")
-    count = books.count()
     log(log.INFO, "Creating pagination")
-    pagination = create_pagination(total=books.count())
+    books = with_profile(find_books(q), "book_card")
+    pagination, books = paginate(books, estimate=True)
     log(log.INFO, "Returning data to front")
 
     return render_template(
         "search/search_results_books.html",
         query=q,
-        books=books.paginate(page=pagination.page, per_page=pagination.per_page),
+        books=books,
         page=pagination,
-        count=count,
+        count=pagination.total,
         search_query=q,
     )
 
@@ -96,31 +68,23 @@ def search_books():
 def search_users():
     q = request.args.get("q", type=str, default="").lower()
     log(log.INFO, "Starting to build query for users")
-    users = (
-        m.User.query.order_by(m.User.id)
-        .filter(
-            or_(
-                func.lower(m.User.username).like(f"%{q}%"),
-                func.lower(m.User.wallet_id).like(f"%{q}%"),
-            )
+    users = m.User.query.filter(
+        or_(
+            trigram_match(m.User.username, q),
+            trigram_match(m.User.wallet_id, q),
         )
-        .order_by(m.User.id.asc())
-        .group_by(m.User.id)
-    )
-    log(log.INFO, "Get count of users")
-
-    count = users.count()
+    ).order_by(trigram_rank(m.User.username, q).desc(), m.User.id)
     log(log.INFO, "Creating pagination")
 
-    pagination = create_pagination(total=users.count())
+    pagination, users = paginate(users)
     log(log.INFO, "Returning data to front")
 
     return render_template(
         "search/search_results_users.html",
         query=q,
-        users=users.paginate(page=pagination.page, per_page=pagination.per_page),
+        users=users,
         page=pagination,
-        count=count,
+        count=pagination.total,
         search_query=q,
     )
 
@@ -130,21 +94,20 @@ def search_tags():
     q = request.args.get("q", type=str, default="").lower()
     log(log.INFO, "Starting to build query for tags")
 
-    tags = m.Tag.query.order_by(m.Tag.id).filter(func.lower(m.Tag.name).like(f"%{q}%"))
-    log(log.INFO, "Get count of tags")
-
-    count = tags.count()
+    tags = m.Tag.query.filter(trigram_match(m.Tag.name, q)).order_by(
+        trigram_rank(m.Tag.name, q).desc(), m.Tag.id
+    )
     log(log.INFO, "Creating pagination")
 
-    pagination = create_pagination(total=tags.count())
+    pagination, tags = paginate(tags)
     log(log.INFO, "Returning data to front")
 
     return render_template(
         "search/search_results_tags.html",
         query=q,
-        tags=tags.paginate(page=pagination.page, per_page=pagination.per_page),
+        tags=tags,
         page=pagination,
-        count=count,
+        count=pagination.total,
         search_query=q,
     )
 
@@ -158,29 +121,33 @@ def tag_search_interpretations():
         db.session.query(m.Interpretation)
         .filter(
             and_(
-                func.lower(m.Tag.name) == (tag_name),
+                m.Tag.key == m.Tag.normalize(tag_name),
                 m.InterpretationTag.tag_id == m.Tag.id,
                 m.Interpretation.id == m.InterpretationTag.interpretation_id,
                 m.Interpretation.copy_of == 0,
                 m.Interpretation.is_deleted == False,  # noqa: E712
             )
         )
-        .order_by(m.Interpretation.created_at.asc())
+        .order_by(m.Interpretation.created_at.asc(), m.Interpretation.id.asc())
         .group_by(m.Interpretation.id)
     )
     log(log.INFO, "Creating pagination")
 
-    pagination = create_pagination(total=interpretations.count())
+    pagination, interpretations = cached_paginate(
+        f"tag_search_interpretations:{tag_name}",
+        interpretations,
+        m.Interpretation,
+        {"tags", "interpretation_tags", "interpretations"},
+        profile="interpretation_card",
+    )
     log(log.INFO, "Returning data to front")
 
     return render_template(
         "search/tag_search_results_interpretations.html",
         tag_name=tag_name,
-        interpretations=interpretations.paginate(
-            page=pagination.page, per_page=pagination.per_page
-        ),
+        interpretations=interpretations,
         page=pagination,
-        count=interpretations.count(),
+        count=pagination.total,
     )
 
 
@@ -193,99 +160,44 @@ def tag_search_books():
         db.session.query(m.Book)
         .filter(
             and_(
-                func.lower(m.Tag.name) == (tag_name),
+                m.Tag.key == m.Tag.normalize(tag_name),
                 m.BookTags.tag_id == m.Tag.id,
                 m.Book.id == m.BookTags.book_id,
                 m.Book.is_deleted == False,  # noqa: E712
             )
         )
-        .order_by(m.Book.created_at.asc())
+        .order_by(m.Book.created_at.asc(), m.Book.id.asc())
         .group_by(m.Book.id)
     )
     log(log.INFO, "Creating pagination")
 
-    pagination = create_pagination(total=books.count())
+    pagination, books = cached_paginate(
+        f"tag_search_books:{tag_name}",
+        books,
+        m.Book,
+        {"tags", "book_tags", "books"},
+        profile="book_card",
+    )
     log(log.INFO, "Returning data to front")
 
     return render_template(
         "search/tag_search_results_books.html",
         tag_name=tag_name,
-        books=books.paginate(page=pagination.page, per_page=pagination.per_page),
+        books=books,
         page=pagination,
-        count=books.count(),
+        count=pagination.total,
     )
 
 
 @bp.route("/quick_search", methods=["GET"])
 def quick_search():
-    search_query = request.args.get("search_query", type=str, default="").lower()
-    log(log.INFO, "Starting to build query for interpretations")
+    search_query = request.args.get("search_query", type=str, default="")
+    log(log.INFO, "Quick search [%s]", search_query)
+    return jsonify(find_quick_search(search_query))
 
-    interpretations = (
-        m.Interpretation.query.order_by(m.Interpretation.id)
-        .filter(
-            (func.lower(m.Interpretation.plain_text).like(f"%{search_query}%")),
-            m.Interpretation.copy_of == 0,
-            m.Interpretation.is_deleted == False,  # noqa: E712,
-        )
-        .limit(2)
-    )
-    interpretations_res = []
-    for interpretation in interpretations:
-        url_for_interpretation = build_qa_url_using_interpretation(interpretation)
-        interpretations_res.append(
-            {"label": interpretation.section.label, "url": url_for_interpretation}
-        )
-    log(log.INFO, "Starting to build query for books")
-
-    books = (
-        m.Book.query.order_by(m.Book.id)
-        .filter(
-            (func.lower(m.Book.label).like(f"%{search_query}%")),
-            m.Book.is_deleted == False,  # noqa: E712,
-        )
-        .limit(2)
-    )
-    books_res = []
-    for book in books:
-        url_for_book = url_for("book.collection_view", book_id=book.id)
-        books_res.append({"label": book.label, "url": url_for_book})
-    log(log.INFO, "Starting to build query for users")
 
-    users = (
-        m.User.query.order_by(m.User.id)
-        .filter(
-            or_(
-                func.lower(m.User.username).like(f"%{search_query}%"),
-                func.lower(m.User.wallet_id).like(f"%{search_query}%"),
-            )
-        )
-        .order_by(m.User.id.asc())
-        .group_by(m.User.id)
-        .limit(2)
-    )
-    users_res = []
-    for user in users:
-        url_for_user = url_for("user.profile", user_id=user.id)
-        users_res.append({"label": user.username, "url": url_for_user})
-    log(log.INFO, "Starting to build query for tags")
-
-    tags = (
-        m.Tag.query.order_by(m.Tag.id)
-        .filter(func.lower(m.Tag.name).like(f"%{search_query}%"))
-        .limit(2)
-    )
-    tags_res = []
-    for tag in tags:
-        url_for_tag = url_for("search.tag_search_interpretations", tag_name=tag.name)
-        tags_res.append({"label": tag.name, "url": url_for_tag})
-    log(log.INFO, "Returning data to front")
-
-    return jsonify(
-        {
-            "interpretations": interpretations_res,
-            "books": books_res,
-            "users": users_res,
-            "tags": tags_res,
-        }
-    )
+@bp.route("/top_tags", methods=["GET"])
+def top_tags():
+    limit = request.args.get("limit", type=int, default=TOP_TAGS_LIMIT)
+    log(log.INFO, "Top [%s] tags", limit)
+    return jsonify(find_top_tags(limit))
@@ -5,6 +5,7 @@ from flask import (
 from flask_login import login_required, current_user
 
 from app import models as m, db
+from app.controllers.book_stats import add_book_stats
 from app.logger import log
 
 bp = Blueprint("star", __name__, url_prefix="/star")
@@ -28,6 +29,7 @@ def star_book(book_id: int):
     if book_star:
         current_user_star = False
         db.session.delete(book_star)
+        add_book_stats(book_id, stars_count=-1)
         db.session.commit()
     else:
         book_star = m.BookStar(user_id=current_user.id, book_id=book_id)
@@ -37,6 +39,7 @@ def star_book(book_id: int):
             current_user,
             book,
         )
+        add_book_stats(book_id, stars_count=1)
         book_star.save()
 
     return jsonify(
@@ -1,8 +1,10 @@
 from flask import Blueprint, render_template, request, flash, redirect, url_for, jsonify
 from flask_login import login_required, current_user, logout_user
-from app.controllers import create_pagination
+from app.controllers import paginate
 from app.controllers.error_flashes import create_error_flash
-from sqlalchemy import func, not_, or_
+from app.controllers.loader_profiles import with_profile
+from app.controllers.trigram_search import trigram_match, trigram_rank
+from sqlalchemy import not_, or_
 
 from app import models as m, db
 from app import forms as f
@@ -21,11 +23,11 @@ def get_all():
     if q:
         users = users.filter(m.User.username.like(f"{q}%"))
 
-    pagination = create_pagination(total=users.count())
+    pagination, users = paginate(users)
 
     return render_template(
         "user/users.html",
-        users=users.paginate(page=pagination.page, per_page=pagination.per_page),
+        users=users,
         page=pagination,
         search_query=q,
     )
@@ -68,13 +70,11 @@ def delete_avatar():
 @bp.route("/<int:user_id>/profile")
 def profile(user_id: int):
     user: m.User = db.session.get(m.User, user_id)
-    interpretations: m.Interpretation = m.Interpretation.query.filter_by(
-        user_id=user_id
+    interpretations: m.Interpretation = with_profile(
+        m.Interpretation.query.filter_by(user_id=user_id), "interpretation_card"
     )
     books: m.Interpretation = (
-        db.session.query(
-            m.Book,
-        )
+        with_profile(db.session.query(m.Book), "book_card")
         .join(m.BookContributor, m.BookContributor.book_id == m.Book.id, full=True)
         .filter(
             or_(
@@ -130,15 +130,12 @@ def search():
 
     book_id = request.args.get("book_id", type=str, default=None)
 
-    query_user = m.User.query
-    query_user = query_user.order_by(m.User.username)
-
-    query_user = query_user.filter(
+    query_user = m.User.query.filter(
         or_(
-            func.lower(m.User.username).like(f"%{q}%"),
-            func.lower(m.User.wallet_id).like(f"%{q}%"),
+            trigram_match(m.User.username, q, fuzzy=True),
+            trigram_match(m.User.wallet_id, q),
         )
-    )
+    ).order_by(trigram_rank(m.User.username, q).desc(), m.User.username)
     if book_id:
         book_contributors = m.BookContributor.query.filter_by(book_id=book_id).all()
         user_ids = [contributor.user_id for contributor in book_contributors]
@@ -3,6 +3,9 @@ from flask_login import login_required, current_user
 
 from app import models as m, db
 from app.logger import log
+from app.controllers.featured_interpretation import update_featured_interpretation
+from app.controllers.vote import toggle_interpretation_vote, toggle_comment_vote
+from app.controllers.user_activity import add_user_activity
 from app.controllers.notification_producer import (
     interpretation_notification,
     comment_notification,
@@ -24,39 +27,22 @@ def vote_interpretation(interpretation_id: int):
         log(log.WARNING, "Interpretation with id [%s] not found", interpretation_id)
         return jsonify({"message": "Interpretation not found"}), 404
 
-    vote: m.InterpretationVote = m.InterpretationVote.query.filter_by(
-        user_id=current_user.id, interpretation_id=interpretation_id
-    ).first()
-    if vote:
-        db.session.delete(vote)
-
     positive = request.json.get("positive") in ("true", True)
-
-    if not vote or vote.positive != positive:
-        vote: m.InterpretationVote = m.InterpretationVote(
-            user_id=current_user.id,
-            interpretation_id=interpretation_id,
-            positive=positive,
-        )
-        log(
-            log.INFO,
-            "User [%s]. [%s] vote interpretation: [%s]",
-            current_user,
-            "Positive" if positive else "Negative",
-            interpretation,
-        )
-        vote.save(False)
-    else:
-        log(
-            log.INFO,
-            "User [%s]. Remove [%s] vote for interpretation: [%s]",
-            current_user,
-            "positive" if positive else "negative",
-            interpretation,
-        )
+    current_user_vote = toggle_interpretation_vote(
+        interpretation_id, current_user.id, positive
+    )
+    if current_user_vote is not None:
+        add_user_activity(current_user.id, interpretation_id, m.UserActivity.Kinds.VOTE)
+    log(
+        log.INFO,
+        "User [%s]. [%s] vote for interpretation: [%s]. Current vote: [%s]",
+        current_user,
+        "Positive" if positive else "Negative",
+        interpretation,
+        current_user_vote,
+    )
+    update_featured_interpretation(interpretation.section)
     db.session.commit()
-    interpretation.score = interpretation.vote_count
-    interpretation.save()
     # notifications
     if current_user.id != interpretation.user_id:
         interpretation_notification(
@@ -66,7 +52,7 @@ def vote_interpretation(interpretation_id: int):
     return jsonify(
         {
             "vote_count": interpretation.vote_count,
-            "current_user_vote": interpretation.current_user_vote,
+            "current_user_vote": current_user_vote,
         }
     )
 
@@ -82,36 +68,16 @@ def vote_comment(comment_id: int):
         log(log.WARNING, "Comment with id [%s] not found", comment_id)
         return jsonify({"message": "Comment not found"}), 404
 
-    vote: m.CommentVote = m.CommentVote.query.filter_by(
-        user_id=current_user.id, comment_id=comment_id
-    ).first()
-    if vote:
-        db.session.delete(vote)
-
     positive = request.json.get("positive") in ("true", True)
-
-    if not vote or vote.positive != positive:
-        vote: m.CommentVote = m.CommentVote(
-            user_id=current_user.id,
-            comment_id=comment_id,
-            positive=positive,
-        )
-        log(
-            log.INFO,
-            "User [%s]. [%s] vote comment: [%s]",
-            current_user,
-            "Positive" if positive else "Negative",
-            comment,
-        )
-        vote.save(False)
-    else:
-        log(
-            log.INFO,
-            "User [%s]. Remove [%s] vote for comment: [%s]",
-            current_user,
-            "positive" if positive else "negative",
-            comment,
-        )
+    current_user_vote = toggle_comment_vote(comment_id, current_user.id, positive)
+    log(
+        log.INFO,
+        "User [%s]. [%s] vote for comment: [%s]. Current vote: [%s]",
+        current_user,
+        "Positive" if positive else "Negative",
+        comment,
+        current_user_vote,
+    )
     db.session.commit()
     # notifications
     if current_user.id != comment.user_id:
@@ -119,6 +85,6 @@ def vote_comment(comment_id: int):
     return jsonify(
         {
             "vote_count": comment.vote_count,
-            "current_user_vote": comment.current_user_vote,
+            "current_user_vote": current_user_vote,
         }
     )
@@ -26,6 +26,29 @@ class BaseConfig(BaseSettings):
     DEFAULT_PAGE_SIZE: int
     PAGE_LINKS_NUMBER: int
     MAX_SEARCH_RESULTS: int
+    # bigger results are counted by the planner estimate, PostgreSQL only
+    PAGINATION_ESTIMATE_OVER: int = 10000
+    QUICK_SEARCH_CACHE_SIZE: int = 1024  # prefixes
+    QUICK_SEARCH_CACHE_TTL: int = 60  # seconds, bounds staleness of other workers
+    # search result pages: "memory://" cache of a worker, or
+    # "sqlite:////path/results.sqlite3" file shared by all workers of the host.
+    # Writes invalidate only the cache of the processes sharing it
+    RESULT_CACHE_URL: str = "memory://"
+    RESULT_CACHE_SIZE: int = 10000  # pages, memory only
+    RESULT_CACHE_TTL: int = 60  # seconds, bounds staleness of other workers
+
+    # Background jobs
+    JOBS_RUN_INLINE: bool = False  # run jobs inside the request, without worker
+    JOBS_LOCK_TIMEOUT: int = 600  # seconds without heartbeat to retry a running job
+    JOBS_HEARTBEAT_INTERVAL: float = 30  # seconds, well below JOBS_LOCK_TIMEOUT
+    JOBS_MAX_ATTEMPTS: int = 3
+    JOBS_RETRY_DELAY: int = 60  # seconds, multiplied by number of attempts
+
+    # Ranking snapshots of the home feed, refreshed by the jobs worker
+    RANKINGS_SIZE: int = 1000  # interpretations, the depth of the trending feed
+    RANKINGS_REFRESH_INTERVAL: int = 300  # seconds, 0 - only by the command
+    RANKINGS_TRENDING_DAYS: int = 7  # older interpretations are not trending
+    RANKINGS_HALF_LIFE: int = 24  # hours to halve the trending score
 
     # HTTPProvider for SIWE
     HTTP_PROVIDER_URL: str
@@ -65,6 +88,7 @@ class TestingConfig(BaseConfig):
 
     TESTING: bool = True
     PRESERVE_CONTEXT_ON_EXCEPTION: bool = False
+    JOBS_RUN_INLINE: bool = True
     SQLALCHEMY_DATABASE_URI: str = "sqlite:///" + os.path.join(
         BASE_DIR, "database-test.sqlite3"
     )
@@ -84,6 +108,9 @@ class ProductionConfig(BaseConfig):
         "DATABASE_URL", "sqlite:///" + os.path.join(BASE_DIR, "database.sqlite3")
     )
     WTF_CSRF_ENABLED = True
+    # gunicorn workers of the container share the result cache. Writes of the
+    # jobs worker reach it only if it shares the file too, as in docker-compose
+    RESULT_CACHE_URL: str = "sqlite:////tmp/result-cache.sqlite3"
 
     class Config:
         fields = {
@@ -0,0 +1,75 @@
+"""trigram indexes
+
+Revision ID: 399cd39f0f48
+Revises: 46de378d2443
+Create Date: 2026-10-17 19:27:07.854086
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '399cd39f0f48'
+down_revision = '46de378d2443'
+branch_labels = None
+depends_on = None
+
+
+TRIGRAM_COLUMNS = (
+    ('books', 'label'),
+    ('collections', 'label'),
+    ('sections', 'label'),
+    ('users', 'username'),
+    ('users', 'wallet_id'),
+    ('tags', 'name'),
+)
+
+
+def sqlite_trigram_ddl(table, column):
+    fts = f'{table}_{column}_trgm'
+    return (
+        f'CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5('
+        f"{column}, content='{table}', content_rowid='id', tokenize='trigram')",
+        f'CREATE TRIGGER IF NOT EXISTS {fts}_insert AFTER INSERT ON {table} BEGIN '
+        f'INSERT INTO {fts}(rowid, {column}) VALUES (new.id, new.{column}); END',
+        f'CREATE TRIGGER IF NOT EXISTS {fts}_delete AFTER DELETE ON {table} BEGIN '
+        f'INSERT INTO {fts}({fts}, rowid, {column}) '
+        f"VALUES ('delete', old.id, old.{column}); END",
+        f'CREATE TRIGGER IF NOT EXISTS {fts}_update '
+        f'AFTER UPDATE OF {column} ON {table} BEGIN '
+        f'INSERT INTO {fts}({fts}, rowid, {column}) '
+        f"VALUES ('delete', old.id, old.{column}); "
+        f'INSERT INTO {fts}(rowid, {column}) VALUES (new.id, new.{column}); END',
+        f"INSERT INTO {fts}({fts}) VALUES ('rebuild')",
+    )
+
+
+def upgrade():
+    if op.get_context().dialect.name == 'postgresql':
+        op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        for table, column in TRIGRAM_COLUMNS:
+            op.create_index(
+                f'ix_{table}_{column}_trgm',
+                table,
+                [sa.text(f'lower({column}) gin_trgm_ops')],
+                unique=False,
+                postgresql_using='gin',
+            )
+        return
+
+    for table, column in TRIGRAM_COLUMNS:
+        for statement in sqlite_trigram_ddl(table, column):
+            op.execute(statement)
+
+
+def downgrade():
+    if op.get_context().dialect.name == 'postgresql':
+        for table, column in TRIGRAM_COLUMNS:
+            op.drop_index(f'ix_{table}_{column}_trgm', table_name=table)
+        return
+
+    for table, column in TRIGRAM_COLUMNS:
+        for trigger in ('insert', 'delete', 'update'):
+            op.execute(f'DROP TRIGGER IF EXISTS {table}_{column}_trgm_{trigger}')
+        op.execute(f'DROP TABLE IF EXISTS {table}_{column}_trgm')
@@ -0,0 +1,63 @@
+"""interpretations full text search
+
+Revision ID: 46de378d2443
+Revises: bb08e4a35e29
+Create Date: 2026-10-17 19:19:39.131278
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '46de378d2443'
+down_revision = 'bb08e4a35e29'
+branch_labels = None
+depends_on = None
+
+
+SQLITE_FTS_DDL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS interpretations_fts USING fts5("
+    "plain_text, content='interpretations', content_rowid='id', "
+    "tokenize='porter unicode61')",
+    "CREATE TRIGGER IF NOT EXISTS interpretations_fts_insert "
+    "AFTER INSERT ON interpretations BEGIN "
+    "INSERT INTO interpretations_fts(rowid, plain_text) "
+    "VALUES (new.id, new.plain_text); END",
+    "CREATE TRIGGER IF NOT EXISTS interpretations_fts_delete "
+    "AFTER DELETE ON interpretations BEGIN "
+    "INSERT INTO interpretations_fts(interpretations_fts, rowid, plain_text) "
+    "VALUES ('delete', old.id, old.plain_text); END",
+    "CREATE TRIGGER IF NOT EXISTS interpretations_fts_update "
+    "AFTER UPDATE OF plain_text ON interpretations BEGIN "
+    "INSERT INTO interpretations_fts(interpretations_fts, rowid, plain_text) "
+    "VALUES ('delete', old.id, old.plain_text); "
+    "INSERT INTO interpretations_fts(rowid, plain_text) "
+    "VALUES (new.id, new.plain_text); END",
+)
+
+
+def upgrade():
+    if op.get_context().dialect.name == "postgresql":
+        op.create_index(
+            "ix_interpretations_plain_text_tsv",
+            "interpretations",
+            [sa.text("to_tsvector('english'::regconfig, coalesce(plain_text, ''))")],
+            unique=False,
+            postgresql_using="gin",
+        )
+        return
+
+    for statement in SQLITE_FTS_DDL:
+        op.execute(statement)
+    op.execute("INSERT INTO interpretations_fts(interpretations_fts) VALUES ('rebuild')")
+
+
+def downgrade():
+    if op.get_context().dialect.name == "postgresql":
+        op.drop_index("ix_interpretations_plain_text_tsv", table_name="interpretations")
+        return
+
+    for trigger in ("insert", "delete", "update"):
+        op.execute(f"DROP TRIGGER IF EXISTS interpretations_fts_{trigger}")
+    op.execute("DROP TABLE IF EXISTS interpretations_fts")
@@ -0,0 +1,47 @@
+"""search documents version index
+
+Revision ID: 6811348661a8
+Revises: e380bc5b4a6f
+Create Date: 2026-10-17 20:28:29.768351
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '6811348661a8'
+down_revision = 'e380bc5b4a6f'
+branch_labels = None
+depends_on = None
+
+
+TSV = "to_tsvector('english'::regconfig, coalesce(title, '') || ' ' || coalesce(body, ''))"
+
+
+def upgrade():
+    # documents are searched inside a version, SQLite FTS5 has no such index
+    if op.get_context().dialect.name != 'postgresql':
+        return
+    op.execute('CREATE EXTENSION IF NOT EXISTS btree_gin')
+    op.drop_index('ix_search_documents_tsv', table_name='search_documents')
+    op.create_index(
+        'ix_search_documents_version_id_tsv',
+        'search_documents',
+        ['version_id', sa.text(TSV)],
+        unique=False,
+        postgresql_using='gin',
+    )
+
+
+def downgrade():
+    if op.get_context().dialect.name != 'postgresql':
+        return
+    op.drop_index('ix_search_documents_version_id_tsv', table_name='search_documents')
+    op.create_index(
+        'ix_search_documents_tsv',
+        'search_documents',
+        [sa.text(TSV)],
+        unique=False,
+        postgresql_using='gin',
+    )
@@ -0,0 +1,65 @@
+"""tag keys and usage counters
+
+Revision ID: 9169c0c824b6
+Revises: 399cd39f0f48
+Create Date: 2026-10-17 21:02:11.514203
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9169c0c824b6'
+down_revision = '399cd39f0f48'
+branch_labels = None
+depends_on = None
+
+
+LINK_TABLES = (
+    ('books_count', 'book_tags'),
+    ('interpretations_count', 'interpretation_tags'),
+    ('comments_count', 'comment_tags'),
+    ('sections_count', 'section_tags'),
+)
+
+
+def upgrade():
+    # plain ALTER TABLE, batch mode would drop the trigram triggers of SQLite
+    op.add_column('tags', sa.Column('key', sa.String(length=32), nullable=True))
+    for counter in (*(counter for counter, _ in LINK_TABLES), 'usage_count'):
+        op.add_column('tags', sa.Column(counter, sa.Integer(), server_default='0', nullable=False))
+
+    op.execute("UPDATE tags SET key = lower(ltrim(trim(name), '#'))")
+
+    # tags with the same key are merged into the oldest one
+    for _, table in LINK_TABLES:
+        op.execute(
+            f'UPDATE {table} SET tag_id = (SELECT MIN(same.id) FROM tags AS same '
+            f'JOIN tags AS linked ON linked.key = same.key WHERE linked.id = {table}.tag_id) '
+            f'WHERE tag_id IS NOT NULL'
+        )
+    op.execute('DELETE FROM tags WHERE id NOT IN (SELECT MIN(id) FROM tags GROUP BY key)')
+
+    for counter, table in LINK_TABLES:
+        op.execute(
+            f'UPDATE tags SET {counter} = '
+            f'(SELECT COUNT(*) FROM {table} WHERE {table}.tag_id = tags.id)'
+        )
+    op.execute(
+        'UPDATE tags SET usage_count = '
+        'books_count + interpretations_count + comments_count + sections_count'
+    )
+
+    if op.get_context().dialect.name == 'postgresql':
+        op.alter_column('tags', 'key', existing_type=sa.String(length=32), nullable=False)
+    op.create_index(op.f('ix_tags_key'), 'tags', ['key'], unique=True)
+    op.create_index('ix_tags_usage_count_id', 'tags', ['usage_count', 'id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_tags_usage_count_id', table_name='tags')
+    op.drop_index(op.f('ix_tags_key'), table_name='tags')
+    for counter in ('usage_count', *(counter for counter, _ in reversed(LINK_TABLES))):
+        op.drop_column('tags', counter)
+    op.drop_column('tags', 'key')
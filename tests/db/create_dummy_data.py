@@ -1,4 +1,5 @@
-from app import models as m
+from app import models as m, db
+from app.controllers.vote import toggle_interpretation_vote, toggle_comment_vote
 
 
 def create_dummy_data():
@@ -21,12 +22,19 @@ def create_dummy_data():
         user_id=editor.id, book_id=book.id, role=m.BookContributor.Roles.EDITOR
     ).save()
 
-    exported_version = m.BookVersion(
-        semver="1.0.0", book_id=book.id, exported=True
-    ).save()
+    # versions are created outside of request, save() needs current_user
+    exported_version = m.BookVersion(semver="1.0.0", book_id=book.id)
+    db.session.add(exported_version)
     unexported_version = m.BookVersion(
-        semver="1.0.1", book_id=book.id, exported=False, derivative=exported_version
-    ).save()
+        semver="Active",
+        book_id=book.id,
+        is_active=True,
+        derivative=exported_version,
+    )
+    db.session.add(unexported_version)
+    db.session.commit()
+    book.active_version_id = unexported_version.id
+    book.save()
 
     # collections
 
@@ -201,31 +209,22 @@ def create_dummy_data():
     # - comment 3.1 (2 positive, 2 negative)
     # - comment 3.2 (1 negative)
     # - comment 3.3 (1 positive)
-    m.CommentVote(comment_id=comment_3_1.id, user_id=user.id, positive=True).save()
-    m.CommentVote(comment_id=comment_3_1.id, user_id=user_2.id, positive=True).save()
-    m.CommentVote(comment_id=comment_3_1.id, user_id=user_3.id, positive=False).save()
-    m.CommentVote(comment_id=comment_3_1.id, user_id=user_4.id, positive=False).save()
-    m.CommentVote(comment_id=comment_3_2.id, user_id=user_2.id, positive=False).save()
-    m.CommentVote(comment_id=comment_3_3.id, user_id=user_3.id, positive=True).save()
+    toggle_comment_vote(comment_3_1.id, user.id, True)
+    toggle_comment_vote(comment_3_1.id, user_2.id, True)
+    toggle_comment_vote(comment_3_1.id, user_3.id, False)
+    toggle_comment_vote(comment_3_1.id, user_4.id, False)
+    toggle_comment_vote(comment_3_2.id, user_2.id, False)
+    toggle_comment_vote(comment_3_3.id, user_3.id, True)
 
     # - interpretation 1 (2 positive, 1 negative)
     # - interpretation 2 (1 negative)
     # - interpretation 3 (1 positive)
-    m.InterpretationVote(
-        interpretation_id=interpretation_1.id, user_id=user.id, positive=True
-    ).save()
-    m.InterpretationVote(
-        interpretation_id=interpretation_1.id, user_id=user_2.id, positive=True
-    ).save()
-    m.InterpretationVote(
-        interpretation_id=interpretation_1.id, user_id=user_3.id, positive=False
-    ).save()
-    m.InterpretationVote(
-        interpretation_id=interpretation_2.id, user_id=user_2.id, positive=False
-    ).save()
-    m.InterpretationVote(
-        interpretation_id=interpretation_3.id, user_id=user_3.id, positive=True
-    ).save()
+    toggle_interpretation_vote(interpretation_1.id, user.id, True)
+    toggle_interpretation_vote(interpretation_1.id, user_2.id, True)
+    toggle_interpretation_vote(interpretation_1.id, user_3.id, False)
+    toggle_interpretation_vote(interpretation_2.id, user_2.id, False)
+    toggle_interpretation_vote(interpretation_3.id, user_3.id, True)
+    db.session.commit()
 
     # tags
     tag_1 = m.Tag(name="Dummy Tag 1").save()
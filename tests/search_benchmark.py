@@ -0,0 +1,313 @@
+import random
+import string
+import time
+
+import click
+import sqlalchemy as sa
+
+from app import models as m, db, create_app
+from app.logger import log
+from app.controllers.book_search import search_books
+from app.controllers.search_backend import search_interpretations
+from app.controllers.trigram_search import trigram_match, trigram_rank
+
+BATCH_SIZE = 10000
+VOCABULARY = [
+    f"{first}{second}"
+    for first in ("ka", "lo", "mi", "nu", "pe", "ro", "su", "ti", "va", "ze")
+    for second in ("bar", "den", "fil", "gon", "hur", "lax", "mon", "pit", "sor", "tev")
+]
+# word, phrase and typeahead prefix
+QUERIES = ("kabar", '"lobar mifil"', "zete*")
+TYPEAHEAD_BUDGET_MS = 20
+
+
+def _fill(rows: int, seed: int) -> int:
+    """Synthetic book with one section of `rows` interpretations"""
+    rnd = random.Random(seed)
+    user = m.User(username=f"search_benchmark_{seed}", password="benchmark")
+    db.session.add(user)
+    db.session.flush()
+    book = m.Book(label="Search benchmark", user_id=user.id)
+    db.session.add(book)
+    db.session.flush()
+    version = m.BookVersion(semver="Active", book_id=book.id, is_active=True)
+    db.session.add(version)
+    db.session.flush()
+    section = m.Section(label="Benchmark", version_id=version.id, user_id=user.id)
+    db.session.add(section)
+    db.session.flush()
+
+    for start in range(0, rows, BATCH_SIZE):
+        batch = []
+        for _ in range(min(BATCH_SIZE, rows - start)):
+            plain_text = " ".join(rnd.choices(VOCABULARY, k=rnd.randint(10, 60)))
+            batch.append(
+                dict(
+                    text=f"<p>{plain_text}</p>",
+                    plain_text=plain_text,
+                    user_id=user.id,
+                    section_id=section.id,
+                    version_id=version.id,
+                    book_id=book.id,
+                )
+            )
+        db.session.execute(sa.insert(m.Interpretation), batch)
+        log(log.INFO, "Inserted [%d] interpretations", start + len(batch))
+    return book.id
+
+
+def _like_query(q: str):
+    # search before the full text backend
+    pattern = q.strip('"*').lower()
+    return m.Interpretation.query.order_by(m.Interpretation.id).filter(
+        sa.func.lower(m.Interpretation.plain_text).like(f"%{pattern}%"),
+        m.Interpretation.copy_of == 0,
+    )
+
+
+def _measure(query, per_page: int) -> float:
+    start = time.perf_counter()
+    query.count()
+    query.limit(per_page).all()
+    return (time.perf_counter() - start) * 1000
+
+
+def benchmark_search(
+    rows: int, per_page: int = 10, seed: int = 0
+) -> list[tuple[str, float, float]]:
+    """Milliseconds of count and first page of LIKE and full text search
+    for every query of QUERIES. Synthetic data is rolled back"""
+    results = []
+    try:
+        _fill(rows, seed)
+        db.session.flush()
+        for q in QUERIES:
+            like_ms = _measure(_like_query(q), per_page)
+            search_ms = _measure(search_interpretations(q), per_page)
+            log(log.INFO, "Query [%s] like [%.1f] search [%.1f]", q, like_ms, search_ms)
+            results.append((q, like_ms, search_ms))
+    finally:
+        db.session.rollback()
+    return results
+
+
+def _fill_names(rows: int, seed: int) -> list[str]:
+    """Random names like generated usernames, returns some of them"""
+    rnd = random.Random(seed)
+    samples = []
+    for start in range(0, rows, BATCH_SIZE):
+        count = min(BATCH_SIZE, rows - start)
+        names = list(
+            {
+                "".join(rnd.choices(string.ascii_lowercase, k=rnd.randint(10, 16)))
+                for _ in range(count)
+            }
+        )
+        db.session.execute(
+            sa.insert(m.User), [dict(username=name, password_hash="") for name in names]
+        )
+        db.session.execute(sa.insert(m.Tag), [dict(name=name) for name in names])
+        samples.append(names[0])
+        log(log.INFO, "Inserted [%d] users and tags", start + len(names))
+    return samples
+
+
+def benchmark_typeahead(
+    rows: int, limit: int = 10, seed: int = 0
+) -> list[tuple[str, float]]:
+    """Milliseconds of user and tag typeahead by a part of a name and by a name
+    with a typo over `rows` users and tags. Synthetic data is rolled back"""
+    results = []
+    try:
+        name = _fill_names(rows, seed)[-1]
+        db.session.flush()
+        typo = name[:2] + name[3] + name[2] + name[4:]
+        for q in (name[1:5], typo):
+            for model, column in ((m.User, m.User.username), (m.Tag, m.Tag.name)):
+                query = (
+                    model.query.filter(trigram_match(column, q, fuzzy=True))
+                    .order_by(trigram_rank(column, q).desc(), model.id)
+                    .limit(limit)
+                )
+                start = time.perf_counter()
+                query.all()
+                ms = (time.perf_counter() - start) * 1000
+                log(log.INFO, "Typeahead [%s] [%s] [%.1f]", model.__tablename__, q, ms)
+                results.append((f"{model.__tablename__}: {q}", ms))
+    finally:
+        db.session.rollback()
+    return results
+
+
+def _fill_books(books: int, collections: int, sections: int, seed: int):
+    """Books with `collections` collections and `sections` sections,
+    an interpretation in every section"""
+    rnd = random.Random(seed)
+    user = m.User(username=f"book_search_benchmark_{seed}", password="benchmark")
+    db.session.add(user)
+    db.session.flush()
+    for book_index in range(books):
+        book = m.Book(label=f"Book {book_index}", user_id=user.id)
+        db.session.add(book)
+        db.session.flush()
+        version = m.BookVersion(semver="Active", book_id=book.id, is_active=True)
+        db.session.add(version)
+        db.session.flush()
+        db.session.execute(
+            sa.insert(m.Collection),
+            [
+                dict(
+                    label=" ".join(rnd.choices(VOCABULARY, k=3)), version_id=version.id
+                )
+                for _ in range(collections)
+            ],
+        )
+        collection_ids = db.session.scalars(
+            sa.select(m.Collection.id).where(m.Collection.version_id == version.id)
+        ).all()
+        db.session.execute(
+            sa.insert(m.Section),
+            [
+                dict(
+                    label=" ".join(rnd.choices(VOCABULARY, k=3)),
+                    version_id=version.id,
+                    collection_id=collection_ids[i % collections],
+                    position=i,
+                )
+                for i in range(sections)
+            ],
+        )
+        section_ids = db.session.scalars(
+            sa.select(m.Section.id).where(m.Section.version_id == version.id)
+        ).all()
+        db.session.execute(
+            sa.insert(m.Interpretation),
+            [
+                dict(
+                    text=" ".join(rnd.choices(VOCABULARY, k=20)),
+                    plain_text=" ".join(rnd.choices(VOCABULARY, k=20)),
+                    section_id=section_id,
+                    version_id=version.id,
+                    book_id=book.id,
+                    user_id=user.id,
+                )
+                for section_id in section_ids
+            ],
+        )
+        log(log.INFO, "Inserted book [%d]", book_index + 1)
+
+
+def _joined_book_search(q: str):
+    # book search before matching_book_ids
+    return (
+        m.Book.query.join(m.BookVersion, m.BookVersion.book_id == m.Book.id)
+        .join(m.Collection, m.BookVersion.id == m.Collection.version_id, full=True)
+        .join(m.Section, m.BookVersion.id == m.Section.version_id, full=True)
+        .join(m.Interpretation, m.Interpretation.section_id == m.Section.id, full=True)
+        .filter(
+            sa.or_(
+                sa.func.lower(m.Book.label).like(f"%{q}%"),
+                sa.and_(
+                    sa.func.lower(m.Collection.label).like(f"%{q}%"),
+                    m.Collection.is_deleted.is_(False),
+                    m.Collection.copy_of == 0,
+                    m.Collection.is_root.is_(False),
+                ),
+                sa.and_(
+                    sa.func.lower(m.Section.label).like(f"%{q}%"),
+                    m.Section.copy_of == 0,
+                    m.Section.is_deleted.is_(False),
+                ),
+                sa.and_(
+                    sa.func.lower(m.Interpretation.plain_text).like(f"%{q}%"),
+                    m.Interpretation.is_deleted.is_(False),
+                    m.Interpretation.copy_of == 0,
+                    m.Section.is_deleted.is_(False),
+                ),
+            ),
+            m.Book.is_deleted.is_(False),
+        )
+        .group_by(m.Book.id)
+    )
+
+
+def benchmark_book_search(
+    books: int, collections: int, sections: int, per_page: int = 10, seed: int = 0
+) -> list[tuple[str, float, float]]:
+    """Milliseconds of count and first page of the joined book search and
+    of matching_book_ids over books with many collections and sections.
+    Synthetic data is rolled back"""
+    results = []
+    try:
+        _fill_books(books, collections, sections, seed)
+        db.session.flush()
+        # collection or section label, interpretation text
+        for q in ("kabar lo", "mifil"):
+            joined = _joined_book_search(q)
+            start = time.perf_counter()
+            # the joined search was counted twice
+            joined.count()
+            joined.count()
+            joined.limit(per_page).all()
+            joined_ms = (time.perf_counter() - start) * 1000
+            union_ms = _measure(search_books(q), per_page)
+            log(
+                log.INFO,
+                "Books [%s] joined [%.1f] union [%.1f]",
+                q,
+                joined_ms,
+                union_ms,
+            )
+            results.append((q, joined_ms, union_ms))
+    finally:
+        db.session.rollback()
+    return results
+
+
+@click.group()
+def cli():
+    """Search latency over synthetic data of the configured database, the data
+    is rolled back. Run as `python -m tests.search_benchmark <command>`"""
+
+
+@cli.command("search")
+@click.option("--rows", default=1000000, help="Synthetic interpretations")
+def search(rows: int):
+    """Compare LIKE and full text search latency"""
+    with create_app().app_context():
+        print(f"{'query':<20}{'like, ms':>12}{'search, ms':>12}")
+        for q, like_ms, search_ms in benchmark_search(rows):
+            print(f"{q:<20}{like_ms:>12.1f}{search_ms:>12.1f}")
+
+
+@cli.command("books")
+@click.option("--books", default=10, help="Synthetic books")
+@click.option("--collections", default=300, help="Collections per book")
+@click.option("--sections", default=3000, help="Sections per book")
+def books(books: int, collections: int, sections: int):
+    """Compare joined and union book search latency"""
+    with create_app().app_context():
+        print(f"{'query':<20}{'joined, ms':>12}{'union, ms':>12}")
+        for q, joined_ms, union_ms in benchmark_book_search(
+            books, collections, sections
+        ):
+            print(f"{q:<20}{joined_ms:>12.1f}{union_ms:>12.1f}")
+
+
+@cli.command("typeahead")
+@click.option("--rows", default=1000000, help="Synthetic users and tags")
+def typeahead(rows: int):
+    """Time user and tag typeahead, fail if it is over the budget"""
+    with create_app().app_context():
+        slow = False
+        for name, ms in benchmark_typeahead(rows):
+            slow = slow or ms > TYPEAHEAD_BUDGET_MS
+            print(f"{name:<30}{ms:>10.1f} ms")
+    if slow:
+        print(f"Typeahead is slower than {TYPEAHEAD_BUDGET_MS} ms")
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    cli()
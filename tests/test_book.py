@@ -3,6 +3,10 @@ from flask.testing import FlaskClient, FlaskCliRunner
 
 from app import models as m, db
 from app.controllers.create_access_groups import create_moderator_group
+from app.controllers.delete_nested_book_entities import (
+    delete_nested_book_entities,
+    delete_nested_collection_entities,
+)
 from tests.utils import (
     add_contributor,
     create,
@@ -17,6 +21,10 @@ from tests.utils import (
     create_collection,
     create_section,
     create_sub_collection,
+    create_interpretation,
+    create_comment,
+    fill_book,
+    count_queries,
 )
 
 
@@ -1141,3 +1149,93 @@ def test_interpretation_in_home_last_inter_section(
     assert response
     assert response.status_code == 200
     assert str.encode(text_1) in response.data
+
+
+def test_delete_nested_entities_query_count(client: FlaskClient):
+    login(client)
+    small_book: m.Book = create_book(client)
+    fill_book(small_book, collections=1, sections=1)
+    big_book: m.Book = create_book(client)
+    fill_book(big_book, collections=5, sections=5)
+    # thread of replies
+    comment: m.Comment = big_book.active_version.approved_comments[0]
+    for _ in range(3):
+        comment = m.Comment(
+            text="Reply",
+            parent_id=comment.id,
+            interpretation_id=comment.interpretation_id,
+            user_id=comment.user_id,
+        ).save()
+
+    queries = {}
+    for book in (small_book, big_book):
+        with count_queries() as book_queries:
+            delete_nested_book_entities(book)
+        queries[book.id] = len(book_queries)
+        db.session.commit()
+        check_if_nested_book_entities_is_deleted(book)
+    assert queries[small_book.id] == queries[big_book.id]
+    assert comment.is_deleted
+
+
+def test_delete_nested_collection_entities(client: FlaskClient):
+    login(client)
+    book: m.Book = create_book(client)
+    fill_book(book, collections=2, sections=2)
+    collection, deleted_sub_collection = (
+        m.Collection.query.filter_by(label=label).first()
+        for label in ("Collection 0", "Sub collection 0")
+    )
+    collection.is_deleted = True
+    delete_nested_collection_entities(collection)
+    db.session.commit()
+
+    check_if_nested_collection_entities_is_deleted(collection)
+    assert deleted_sub_collection.is_deleted
+    assert all(section.is_deleted for section in deleted_sub_collection.sections)
+    # other collections are not touched
+    alive = m.Collection.query.filter_by(label="Sub collection 1").first()
+    assert not alive.is_deleted
+    assert not any(section.is_deleted for section in alive.sections)
+
+
+def test_interpretation_comment_book_ids(client: FlaskClient):
+    login(client)
+    book: m.Book = create_book(client)
+    collection, _ = create_collection(client, book.id)
+    section, _ = create_section(client, book.id, collection.id)
+    interpretation, _ = create_interpretation(client, book.id, section.id)
+    comment, _ = create_comment(client, book.id, interpretation.id)
+    for entity in (interpretation, comment):
+        assert entity.version_id == book.active_version_id
+        assert entity.book_id == book.id
+        assert entity.book == book
+
+    # aggregates of the book are filtered by version_id, parents are joined
+    # by primary key to skip content of deleted ones
+    comment.approved = True
+    comment.save()
+    db.session.expire_all()
+    book = db.session.get(m.Book, book.id)
+    book_id, version_id = book.id, book.active_version_id
+    with count_queries() as queries:
+        assert book.interpretations == [interpretation]
+        assert book.approved_comments == [comment]
+    assert len(queries) == 2
+    assert all("book_versions" not in query for query in queries)
+
+    # section moved to the collection of other book follows it
+    other_book: m.Book = create_book(client)
+    other_collection, _ = create_collection(client, other_book.id)
+    response = client.post(
+        f"/book/{book_id}/{section.id}/section/change_position",
+        json=dict(position=0, collection_id=other_collection.id),
+    )
+    assert response.status_code == 200
+    db.session.expire_all()
+    section = db.session.get(m.Section, section.id)
+    assert section.version_id == other_book.active_version_id
+    for entity in (section.interpretations[0], section.interpretations[0].comments[0]):
+        assert entity.version_id == other_book.active_version_id
+        assert entity.book_id == other_book.id
+    assert not db.session.get(m.BookVersion, version_id).interpretations
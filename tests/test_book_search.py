@@ -0,0 +1,96 @@
+from flask.testing import FlaskClient
+
+from app import models as m
+from tests.utils import (
+    login,
+    count_queries,
+    create_book,
+    create_collection,
+    create_sub_collection,
+    create_section,
+    create_interpretation,
+)
+
+
+def edit_interpretation(client: FlaskClient, interpretation: m.Interpretation, text):
+    response = client.post(
+        f"/book/{interpretation.book_id}/{interpretation.id}/edit_interpretation",
+        data=dict(interpretation_id=interpretation.id, text=text),
+        follow_redirects=True,
+    )
+    assert response.status_code == 200
+
+
+def test_book_search(client: FlaskClient):
+    login(client)
+    book: m.Book = create_book(client)
+    collection, _ = create_collection(client, book.id)
+    sub_collection, _ = create_sub_collection(client, book.id, collection.id)
+    section, _ = create_section(client, book.id, sub_collection.id)
+    interpretation, _ = create_interpretation(client, book.id, section.id)
+    edit_interpretation(client, interpretation, "Let there be light")
+
+    # the same text in another book is not found
+    other_book: m.Book = create_book(client)
+    other_collection, _ = create_collection(client, other_book.id)
+    other_section, _ = create_section(client, other_book.id, other_collection.id)
+    other, _ = create_interpretation(client, other_book.id, other_section.id)
+    edit_interpretation(client, other, "Let there be light")
+
+    response = client.get(f"/book/{book.id}/search?q=light")
+    assert response.status_code == 200
+    assert not response.json["has_next"]
+    hits = response.json["hits"]
+    assert len(hits) == 1
+    hit = hits[0]
+    assert hit["kind"] == "interpretation"
+    assert hit["id"] == interpretation.id
+    assert hit["title"] == section.label
+    assert "<mark>light</mark>" in hit["snippet"]
+    assert hit["url"] == f"/book/{book.id}/{interpretation.id}/preview"
+    assert [crumb["label"] for crumb in hit["path"]] == [
+        collection.label,
+        sub_collection.label,
+        section.label,
+    ]
+    assert hit["path"][-1]["url"] == f"/book/{book.id}/{section.id}/interpretations"
+
+    # section label matches the section and its interpretation
+    response = client.get(f"/book/{book.id}/search?q={section.label}")
+    hits = {(hit["kind"], hit["id"]): hit for hit in response.json["hits"]}
+    assert set(hits) == {("section", section.id), ("interpretation", interpretation.id)}
+    assert [crumb["label"] for crumb in hits[("section", section.id)]["path"]] == [
+        collection.label,
+        sub_collection.label,
+    ]
+
+    response = client.get(f"/book/{book.id}/search?q={sub_collection.label}")
+    hits = response.json["hits"]
+    assert [(hit["kind"], hit["id"]) for hit in hits] == [
+        ("collection", sub_collection.id)
+    ]
+    assert hits[0]["url"].endswith(f"#collection-{sub_collection.label}")
+    assert [crumb["label"] for crumb in hits[0]["path"]] == [collection.label]
+
+    # versions of other books and missing books are not searched
+    response = client.get(
+        f"/book/{book.id}/search?q=light&version_id={other_book.active_version_id}"
+    )
+    assert response.status_code == 404
+    response = client.get("/book/0/search?q=light")
+    assert response.status_code == 404
+    response = client.get(f"/book/{book.id}/search?q=")
+    assert response.json["hits"] == []
+
+    # the number of queries does not depend on the number of hits
+    with count_queries() as queries:
+        client.get(f"/book/{book.id}/search?q=light")
+    one_hit = len(queries)
+
+    for _ in range(3):
+        more, _ = create_interpretation(client, book.id, section.id)
+        edit_interpretation(client, more, "Light of the world")
+    with count_queries() as queries:
+        response = client.get(f"/book/{book.id}/search?q=light")
+    assert len(response.json["hits"]) == 4
+    assert len(queries) == one_hit
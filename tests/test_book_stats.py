@@ -0,0 +1,121 @@
+from flask.testing import FlaskClient, FlaskCliRunner
+
+from app import models as m, db
+from tests.utils import (
+    login,
+    count_queries,
+    create_book,
+    create_collection,
+    create_section,
+    create_interpretation,
+    create_comment,
+    add_contributor,
+    create,
+)
+
+
+def stats(book: m.Book) -> m.BookStats:
+    book_stats = m.BookStats.query.filter_by(book_id=book.id).one()
+    db.session.refresh(book_stats)
+    return book_stats
+
+
+def test_book_stats(client: FlaskClient, runner: FlaskCliRunner):
+    login(client)
+    book: m.Book = create_book(client)
+    book_stats = stats(book)
+    assert (
+        book_stats.stars_count,
+        book_stats.interpretations_count,
+        book_stats.comments_count,
+        book_stats.contributors_count,
+    ) == (0, 0, 0, 0)
+
+    response = client.post(f"/star/{book.id}")
+    assert response.status_code == 200
+    assert stats(book).stars_count == 1
+
+    collection, _ = create_collection(client, book.id)
+    section, _ = create_section(client, book.id, collection.id)
+    interpretation, _ = create_interpretation(client, book.id, section.id)
+    create_comment(client, book.id, interpretation.id)
+    create_comment(client, book.id, interpretation.id)
+    assert stats(book).interpretations_count == 1
+    assert stats(book).comments_count == 2
+
+    contributor = create("contributor", "contributor")
+    add_contributor(client, book.id, contributor.id, m.BookContributor.Roles.EDITOR)
+    assert stats(book).contributors_count == 1
+
+    last_activity_at = stats(book).last_activity_at
+    response = client.post(
+        f"/vote/interpretation/{interpretation.id}", json=dict(positive=True)
+    )
+    assert response.status_code == 200
+    assert stats(book).last_activity_at > last_activity_at
+
+    response = client.post(
+        f"/book/{book.id}/{interpretation.id}/delete_interpretation",
+        data=dict(interpretation_id=interpretation.id),
+        follow_redirects=True,
+    )
+    assert response.status_code == 200
+    assert stats(book).interpretations_count == 0
+    assert stats(book).comments_count == 0
+
+    # sections and collections are deleted with their content
+    interpretation, _ = create_interpretation(client, book.id, section.id)
+    assert stats(book).interpretations_count == 1
+    response = client.post(
+        f"/book/{book.id}/{collection.id}/delete", follow_redirects=True
+    )
+    assert response.status_code == 200
+    assert stats(book).interpretations_count == 0
+
+    response = client.post(f"/star/{book.id}")
+    assert stats(book).stars_count == 0
+
+    # drift is fixed by the reconciliation
+    m.BookStats.query.update({"stars_count": 5, "interpretations_count": 7})
+    m.BookStats.query.filter_by(book_id=book.id).delete()
+    db.session.commit()
+    result = runner.invoke(args=["reconcile-book-stats"])
+    assert result.exit_code == 0
+    assert "Book stats: 1 added, 0 fixed" in result.output
+    other: m.Book = create_book(client)
+    m.BookStats.query.filter_by(book_id=other.id).update({"stars_count": 5})
+    db.session.commit()
+    result = runner.invoke(args=["reconcile-book-stats"])
+    assert "Book stats: 0 added, 1 fixed" in result.output
+    assert stats(other).stars_count == 0
+    assert stats(book).contributors_count == 1
+
+
+def test_book_listings(client: FlaskClient):
+    login(client)
+    books: list[m.Book] = [create_book(client) for _ in range(3)]
+    client.post(f"/star/{books[1].id}")
+    collection, _ = create_collection(client, books[2].id)
+    section, _ = create_section(client, books[2].id, collection.id)
+    create_interpretation(client, books[2].id, section.id)
+
+    def listed(url: str) -> list[int]:
+        with count_queries() as queries:
+            response = client.get(url)
+        assert response.status_code == 200
+        assert not [query for query in queries if "GROUP BY" in query]
+        return [
+            book.id
+            for book in sorted(
+                [book for book in books if book.label.encode() in response.data],
+                key=lambda book: response.data.index(book.label.encode()),
+            )
+        ]
+
+    assert listed("/home/explore_books?sort=favorited")[0] == books[1].id
+    assert listed("/home/explore_books?sort=interpretations")[0] == books[2].id
+    assert listed("/home/explore_books?sort=recent") == [
+        book.id for book in reversed(books)
+    ]
+    assert listed("/book/my_library?sort=interpretations")[0] == books[2].id
+    assert listed("/book/favorite_books") == [books[1].id]
@@ -0,0 +1,83 @@
+from flask.testing import FlaskClient
+
+from app import models as m, db
+from app.controllers.book_tree import BookTree
+from app.controllers.featured_interpretation import update_featured_interpretation
+from tests.utils import (
+    login,
+    create_book,
+    fill_book,
+    count_queries,
+)
+
+
+def test_book_tree(client: FlaskClient):
+    login(client)
+    book = create_book(client)
+    fill_book(book, collections=2, sections=3)
+
+    tree = BookTree.load(book.active_version)
+    assert tree.root
+    assert tree.root.is_root
+    assert len(tree.children_collections) == 2
+    assert len(tree.sections) == 6
+
+    collection = tree.children_collections[0]
+    assert collection.label == "Collection 0"
+    assert len(collection.active_children) == 1
+    sub_collection = collection.active_children[0]
+    assert sub_collection.parent.id == collection.id
+    assert [section.position for section in sub_collection.active_sections] == [
+        0,
+        1,
+        2,
+    ]
+
+    section = sub_collection.active_sections[0]
+    model: m.Section = db.session.get(m.Section, section.id)
+    assert section.approved_interpretation == model.approved_interpretation
+    assert len(section.active_interpretations) == 1
+    assert section.approved_comments == model.approved_comments
+
+    # approved interpretation is preferred over the oldest one
+    approved = m.Interpretation(
+        text="Approved", section_id=section.id, approved=True
+    ).save()
+    update_featured_interpretation(model)
+    model.save()
+    # deleted collections are not in the tree
+    deleted = db.session.get(m.Collection, tree.children_collections[1].id)
+    deleted.is_deleted = True
+    deleted.save()
+
+    tree = BookTree.load(book.active_version)
+    assert len(tree.children_collections) == 1
+    assert len(tree.sections) == 3
+    section = tree.sections[section.id]
+    assert section.approved_interpretation == approved
+    assert len(section.active_interpretations) == 2
+
+
+def test_book_tree_query_count_is_flat(client: FlaskClient):
+    login(client)
+    small_book = create_book(client)
+    fill_book(small_book, collections=1, sections=1)
+    big_book = create_book(client)
+    fill_book(big_book, collections=5, sections=10)
+
+    queries_count = {}
+    for book in (small_book, big_book):
+        db.session.expire_all()
+        version = db.session.get(m.Book, book.id).active_version
+        with count_queries() as queries:
+            BookTree.load(version)
+        queries_count[book.id] = len(queries)
+    assert queries_count[small_book.id] == queries_count[big_book.id]
+
+    for book in (small_book, big_book):
+        db.session.expire_all()
+        with count_queries() as queries:
+            response = client.get(f"/book/{book.id}/collections")
+        assert response.status_code == 200
+        queries_count[book.id] = len(queries)
+    assert queries_count[small_book.id] == queries_count[big_book.id]
@@ -0,0 +1,94 @@
+from click.testing import Result
+from flask.testing import FlaskClient, FlaskCliRunner
+
+from app import models as m, db
+from tests.utils import (
+    login,
+    logout,
+    create_book,
+    create_collection,
+    create_section,
+    create_interpretation,
+)
+
+
+def test_featured_interpretation(client: FlaskClient):
+    login(client)
+    book = create_book(client)
+    collection, _ = create_collection(client, book.id)
+    section, _ = create_section(client, book.id, collection.id)
+    assert not section.featured_interpretation_id
+
+    oldest, _ = create_interpretation(client, book.id, section.id)
+    assert section.featured_interpretation_id == oldest.id
+    assert section.approved_interpretation == oldest
+
+    voted, _ = create_interpretation(client, book.id, section.id)
+    assert section.featured_interpretation_id == oldest.id
+
+    logout(client)
+    login(client, "voter", "voter")
+    response = client.post(
+        f"/vote/interpretation/{voted.id}",
+        headers={"Content-Type": "application/json"},
+        json=dict(positive=True),
+    )
+    assert response.status_code == 200
+    assert section.featured_interpretation_id == voted.id
+
+    # missing pointer falls back to the same rule, not to the oldest
+    section.featured_interpretation_id = None
+    db.session.commit()
+    assert section.approved_interpretation == voted
+    section.featured_interpretation_id = voted.id
+    db.session.commit()
+
+    logout(client)
+    login(client)
+    response = client.post(f"/approve/interpretation/{oldest.id}")
+    assert response.status_code == 200
+    assert response.json["approve"]
+    assert section.featured_interpretation_id == oldest.id
+
+    response = client.post(
+        f"/book/{book.id}/{oldest.id}/delete_interpretation",
+        data=dict(interpretation_id=oldest.id),
+        follow_redirects=True,
+    )
+    assert response.status_code == 200
+    assert section.featured_interpretation_id == voted.id
+
+    response = client.post(
+        f"/book/{book.id}/{voted.id}/delete_interpretation",
+        data=dict(interpretation_id=voted.id),
+        follow_redirects=True,
+    )
+    assert response.status_code == 200
+    assert section.featured_interpretation_id is None
+    assert section.approved_interpretation is None
+
+
+def test_backfill_featured_interpretations(client: FlaskClient, runner: FlaskCliRunner):
+    login(client)
+    book = create_book(client)
+    collection, _ = create_collection(client, book.id)
+    sections = []
+    for _ in range(3):
+        section, _ = create_section(client, book.id, collection.id)
+        create_interpretation(client, book.id, section.id)
+        sections.append(section)
+    approved = m.Interpretation(
+        text="Approved", section_id=sections[0].id, approved=True
+    ).save()
+    m.Section.query.update({m.Section.featured_interpretation_id: None})
+    db.session.commit()
+
+    res: Result = runner.invoke(
+        args=["backfill-featured-interpretations", "--batch-size", "2"]
+    )
+    assert "3 sections" in res.stdout
+
+    sections = m.Section.query.order_by(m.Section.id).all()
+    assert sections[0].featured_interpretation_id == approved.id
+    for section in sections[1:]:
+        assert section.featured_interpretation_id == section.interpretations[0].id
@@ -1,14 +1,103 @@
+import time
+
 from flask import current_app as Response
 from flask.testing import FlaskClient
 
-from app import models as m
+from app import models as m, db
+from app.controllers import fork
+from app.controllers.book_tree import BookTree
+from app.controllers.copy_access_groups import copy_access_groups
+from app.controllers.version_copy import copy_version_content
+from app.logger import log
 from tests.utils import (
     login,
     logout,
     create_book,
+    fill_book,
+    count_queries,
 )
 
 
+def row_by_row_copy_collection(
+    collection: m.Collection,
+    parent_id: int,
+    version_id: int,
+    add_copy_of: bool = True,
+    book: m.Book = None,
+):
+    """Row by row copy of the collection made by forks and versions before
+    copy_version_content, the baseline of the benchmark"""
+    collection_copy = m.Collection(
+        label=collection.label,
+        about=collection.about,
+        is_root=collection.is_root,
+        is_leaf=collection.is_leaf,
+        position=collection.position,
+        parent_id=parent_id,
+        version_id=version_id,
+    )
+    if add_copy_of:
+        collection_copy.copy_of = collection.id
+    log(log.INFO, "Create copy of collection [%s]", collection)
+    collection_copy.save()
+
+    if book:
+        copy_access_groups(book, collection_copy)
+
+    if collection.active_sections:
+        for section in collection.active_sections:
+            section: m.Section
+            section_copy = m.Section(
+                label=section.label,
+                collection_id=collection_copy.id,
+                user_id=section.user_id,
+                version_id=version_id,
+                position=section.position,
+            )
+            if add_copy_of:
+                section_copy.copy_of = section.id
+            log(log.INFO, "Create copy of section [%s]", section)
+            section_copy.save()
+            copy_access_groups(collection_copy, section_copy)
+
+            interpretation: m.Interpretation = section.approved_interpretation
+            if not interpretation:
+                continue
+
+            interpretation_copy = m.Interpretation(
+                text=interpretation.text,
+                plain_text=interpretation.plain_text,
+                approved=interpretation.approved,
+                user_id=interpretation.user_id,
+                section_id=section_copy.id,
+            )
+            if add_copy_of:
+                interpretation_copy.copy_of = interpretation.id
+            log(log.INFO, "Create copy of interpretation [%s]", interpretation_copy)
+            interpretation_copy.save()
+            copy_access_groups(section_copy, interpretation_copy)
+
+            comments: list[m.Comment] = section.approved_comments
+            for comment in comments:
+                comment_copy = m.Comment(
+                    text=comment.text,
+                    approved=comment.approved,
+                    edited=comment.edited,
+                    user_id=comment.user_id,
+                    interpretation_id=interpretation_copy.id,
+                )
+                if add_copy_of:
+                    comment_copy.copy_of = comment.id
+                log(log.INFO, "Create copy of comment [%s]", comment)
+                comment_copy.save()
+
+    elif collection.active_children:
+        for child in collection.active_children:
+            row_by_row_copy_collection(
+                child, collection_copy.id, version_id, add_copy_of, book=book
+            )
+
+
 def test_fork_book(client: FlaskClient):
     login(client)
 
@@ -36,3 +125,129 @@ def test_fork_book(client: FlaskClient):
     fork = user.books[0]
     assert fork.original_book_id == book.id
     assert fork.user_id != book.user_id
+    assert fork.active_version.book_id == fork.id
+    assert fork.active_version.is_active
+
+
+def test_failed_fork_leaves_nothing(client: FlaskClient, monkeypatch):
+    login(client)
+    book: m.Book = create_book(client)
+    books_count = m.Book.query.count()
+    groups_count = m.AccessGroup.query.count()
+
+    def broken_copy(*args, **kwargs):
+        raise RuntimeError("copy failed")
+
+    monkeypatch.setattr(fork, "copy_version_content", broken_copy)
+    response = client.post(
+        f"/book/{book.id}/fork",
+        data=dict(label="Label", about="About"),
+        follow_redirects=True,
+    )
+    assert response.status_code == 200
+    job: m.Job = m.Job.query.filter_by(kind=m.Job.Kinds.FORK_BOOK).first()
+    assert "copy failed" in job.error
+    # the skeleton of the fork is rolled back with the copy
+    assert m.Book.query.count() == books_count
+    assert m.AccessGroup.query.count() == groups_count
+    assert not job.result
+
+
+def test_fork_book_content(client: FlaskClient):
+    login(client)
+    book: m.Book = create_book(client)
+    fill_book(book, collections=2, sections=3)
+    tag = m.Tag(name="forked").save()
+    section = book.active_version.sections[0]
+    m.SectionTag(tag_id=tag.id, section_id=section.id).save()
+    m.InterpretationTag(
+        tag_id=tag.id, interpretation_id=section.featured_interpretation_id
+    ).save()
+
+    logout(client)
+    _, user = login(client, "Test_U")
+    response: Response = client.post(
+        f"/book/{book.id}/fork",
+        data=dict(label="Label", about="About"),
+        follow_redirects=True,
+    )
+    assert b"Success" in response.data
+
+    fork: m.Book = user.books[0]
+    tree = BookTree.load(fork.active_version)
+    assert len(tree.children_collections) == 2
+    assert len(tree.sections) == 6
+    fork_access_groups = set(fork.access_groups)
+    assert len(fork_access_groups) == 2
+    for collection in tree.collections.values():
+        if not collection.is_root:
+            assert set(collection.access_groups) == fork_access_groups
+    for section_copy in tree.sections.values():
+        assert set(section_copy.access_groups) == fork_access_groups
+        assert section_copy.approved_interpretation
+        assert section_copy.approved_interpretation.id == (
+            section_copy.featured_interpretation_id
+        )
+        assert set(section_copy.approved_interpretation.access_groups) == (
+            fork_access_groups
+        )
+        assert len(section_copy.approved_comments) == 1
+        for entity in (
+            section_copy.approved_interpretation,
+            section_copy.approved_comments[0],
+        ):
+            assert entity.book_id == fork.id
+            assert entity.version_id == fork.active_version_id
+
+    section_copy = next(
+        section_copy
+        for section_copy in tree.sections.values()
+        if section_copy.label == section.label
+    )
+    assert section_copy.tags == [tag]
+    assert section_copy.approved_interpretation.tags == [tag]
+
+
+def test_copy_version_benchmark(client: FlaskClient):
+    """Set based copy costs the same number of queries for any book size,
+    row by row copy grows with every entity"""
+    login(client)
+    small_book = create_book(client)
+    fill_book(small_book, collections=1, sections=1)
+    big_book = create_book(client)
+    fill_book(big_book, collections=5, sections=10)
+
+    queries_count = {}
+    for book in (small_book, big_book):
+        version = m.BookVersion(semver="copy", book_id=book.id).save()
+        root = m.Collection(version_id=version.id, label="Root", is_root=True).save()
+        db.session.expire_all()
+        started = time.perf_counter()
+        with count_queries() as queries:
+            copied = copy_version_content(book.active_version, version.id, root.id)
+            db.session.commit()
+        log(
+            log.INFO,
+            "copy_version_content: [%s] in [%d] queries [%.3f]s",
+            copied,
+            len(queries),
+            time.perf_counter() - started,
+        )
+        queries_count[book.id] = len(queries)
+    assert copied == dict(collections=10, sections=50, interpretations=50, comments=50)
+    assert queries_count[small_book.id] == queries_count[big_book.id]
+
+    version = m.BookVersion(semver="row by row", book_id=big_book.id).save()
+    root = m.Collection(version_id=version.id, label="Root", is_root=True).save()
+    db.session.expire_all()
+    started = time.perf_counter()
+    with count_queries() as queries:
+        for collection in big_book.active_version.root_collection.active_children:
+            row_by_row_copy_collection(collection, root.id, version.id)
+    log(
+        log.INFO,
+        "row_by_row_copy_collection: [%d] queries [%.3f]s",
+        len(queries),
+        time.perf_counter() - started,
+    )
+    assert len(queries) > 10 * queries_count[big_book.id]
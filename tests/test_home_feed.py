@@ -0,0 +1,116 @@
+from flask.testing import FlaskClient
+
+from app import models as m, db
+from app.controllers.home_feed import recount_comments
+from app.controllers.rankings import refresh_rankings
+from tests.utils import (
+    login,
+    count_queries,
+    create_book,
+    create_collection,
+    create_section,
+    create_interpretation,
+    create_comment,
+)
+
+
+def test_comments_count(client: FlaskClient):
+    _, user = login(client)
+    book: m.Book = create_book(client)
+    collection, _ = create_collection(client, book.id)
+    section, _ = create_section(client, book.id, collection.id)
+    interpretation, _ = create_interpretation(client, book.id, section.id)
+    assert interpretation.comments_count == 0
+
+    comment, _ = create_comment(client, book.id, interpretation.id)
+    create_comment(client, book.id, interpretation.id)
+    # replies are not counted
+    response = client.post(
+        f"/book/{book.id}/{interpretation.id}/create_comment",
+        data=dict(text="Reply", parent_id=comment.id),
+        follow_redirects=True,
+    )
+    assert response.status_code == 200
+    db.session.refresh(interpretation)
+    assert interpretation.comments_count == 2
+
+    for _ in range(2):
+        response = client.post(
+            f"/book/{book.id}/{interpretation.id}/comment_delete",
+            data=dict(comment_id=comment.id),
+            follow_redirects=True,
+        )
+        assert response.status_code == 200
+    db.session.refresh(interpretation)
+    assert interpretation.comments_count == 1
+    assert interpretation.comments_count == len(interpretation.active_comments)
+
+    m.Interpretation.query.update({"comments_count": 0})
+    recount_comments()
+    db.session.refresh(interpretation)
+    assert interpretation.comments_count == 1
+
+
+def test_home_feed(client: FlaskClient):
+    login(client)
+    book: m.Book = create_book(client)
+    collection, _ = create_collection(client, book.id)
+    section, _ = create_section(client, book.id, collection.id)
+    interpretations: list[m.Interpretation] = []
+    for _ in range(12):
+        interpretation, _ = create_interpretation(client, book.id, section.id)
+        interpretations.append(interpretation)
+    for count, interpretation in enumerate(interpretations):
+        interpretation.comments_count = count % 4
+        interpretation.score = count % 3
+        interpretation.save()
+    interpretations[0].is_deleted = True
+    interpretations[0].save()
+
+    def feed(sort: str) -> list[m.Interpretation]:
+        """Walk the whole feed forward by cursors"""
+        url = f"/home/?sort={sort}"
+        found = []
+        while url:
+            response = client.get(url)
+            assert response.status_code == 200
+            page = [i for i in interpretations if i.text.encode() in response.data]
+            page.sort(key=lambda i: response.data.index(i.text.encode()))
+            found += page
+            url = None
+            if b"cursor=" in response.data:
+                cursor = response.data.split(b"cursor=")[1].split(b'"')[0]
+                url = f"/home/?sort={sort}&cursor={cursor.decode()}"
+        return found
+
+    active = interpretations[1:]
+    for sort, key in (
+        ("recent", lambda i: (i.created_at, i.id)),
+        ("upvoted", lambda i: (i.score, i.id)),
+        ("commented", lambda i: (i.comments_count, i.id)),
+    ):
+        found = feed(sort)
+        assert [i.id for i in found] == [
+            i.id for i in sorted(active, key=key, reverse=True)
+        ]
+
+    # the trending snapshot does not cut the orderings by counters
+    refresh_rankings(limit=3)
+    assert len(feed("upvoted")) == len(feed("commented")) == len(active)
+
+    # a deep page is one range read from the cursor, not counted
+    response = client.get("/home/?sort=commented")
+    cursor = response.data.split(b"cursor=")[1].split(b'"')[0].decode()
+    with count_queries() as queries:
+        response = client.get(f"/home/?sort=commented&cursor={cursor}")
+    assert response.status_code == 200
+    feed_queries = [
+        query
+        for query in queries
+        if "FROM interpretations" in query and "comments_count DESC" in query
+    ]
+    assert len(feed_queries) == 1
+    assert "(interpretations.comments_count, interpretations.id) < (?, ?)" in (
+        feed_queries[0]
+    )
+    assert not [query for query in queries if "count(*)" in query]
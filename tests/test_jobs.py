@@ -0,0 +1,173 @@
+import time
+from datetime import datetime, timedelta
+
+from flask import Flask
+from flask.testing import FlaskClient, FlaskCliRunner
+
+from app import models as m, db
+from app.controllers import jobs
+from app.controllers.jobs import work
+from tests.utils import (
+    login,
+    logout,
+    create_book,
+    create_test_book,
+    fill_book,
+    check_if_nested_book_entities_is_deleted,
+)
+
+
+def test_fork_job(app: Flask, client: FlaskClient, runner: FlaskCliRunner):
+    app.config["JOBS_RUN_INLINE"] = False
+    login(client)
+    book: m.Book = create_book(client)
+    fill_book(book, collections=2, sections=2)
+    logout(client)
+    _, user = login(client, "Test_U")
+
+    response = client.post(
+        f"/book/{book.id}/fork",
+        data=dict(label="Label", about="About"),
+        follow_redirects=True,
+    )
+    assert b"Fork is started" in response.data
+    assert not user.books
+
+    job: m.Job = m.Job.query.filter_by(user_id=user.id).first()
+    response = client.get(f"/jobs/{job.id}")
+    assert response.json["status"] == "PENDING"
+    assert response.json["kind"] == "FORK_BOOK"
+
+    result = runner.invoke(args=["jobs", "worker", "--once"])
+    assert result.exit_code == 0
+    assert "1 jobs processed" in result.output
+
+    response = client.get(f"/jobs/{job.id}")
+    assert response.json["status"] == "DONE"
+    assert response.json["progress"] == response.json["total"]
+    assert response.json["attempts"] == 1
+    fork: m.Book = db.session.get(m.Book, response.json["result"]["book_id"])
+    assert fork.user_id == user.id
+    # the worker has no request, changes are made by the user of the job
+    assert fork.active_version.updated_by == user.id
+    assert fork.original_book_id == book.id
+    assert len(fork.active_version.sections) == 4
+
+    # status of a job is visible to its owner only
+    logout(client)
+    login(client)
+    response = client.get(f"/jobs/{job.id}")
+    assert response.status_code == 404
+
+
+def test_job_retry_after_crash(app: Flask, client: FlaskClient):
+    app.config["JOBS_RUN_INLINE"] = False
+    _, user = login(client)
+    book: m.Book = create_book(client)
+    fill_book(book, collections=1, sections=2)
+    client.post(
+        f"/book/{book.id}/fork",
+        data=dict(label="Label", about="About"),
+        follow_redirects=True,
+    )
+    job: m.Job = m.Job.query.first()
+
+    # worker died in the middle of the fork
+    job.status = m.Job.Statuses.RUNNING
+    job.attempts = 1
+    job.heartbeat_at = datetime.now() - timedelta(hours=1)
+    leftover = m.Book(label="Label", user_id=user.id, original_book_id=book.id).save()
+    m.BookVersion(semver="Active", book_id=leftover.id, is_active=True).save()
+    job.result = {"book_id": leftover.id}
+    # fork with the same label made by the user is not a leftover of the job
+    other = m.Book(label="Label", user_id=user.id, original_book_id=book.id).save()
+
+    assert work("test", once=True) == 1
+    assert job.status == m.Job.Statuses.DONE
+    assert job.attempts == 2
+    assert leftover.is_deleted
+    assert all(version.is_deleted for version in leftover.versions)
+    assert not other.is_deleted
+    forks = m.Book.query.filter_by(original_book_id=book.id, is_deleted=False).all()
+    assert {fork.id for fork in forks} == {other.id, job.result["book_id"]}
+
+    # running job with fresh heartbeat is not taken by other workers
+    job.status = m.Job.Statuses.RUNNING
+    job.heartbeat_at = datetime.now()
+    db.session.commit()
+    assert work("test", once=True) == 0
+
+    # leftover of the crashed last attempt is discarded with the job
+    fork: m.Book = db.session.get(m.Book, job.result["book_id"])
+    job.attempts = app.config["JOBS_MAX_ATTEMPTS"]
+    job.heartbeat_at = datetime.now() - timedelta(hours=1)
+    db.session.commit()
+    assert work("test", once=True) == 0
+    assert job.status == m.Job.Statuses.FAILED
+    assert fork.is_deleted
+
+
+def test_job_fails_after_max_attempts(app: Flask, client: FlaskClient):
+    login(client)
+    book: m.Book = create_book(client)
+    job = m.Job(
+        kind=m.Job.Kinds.FORK_VERSION,
+        payload=dict(book_id=book.id, version_id=0, label="Label", about="About"),
+        user_id=book.user_id,
+    ).save()
+
+    assert work("test", once=True) == 1
+    assert job.status == m.Job.Statuses.PENDING
+    assert job.error
+    # failed job waits before the next attempt
+    assert work("test", once=True) == 0
+
+    app.config["JOBS_RETRY_DELAY"] = 0
+    job.run_after = datetime.now()
+    db.session.commit()
+    assert work("test", once=True) == app.config["JOBS_MAX_ATTEMPTS"] - 1
+    assert job.status == m.Job.Statuses.FAILED
+    assert job.attempts == app.config["JOBS_MAX_ATTEMPTS"]
+    assert work("test", once=True) == 0
+    # partial forks of failed attempts are discarded
+    assert not m.Book.query.filter_by(original_book_id=book.id, is_deleted=False).all()
+
+
+def test_job_heartbeat(app: Flask, client: FlaskClient, monkeypatch):
+    app.config["JOBS_HEARTBEAT_INTERVAL"] = 0.05
+    login(client)
+    book: m.Book = create_book(client)
+    job = m.Job(
+        kind=m.Job.Kinds.DELETE_BOOK,
+        payload=dict(book_id=book.id),
+        user_id=book.user_id,
+    ).save()
+    beats = []
+
+    def slow_handler(job: m.Job) -> dict:
+        # long step without progress
+        started_at = db.session.scalar(
+            db.select(m.Job.heartbeat_at).where(m.Job.id == job.id)
+        )
+        time.sleep(0.5)
+        db.session.expire(job)
+        beats.append(job.heartbeat_at > started_at)
+        return {}
+
+    monkeypatch.setitem(jobs.HANDLERS, m.Job.Kinds.DELETE_BOOK, slow_handler)
+    assert work("test", once=True) == 1
+    assert job.status == m.Job.Statuses.DONE
+    assert beats == [True]
+
+
+def test_delete_book_job(client: FlaskClient):
+    login(client)
+    book: m.Book = create_test_book(client)
+
+    response = client.post(f"/book/{book.id}/delete", follow_redirects=True)
+    assert b"Success" in response.data
+    job: m.Job = m.Job.query.filter_by(kind=m.Job.Kinds.DELETE_BOOK).first()
+    assert job.status == m.Job.Statuses.DONE
+    assert job.result == {"book_id": book.id}
+    assert book.is_deleted
+    check_if_nested_book_entities_is_deleted(book)
@@ -0,0 +1,69 @@
+from flask.testing import FlaskClient
+
+from app import models as m, db
+from tests.utils import (
+    login,
+    count_queries,
+    create_book,
+    add_contributor,
+    create,
+    fill_book,
+)
+
+LISTINGS = (
+    "/home/",
+    "/home/?sort=commented",
+    "/home/explore_books",
+    "/book/my_library",
+    "/book/favorite_books",
+    "/book/my_contributions",
+)
+
+
+def test_listing_queries(client: FlaskClient):
+    _, user = login(client)
+    contributor = create("contributor", "contributor")
+
+    def add_books(number: int):
+        for _ in range(number):
+            book: m.Book = create_book(client)
+            fill_book(book, collections=1, sections=2)
+            add_contributor(
+                client, book.id, contributor.id, m.BookContributor.Roles.EDITOR
+            )
+            response = client.post(f"/star/{book.id}")
+            assert response.status_code == 200
+            interpretation = m.Interpretation.query.filter_by(book_id=book.id).first()
+            response = client.post(
+                f"/vote/interpretation/{interpretation.id}", json=dict(positive=True)
+            )
+            assert response.status_code == 200
+
+    def queries_of(url: str) -> int:
+        db.session.expire_all()
+        with count_queries() as queries:
+            response = client.get(url)
+        assert response.status_code == 200
+        return len(queries)
+
+    add_books(1)
+    few = {url: queries_of(url) for url in LISTINGS + (f"/user/{user.id}/profile",)}
+    add_books(3)
+    many = {url: queries_of(url) for url in LISTINGS + (f"/user/{user.id}/profile",)}
+    assert many == few
+
+
+def test_book_card(client: FlaskClient):
+    login(client)
+    book: m.Book = create_book(client)
+    fill_book(book, collections=1, sections=3)
+    client.post(f"/star/{book.id}")
+
+    db.session.expire_all()
+    response = client.get("/home/explore_books")
+    assert response.status_code == 200
+    card: m.Book = db.session.get(m.Book, book.id)
+    assert card.current_user_has_star
+    assert card.interpretations_count == 3
+    assert card.approved_comments_count == 3
+    assert b'class="total-stars">1</a>' in response.data
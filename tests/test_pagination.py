@@ -0,0 +1,98 @@
+from flask import Flask
+from flask.testing import FlaskClient
+
+from app import models as m
+from app.controllers import paginate, keyset_page
+from tests.utils import login, count_queries
+
+
+def test_paginate(app: Flask, client: FlaskClient):
+    login(client)
+    for i in range(25):
+        m.User(username=f"pagination_{i:02}").save()
+    query = m.User.query.filter(m.User.username.like("pagination_%")).order_by(
+        m.User.id
+    )
+
+    def usernames(page) -> list[str]:
+        return [user.username for user in page]
+
+    with app.test_request_context("/?page=2"):
+        with count_queries() as queries:
+            pagination, page = paginate(query, page_size=10, keyset=[m.User.id])
+        # one count and one page
+        assert len(queries) == 2
+        assert pagination.total == page.total == 25
+        assert pagination.pages == 3
+        assert usernames(page) == [f"pagination_{i}" for i in range(10, 20)]
+
+    with app.test_request_context(f"/?page=3&cursor={page.next_cursor}"):
+        with count_queries() as queries:
+            pagination, page = paginate(
+                query, page_size=10, total=25, keyset=[m.User.id]
+            )
+        assert len(queries) == 1
+        assert "(users.id) > (?)" in queries[0]
+        assert pagination.page == 3
+        assert usernames(page) == [f"pagination_{i}" for i in range(20, 25)]
+        assert not page.next_cursor
+
+    # newest first, by creation time
+    keyset = [m.User.created_at, m.User.id]
+    with app.test_request_context("/"):
+        _, page = paginate(query, page_size=10, keyset=keyset, descending=True)
+    with app.test_request_context(f"/?cursor={page.next_cursor}"):
+        _, page = paginate(query, page_size=10, keyset=keyset, descending=True)
+        assert usernames(page) == [f"pagination_{i:02}" for i in range(14, 4, -1)]
+
+    # broken cursor gives the first page
+    with app.test_request_context("/?cursor=broken"):
+        _, page = paginate(query, page_size=10, keyset=[m.User.id])
+        assert usernames(page) == [f"pagination_{i:02}" for i in range(10)]
+
+    with count_queries() as queries:
+        response = client.get("/notifications/all")
+    assert response.status_code == 200
+    assert len([query for query in queries if "count(*)" in query]) == 1
+
+
+def test_keyset_page(app: Flask, client: FlaskClient):
+    login(client)
+    for i in range(25):
+        m.User(username=f"keyset_{i:02}").save()
+    query = m.User.query.filter(m.User.username.like("keyset_%"))
+    keyset = [m.User.created_at, m.User.id]
+
+    def usernames(page) -> list[str]:
+        return [user.username for user in page]
+
+    with app.test_request_context("/"):
+        with count_queries() as queries:
+            first = keyset_page(query, keyset, page_size=10, descending=True)
+        # no count
+        assert len(queries) == 1
+        assert first.total is None
+        assert usernames(first) == [f"keyset_{i:02}" for i in range(24, 14, -1)]
+        assert not first.prev_cursor
+
+    with app.test_request_context(f"/?cursor={first.next_cursor}"):
+        with count_queries() as queries:
+            second = keyset_page(query, keyset, page_size=10, descending=True)
+        assert "(users.created_at, users.id) < (?, ?)" in queries[0]
+        assert usernames(second) == [f"keyset_{i:02}" for i in range(14, 4, -1)]
+        assert second.prev_cursor
+
+    with app.test_request_context(f"/?cursor={second.next_cursor}"):
+        last = keyset_page(query, keyset, page_size=10, descending=True)
+        assert usernames(last) == [f"keyset_{i:02}" for i in range(4, -1, -1)]
+        assert not last.next_cursor
+
+    # back from the last page
+    with app.test_request_context(f"/?before={last.prev_cursor}"):
+        page = keyset_page(query, keyset, page_size=10, descending=True)
+        assert usernames(page) == usernames(second)
+        assert page.next_cursor and page.prev_cursor
+    with app.test_request_context(f"/?before={page.prev_cursor}"):
+        page = keyset_page(query, keyset, page_size=10, descending=True)
+        assert usernames(page) == usernames(first)
+        assert not page.prev_cursor
@@ -0,0 +1,77 @@
+from flask import current_app as Response, g
+from flask.testing import FlaskClient
+
+from app import models as m, db
+from app.controllers.book_tree import BookTree
+from app.controllers.permission_resolver import PermissionResolver
+from tests.utils import (
+    login,
+    create_book,
+    fill_book,
+    count_queries,
+)
+
+
+def test_permission_resolver(client: FlaskClient):
+    _, owner = login(client)
+    book = create_book(client)
+    fill_book(book, collections=3, sections=2)
+
+    editor = m.User(username="editor", password="editor").save()
+    response: Response = client.post(
+        f"/book/{book.id}/add_contributor",
+        data=dict(user_id=editor.id, role=m.BookContributor.Roles.EDITOR),
+        follow_redirects=True,
+    )
+    assert b"Contributor was added!" in response.data
+    stranger = m.User(username="stranger", password="stranger").save()
+
+    resolver = PermissionResolver.load(book.id, owner.id)
+    assert resolver.is_owner
+    assert resolver.has_permission(book, [m.Permission.Access.D])
+
+    book_id, editor_id = book.id, editor.id
+    db.session.expire_all()
+    with count_queries() as queries:
+        resolver = PermissionResolver.load(book_id, editor_id)
+    assert len(queries) == 3
+    assert not resolver.is_owner
+
+    tree = BookTree.load(book.active_version)
+    collections = [node.model for node in tree.collections.values()]
+    sections = [node.model for node in tree.sections.values()]
+    with count_queries() as queries:
+        assert resolver.has_permission(book, [m.Permission.Access.U])
+        assert not resolver.has_permission(book, [m.Permission.Access.D])
+        assert all(
+            resolver.has_permissions(collections, [m.Permission.Access.U]).values()
+        )
+        assert all(
+            resolver.has_permissions(
+                collections, [m.Permission.Access.C], m.Permission.Entity.SECTION
+            ).values()
+        )
+        assert all(
+            resolver.has_permissions(
+                sections,
+                [m.Permission.Access.C, m.Permission.Access.U],
+                m.Permission.Entity.SECTION,
+            ).values()
+        )
+        assert resolver.has_all_permissions(
+            sections[0],
+            [m.Permission.Access.C, m.Permission.Access.U],
+            m.Permission.Entity.SECTION,
+        )
+    assert not queries
+
+    resolver = PermissionResolver.load(book.id, stranger.id)
+    assert not resolver.has_permission(book, [m.Permission.Access.U])
+    assert not any(
+        resolver.has_permissions(collections, [m.Permission.Access.U]).values()
+    )
+
+    # resolvers are loaded again after access groups could be changed
+    g.permission_resolvers = {(editor_id, book_id): resolver}
+    db.session.commit()
+    assert "permission_resolvers" not in g
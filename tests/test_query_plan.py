@@ -0,0 +1,19 @@
+import sqlalchemy as sa
+from click.testing import Result
+from flask.testing import FlaskCliRunner
+
+from app import models as m
+from app.controllers.query_plan import hot_queries, find_seq_scans
+
+
+def test_hot_queries_use_indexes(runner: FlaskCliRunner):
+    res: Result = runner.invoke(args=["db-populate"])
+    assert res.exit_code == 0
+
+    for name, query in hot_queries().items():
+        assert not find_seq_scans(query), name
+    assert find_seq_scans(sa.select(m.Book).filter_by(label="Dummy Book")) == ["books"]
+
+    res: Result = runner.invoke(args=["check-query-plans"])
+    assert res.exit_code == 0
+    assert "All hot queries use indexes" in res.stdout
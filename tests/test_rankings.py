@@ -0,0 +1,97 @@
+from datetime import datetime, timedelta
+
+from flask import Flask
+from flask.testing import FlaskClient, FlaskCliRunner
+
+from app import models as m, db
+from app.controllers.rankings import refresh_rankings_if_due, trending_score
+from tests.utils import (
+    login,
+    create_book,
+    create_collection,
+    create_section,
+    create_interpretation,
+)
+
+
+def test_trending_score():
+    fresh = trending_score(3, timedelta(0), half_life=24)
+    assert fresh == 4
+    assert trending_score(3, timedelta(hours=24), half_life=24) == fresh / 2
+    assert trending_score(-5, timedelta(0), half_life=24) == 1
+    # an old popular interpretation sinks below a fresh one
+    assert trending_score(10, timedelta(days=5), half_life=24) < fresh
+
+
+def test_rankings(client: FlaskClient, runner: FlaskCliRunner):
+    login(client)
+    book: m.Book = create_book(client)
+    collection, _ = create_collection(client, book.id)
+    section, _ = create_section(client, book.id, collection.id)
+    interpretations: list[m.Interpretation] = []
+    for _ in range(5):
+        interpretation, _ = create_interpretation(client, book.id, section.id)
+        interpretations.append(interpretation)
+    now = datetime.now()
+    for count, interpretation in enumerate(interpretations):
+        interpretation.score = count
+        interpretation.comments_count = 4 - count
+        interpretation.created_at = now - timedelta(days=count)
+        interpretation.save()
+
+    def feed(sort: str) -> list[int]:
+        response = client.get(f"/home/?sort={sort}")
+        assert response.status_code == 200
+        page = [i for i in interpretations if i.text.encode() in response.data]
+        page.sort(key=lambda i: response.data.index(i.text.encode()))
+        return [i.id for i in page]
+
+    ids = [i.id for i in interpretations]
+    # trending is the recent feed until the first snapshot
+    assert feed("trending") == ids
+
+    result = runner.invoke(args=["rankings", "refresh", "--limit", "3"])
+    assert result.exit_code == 0
+    assert "trending: 3 ranked" in result.output
+    # fresh interpretations trend above old upvoted ones
+    assert feed("trending") == ids[:3]
+    # counter orderings are not ranked, they are read live to any depth
+    assert feed("upvoted") == ids[::-1]
+    assert feed("commented") == ids
+    interpretations[0].score = 10
+    interpretations[0].save()
+    assert feed("upvoted") == [ids[0]] + ids[:0:-1]
+
+    # the snapshot is read until the next refresh
+    interpretations[0].is_deleted = True
+    interpretations[0].save()
+    assert feed("trending") == ids[1:3]
+
+    # interpretations older than the trending window are not ranked
+    interpretations[1].created_at = now - timedelta(days=30)
+    interpretations[1].save()
+    result = runner.invoke(args=["rankings", "refresh"])
+    assert result.exit_code == 0
+    assert feed("trending") == [ids[2], ids[3], ids[4]]
+    assert m.InterpretationRanking.query.count() == 3
+
+
+def test_refresh_rankings_if_due(app: Flask, client: FlaskClient):
+    login(client)
+    book: m.Book = create_book(client)
+    collection, _ = create_collection(client, book.id)
+    section, _ = create_section(client, book.id, collection.id)
+    create_interpretation(client, book.id, section.id)
+
+    assert refresh_rankings_if_due()
+    assert not refresh_rankings_if_due()
+    m.InterpretationRanking.query.update(
+        {"created_at": datetime.now() - timedelta(hours=1)}
+    )
+    db.session.commit()
+    assert refresh_rankings_if_due()
+
+    app.config["RANKINGS_REFRESH_INTERVAL"] = 0
+    m.InterpretationRanking.query.delete()
+    db.session.commit()
+    assert not refresh_rankings_if_due()
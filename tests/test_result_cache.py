@@ -0,0 +1,70 @@
+from flask.testing import FlaskClient
+
+from app import models as m
+from app.controllers.result_cache import ResultCache, SqliteBackend
+from app.controllers.tags import set_book_tags, set_interpretation_tags
+from tests.utils import login, create_book, fill_book, count_queries
+
+
+def tag_queries(queries: list[str], table: str) -> list[str]:
+    return [query for query in queries if f"FROM {table}, tags" in query]
+
+
+def test_tag_pages_cache(client: FlaskClient):
+    login(client)
+    book: m.Book = create_book(client)
+    fill_book(book, collections=1, sections=2)
+    first, second = [
+        section.interpretations[0] for section in book.active_version.sections
+    ]
+    set_interpretation_tags(first, ["psalm"])
+
+    with count_queries() as queries:
+        response = client.get("/tag_search_interpretations?tag_name=psalm")
+    assert response.status_code == 200
+    assert len(tag_queries(queries, "interpretations")) == 2
+
+    # the page is not searched again
+    with count_queries() as queries:
+        response = client.get("/tag_search_interpretations?tag_name=psalm")
+    assert response.status_code == 200
+    assert not tag_queries(queries, "interpretations")
+
+    # tagging invalidates it
+    set_interpretation_tags(second, ["psalm"])
+    with count_queries() as queries:
+        response = client.get("/tag_search_interpretations?tag_name=psalm")
+    assert len(tag_queries(queries, "interpretations")) == 2
+
+    set_book_tags(book, "psalm")
+    response = client.get("/tag_search_books?tag_name=psalm")
+    assert book.label.encode() in response.data
+    with count_queries() as queries:
+        response = client.get("/tag_search_books?tag_name=psalm")
+    assert book.label.encode() in response.data
+    assert not tag_queries(queries, "books")
+
+    book.label = "Psalms"
+    book.save()
+    response = client.get("/tag_search_books?tag_name=psalm")
+    assert b"Psalms" in response.data
+
+
+def test_sqlite_backend_is_shared(tmp_path):
+    path = str(tmp_path / "results.sqlite3")
+    # caches of two workers
+    worker, other_worker = ResultCache(SqliteBackend(path, 60)), ResultCache(
+        SqliteBackend(path, 60)
+    )
+    tables = {"tags", "interpretations"}
+
+    worker.put("page", tables, [2, [1, 2], None])
+    assert other_worker.get("page", tables) == [2, [1, 2], None]
+    assert not other_worker.get("page", {"tags"})
+
+    other_worker.invalidate({"interpretations"})
+    assert not worker.get("page", tables)
+
+    expired = ResultCache(SqliteBackend(path, -1))
+    expired.put("page", tables, [0, [], None])
+    assert not expired.get("page", tables)
@@ -0,0 +1,288 @@
+import re
+import time
+
+import sqlalchemy as sa
+from flask import Flask
+from flask.testing import FlaskClient
+
+from app import models as m, db
+from app.controllers.book_search import search_books
+from app.controllers.cache import LRUCache
+from app.controllers.search_backend import (
+    interpretation_snippets,
+    parse_query,
+    search_interpretations,
+)
+from app.controllers.trigram_search import similarity, trigram_match, trigram_rank
+from tests.search_benchmark import (
+    QUERIES,
+    benchmark_book_search,
+    benchmark_search,
+    benchmark_typeahead,
+)
+from tests.utils import login, create_book, fill_book, count_queries
+
+
+def add_interpretations(book: m.Book, *texts: str) -> list[m.Interpretation]:
+    section: m.Section = book.active_version.sections[0]
+    interpretations = [
+        m.Interpretation(
+            text=f"<p>{text}</p>",
+            plain_text=text,
+            section_id=section.id,
+            user_id=book.user_id,
+        ).save()
+        for text in texts
+    ]
+    return interpretations
+
+
+def test_parse_query():
+    terms = parse_query('Genesis "In the beginning" crea* ')
+    assert [term.words for term in terms] == [
+        ["genesis"],
+        ["in", "the", "beginning"],
+        ["crea"],
+    ]
+    assert [term.prefix for term in terms] == [False, False, True]
+    assert parse_query("light", prefix_last=True)[0].prefix
+    assert not parse_query(' "" * ')
+
+
+def test_search_interpretations(client: FlaskClient):
+    login(client)
+    book: m.Book = create_book(client)
+    fill_book(book, collections=1, sections=1)
+    once, twice, phrase, deleted = add_interpretations(
+        book,
+        "the light and the darkness",
+        "light was made, light was good",
+        "darkness was upon the face of the deep",
+        "light of a deleted interpretation",
+    )
+    deleted.is_deleted = True
+    deleted.save()
+
+    # more relevant first
+    assert search_interpretations("light").all() == [twice, once]
+    assert search_interpretations('"the darkness"').all() == [once]
+    assert set(search_interpretations("dark*").all()) == {once, phrase}
+    assert search_interpretations("lig", prefix_last=True).count() == 2
+    assert not search_interpretations("lig").all()
+    assert search_interpretations("darkness deep").all() == [phrase]
+
+    # index follows updates and deletes
+    phrase.plain_text = "without form and void"
+    phrase.save()
+    assert search_interpretations("darkness").all() == [once]
+    assert search_interpretations("void").all() == [phrase]
+    db.session.delete(phrase)
+    db.session.commit()
+    assert not search_interpretations("void").all()
+
+    response = client.get("/search_interpretations?q=light")
+    assert response.status_code == 200
+    assert b"<mark>light</mark> was made" in response.data
+    assert b"deleted interpretation" not in response.data
+
+    response = client.get("/search_books?q=good")
+    assert response.status_code == 200
+    assert book.label.encode() in response.data
+
+    response = client.get("/quick_search?search_query=goo")
+    assert response.json["interpretations"] == [
+        {
+            "label": twice.section.label,
+            "url": f"/book/{book.id}/{twice.id}/preview",
+        }
+    ]
+
+
+def test_search_snippets(client: FlaskClient):
+    login(client)
+    book: m.Book = create_book(client)
+    fill_book(book, collections=1, sections=1)
+    filler = " ".join(f"word{i}" for i in range(300))
+    long, tagged = add_interpretations(
+        book,
+        f"{filler} the light shines in the darkness {filler} ending",
+        "light & <b>bold</b> claims",
+    )
+    snippets = interpretation_snippets("light", [long.id, tagged.id])
+    assert "<mark>light</mark> shines" in snippets[long.id]
+    assert "ending" not in snippets[long.id]
+    # the text is escaped, only highlights are markup
+    assert "<mark>light</mark> &amp; &lt;b&gt;bold" in snippets[tagged.id]
+    assert "word1 word2" in interpretation_snippets("", [long.id])[long.id]
+
+    with count_queries() as queries:
+        response = client.get("/search_interpretations?q=light")
+    assert response.status_code == 200
+    assert b"<mark>light</mark> shines" in response.data
+    assert b"ending" not in response.data
+    # full texts are not loaded
+    assert not [
+        query
+        for query in queries
+        if "interpretations.text AS" in query and not query.startswith("SELECT count")
+    ]
+
+
+def test_search_benchmark(client: FlaskClient):
+    interpretations = m.Interpretation.query.count()
+    results = benchmark_search(100)
+    assert [q for q, _, _ in results] == list(QUERIES)
+    # synthetic data is rolled back
+    assert m.Interpretation.query.count() == interpretations
+
+    users = m.User.query.count()
+    names = [name for name, _ in benchmark_typeahead(100)]
+    assert [name.split(":")[0] for name in names] == ["users", "tags"] * 2
+    assert m.User.query.count() == users
+    assert not m.Tag.query.all()
+
+    books = m.Book.query.count()
+    results = benchmark_book_search(2, collections=3, sections=10)
+    assert [q for q, _, _ in results] == ["kabar lo", "mifil"]
+    assert m.Book.query.count() == books
+
+
+def test_similarity():
+    # the same numbers as pg_trgm
+    assert similarity("word", "two words") == 4 / 11
+    assert similarity("word", "word") == 1
+    assert similarity("word", None) == 0
+
+
+def test_trigram_search(client: FlaskClient):
+    _, user = login(client)
+    for username in ("alexander", "alexandra", "sandra", "john_doe"):
+        m.User(username=username).save()
+    for name in ("python", "pythonic", "rust"):
+        m.Tag(name=name).save()
+
+    def usernames(q: str, fuzzy: bool = False) -> list[str]:
+        users = m.User.query.filter(
+            trigram_match(m.User.username, q, fuzzy=fuzzy)
+        ).order_by(trigram_rank(m.User.username, q).desc(), m.User.id)
+        return [user.username for user in users]
+
+    assert usernames("xand") == ["alexander", "alexandra"]
+    assert usernames("ANDRA") == ["alexandra", "sandra"]
+    assert usernames("n_d") == ["john_doe"]
+    assert usernames("n%d") == []
+    assert usernames("al") == ["alexander", "alexandra"]
+    # typo
+    assert usernames("alexnder") == []
+    assert usernames("alexnder", fuzzy=True)[0] == "alexander"
+
+    # index follows updates
+    user.username = "johnny"
+    user.save()
+    assert usernames("johnn") == ["johnny"]
+
+    response = client.get("/search_tags?q=pyth")
+    assert b"pythonic" in response.data
+    assert b"rust" not in response.data
+
+    response = client.get("/quick_search?search_query=pythn")
+    assert [tag["label"] for tag in response.json["tags"]] == ["python", "pythonic"]
+
+    response = client.get("/user/search?q=sandar")
+    assert response.json["users"][0]["username"] == "sandra"
+
+
+def test_search_books(client: FlaskClient):
+    login(client)
+    book: m.Book = create_book(client)
+    fill_book(book, collections=1, sections=2)
+    other_book: m.Book = create_book(client)
+    fill_book(other_book, collections=1, sections=2)
+    empty_book: m.Book = create_book(client)
+    empty_book.label = "Numbers"
+    empty_book.save()
+
+    collection: m.Collection = book.active_version.children_collections[0]
+    collection.label = "Exodus"
+    collection.save()
+    section, deleted_section = other_book.active_version.sections
+    section.label = "Leviticus"
+    section.save()
+    deleted_section.label = "Exodus"
+    deleted_section.is_deleted = True
+    deleted_section.save()
+    interpretation: m.Interpretation = book.active_version.sections[0].interpretations[
+        0
+    ]
+    interpretation.plain_text = "Deuteronomy"
+    interpretation.save()
+
+    assert search_books("exodus").all() == [book]
+    assert search_books("leviti").all() == [other_book]
+    assert search_books("numbers").all() == [empty_book]
+    assert search_books("deuteronomy").all() == [book]
+    assert search_books("sub coll").all() == [book, other_book]
+    assert search_books("").all() == [book, other_book, empty_book]
+    empty_book.is_deleted = True
+    empty_book.save()
+    assert not search_books("numbers").all()
+
+    with count_queries() as queries:
+        response = client.get("/search_books?q=exodus")
+    assert response.status_code == 200
+    assert book.label.encode() in response.data
+    assert other_book.label.encode() not in response.data
+    # one count and one page of books
+    assert len([query for query in queries if re.search(r"FROM books\b", query)]) == 2
+
+
+def test_quick_search_cache(app: Flask, client: FlaskClient):
+    login(client)
+    book: m.Book = create_book(client)
+    fill_book(book, collections=1, sections=1)
+    book.label = "Revelation"
+    book.save()
+
+    with count_queries() as queries:
+        response = client.get("/quick_search?search_query=Revel")
+    assert [item["label"] for item in response.json["books"]] == ["Revelation"]
+    assert len([query for query in queries if "UNION ALL" in query]) == 1
+
+    # the same normalized prefix is served from the cache
+    with count_queries() as queries:
+        response = client.get("/quick_search?search_query=%20revel%20")
+    assert [item["label"] for item in response.json["books"]] == ["Revelation"]
+    assert not [query for query in queries if "UNION ALL" in query]
+
+    # writes invalidate the cache
+    m.Book(label="Revelations", user_id=book.user_id).save()
+    response = client.get("/quick_search?search_query=revel")
+    assert len(response.json["books"]) == 2
+
+    response = client.get("/quick_search?search_query=interpretation")
+    assert len(response.json["interpretations"]) == 1
+    db.session.execute(
+        sa.update(m.Interpretation)
+        .where(m.Interpretation.book_id == book.id)
+        .values(is_deleted=True)
+    )
+    db.session.commit()
+    response = client.get("/quick_search?search_query=interpretation")
+    assert not response.json["interpretations"]
+
+
+def test_lru_cache(monkeypatch):
+    cache = LRUCache(maxsize=2, ttl=10)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    # "b" is the least recently used
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+    now = time.monotonic()
+    monkeypatch.setattr(time, "monotonic", lambda: now + 11)
+    assert cache.get("a") is None
+    assert cache.get("c") is None
@@ -0,0 +1,118 @@
+import sqlalchemy as sa
+from flask.testing import FlaskClient, FlaskCliRunner
+
+from app import models as m, db
+from tests.utils import (
+    login,
+    create_book,
+    create_collection,
+    create_section,
+    create_interpretation,
+    fill_book,
+)
+
+Kinds = m.SearchDocument.Kinds
+
+
+def documents(kind: Kinds) -> dict[int, m.SearchDocument]:
+    return {
+        document.entity_id: document
+        for document in m.SearchDocument.query.filter_by(kind=kind)
+    }
+
+
+def fts_match(query: str) -> set[int]:
+    """Entity ids of documents found by the SQLite full text index"""
+    return set(
+        db.session.scalars(
+            sa.select(m.SearchDocument.entity_id).where(
+                m.SearchDocument.id.in_(
+                    sa.text(
+                        "SELECT rowid FROM search_documents_fts "
+                        "WHERE search_documents_fts MATCH :query"
+                    ).bindparams(query=query)
+                )
+            )
+        )
+    )
+
+
+def test_reindex(client: FlaskClient, runner: FlaskCliRunner):
+    login(client)
+    book: m.Book = create_book(client)
+    # written directly to the DB, not indexed
+    fill_book(book, collections=2, sections=2)
+    deleted: m.Section = book.active_version.sections[0]
+    deleted.is_deleted = True
+    deleted.save()
+
+    result = runner.invoke(args=["search", "reindex", "--batch-size", "3"])
+    assert result.exit_code == 0
+    collections = m.Collection.query.filter_by(is_root=False).count()
+    sections = m.Section.query.filter_by(is_deleted=False).count()
+    interpretations = m.Interpretation.query.filter_by(is_deleted=False).count()
+    assert f"collection: {collections}" in result.output
+    assert f"section: {sections}" in result.output
+    total = 1 + collections + sections + interpretations
+    assert f"{total} documents indexed" in result.output
+    assert m.SearchDocument.query.count() == total
+    assert deleted.id not in documents(Kinds.SECTION)
+
+    interpretation: m.Interpretation = m.Interpretation.query.filter_by(
+        is_deleted=False
+    ).first()
+    document = documents(Kinds.INTERPRETATION)[interpretation.id]
+    assert document.title == interpretation.section.label
+    assert document.body == interpretation.plain_text
+    assert (document.book_id, document.version_id) == (
+        book.id,
+        book.active_version_id,
+    )
+
+    # the rebuild replaces documents
+    result = runner.invoke(args=["search", "reindex"])
+    assert m.SearchDocument.query.count() == total
+
+
+def test_incremental_index(client: FlaskClient):
+    login(client)
+    book: m.Book = create_book(client)
+    assert book.id in documents(Kinds.BOOK)
+
+    collection, _ = create_collection(client, book.id)
+    section, _ = create_section(client, book.id, collection.id)
+    interpretation, _ = create_interpretation(client, book.id, section.id)
+    assert collection.id in documents(Kinds.COLLECTION)
+    assert section.id in documents(Kinds.SECTION)
+    assert interpretation.id in documents(Kinds.INTERPRETATION)
+
+    response = client.post(
+        f"/book/{book.id}/{interpretation.id}/edit_interpretation",
+        data=dict(interpretation_id=interpretation.id, text="In the beginning"),
+        follow_redirects=True,
+    )
+    assert response.status_code == 200
+    assert documents(Kinds.INTERPRETATION)[interpretation.id].body == (
+        "in the beginning"
+    )
+    assert fts_match("beginning") == {interpretation.id}
+
+    # interpretations are titled by the section
+    response = client.post(
+        f"/book/{book.id}/{section.id}/edit_section",
+        data=dict(section_id=section.id, label="Genesis"),
+        follow_redirects=True,
+    )
+    assert response.status_code == 200
+    assert documents(Kinds.SECTION)[section.id].title == "Genesis"
+    assert documents(Kinds.INTERPRETATION)[interpretation.id].title == "Genesis"
+    assert fts_match("genesis") == {section.id, interpretation.id}
+
+    response = client.post(
+        f"/book/{book.id}/{collection.id}/delete", follow_redirects=True
+    )
+    assert response.status_code == 200
+    assert not documents(Kinds.COLLECTION)
+    assert not documents(Kinds.SECTION)
+    assert not documents(Kinds.INTERPRETATION)
+    assert not fts_match("genesis")
@@ -1,13 +1,16 @@
+from click.testing import CliRunner
 from flask import current_app as Response
 from flask.testing import FlaskClient
 
-from app import models as m
+from app import models as m, db
+from app.controllers.tags import set_book_tags, set_interpretation_tags
 from tests.utils import (
     create_book,
     create_collection,
     create_comment,
     create_interpretation,
     create_section,
+    fill_book,
     login,
 )
 
@@ -193,3 +196,65 @@ def test_create_tags_on_interpretation_create_and_edit(client: FlaskClient):
 
     tags_from_db: m.Tag = m.Tag.query.all()
     assert len(tags_from_db) == 5
+
+
+def test_tag_usage_counters(client: FlaskClient, runner: CliRunner):
+    login(client)
+    book: m.Book = create_book(client)
+    fill_book(book, collections=1, sections=2)
+    first, second = [
+        section.interpretations[0] for section in book.active_version.sections
+    ]
+
+    set_book_tags(book, "Psalm,psalm,grace")
+    set_interpretation_tags(first, ["#Psalm"])
+    set_interpretation_tags(second, ["#psalm", "#grace", "#grace"])
+
+    # one tag per key
+    assert m.Tag.query.count() == 2
+    psalm: m.Tag = m.Tag.query.filter_by(key="psalm").one()
+    grace: m.Tag = m.Tag.query.filter_by(key="grace").one()
+    assert (psalm.books_count, psalm.interpretations_count, psalm.usage_count) == (
+        1,
+        2,
+        3,
+    )
+    assert (grace.books_count, grace.interpretations_count, grace.usage_count) == (
+        1,
+        1,
+        2,
+    )
+
+    response = client.get("/top_tags")
+    assert [(tag["name"], tag["count"]) for tag in response.json] == [
+        ("psalm", 3),
+        ("grace", 2),
+    ]
+
+    set_interpretation_tags(second, ["#grace"])
+    set_book_tags(book, "")
+    db.session.refresh(psalm)
+    db.session.refresh(grace)
+    assert (psalm.books_count, psalm.interpretations_count, psalm.usage_count) == (
+        0,
+        1,
+        1,
+    )
+    assert (grace.books_count, grace.interpretations_count, grace.usage_count) == (
+        0,
+        1,
+        1,
+    )
+    response = client.get("/top_tags?limit=1")
+    assert [(tag["name"], tag["count"]) for tag in response.json] == [("grace", 1)]
+
+    response = client.get("/tag_search_interpretations?tag_name=PSALM")
+    assert response.status_code == 200
+    assert first.section.label.encode() in response.data
+
+    m.Tag.query.update({m.Tag.usage_count: 0, m.Tag.interpretations_count: 0})
+    db.session.commit()
+    result = runner.invoke(args=["recount-tags"])
+    assert "Usage of 2 tags counted" in result.output
+    db.session.refresh(psalm)
+    assert (psalm.interpretations_count, psalm.usage_count) == (1, 1)
@@ -1,8 +1,13 @@
+import pytest
 from flask import current_app as Response
 from flask.testing import FlaskClient
+from sqlalchemy.exc import IntegrityError
 
-from app import models as m
+from app import models as m, db
+from app.controllers.featured_interpretation import update_featured_interpretation
+from app.controllers.vote import toggle_interpretation_vote
 from tests.utils import (
+    count_queries,
     login,
     create_interpretation,
     create_section,
@@ -216,3 +221,67 @@ def test_upvote_comment(client: FlaskClient):
     assert "current_user_vote" in json
     assert json["current_user_vote"] is None
     assert comment.vote_count == 0
+
+
+def test_vote_counters(client: FlaskClient):
+    login(client)
+    book = create_book(client)
+    collection, _ = create_collection(client=client, book_id=book.id)
+    section, _ = create_section(
+        client=client, book_id=book.id, collection_id=collection.id
+    )
+    interpretation, _ = create_interpretation(
+        client=client, book_id=book.id, section_id=section.id
+    )
+
+    # flip positive vote to negative one
+    toggle_interpretation_vote(interpretation.id, 1, True)
+    assert toggle_interpretation_vote(interpretation.id, 1, False) is False
+    db.session.commit()
+    assert interpretation.up_votes == 0
+    assert interpretation.down_votes == 1
+    assert interpretation.score == -1
+    assert m.InterpretationVote.query.count() == 1
+
+    # unique (user, interpretation)
+    m.InterpretationVote(
+        user_id=1, interpretation_id=interpretation.id, positive=True
+    ).save(False)
+    with pytest.raises(IntegrityError):
+        db.session.commit()
+    db.session.rollback()
+
+
+def test_vote_query_count_is_flat(client: FlaskClient):
+    login(client)
+    book = create_book(client)
+    collection, _ = create_collection(client=client, book_id=book.id)
+    section, _ = create_section(
+        client=client, book_id=book.id, collection_id=collection.id
+    )
+    new, _ = create_interpretation(
+        client=client, book_id=book.id, section_id=section.id
+    )
+    hot, _ = create_interpretation(
+        client=client, book_id=book.id, section_id=section.id
+    )
+    for i in range(50):
+        user = m.User(username=f"voter_{i}", password="voter").save()
+        toggle_interpretation_vote(hot.id, user.id, i % 3 != 0)
+    update_featured_interpretation(section)
+    db.session.commit()
+    assert hot.vote_count == 50 - 2 * 17
+
+    queries_count = {}
+    for interpretation in (new, hot):
+        db.session.expire_all()
+        with count_queries() as queries:
+            response = client.post(
+                f"/vote/interpretation/{interpretation.id}",
+                headers={"Content-Type": "application/json"},
+                json=dict(positive=True),
+            )
+        assert response.status_code == 200
+        queries_count[interpretation.id] = len(queries)
+    assert queries_count[new.id] == queries_count[hot.id]
+    assert response.json["vote_count"] == 50 - 2 * 17 + 1
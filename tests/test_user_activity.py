@@ -0,0 +1,89 @@
+from flask.testing import FlaskClient
+
+from app import models as m
+from tests.utils import (
+    login,
+    logout,
+    count_queries,
+    create_book,
+    create_collection,
+    create_section,
+    create_interpretation,
+    create_comment,
+)
+
+
+def activity(user: m.User) -> list[tuple]:
+    return [
+        (item.kind, item.interpretation_id)
+        for item in m.UserActivity.query.filter_by(user_id=user.id).order_by(
+            m.UserActivity.id
+        )
+    ]
+
+
+def test_user_activity(client: FlaskClient):
+    _, author = login(client)
+    book: m.Book = create_book(client)
+    collection, _ = create_collection(client, book.id)
+    section, _ = create_section(client, book.id, collection.id)
+    interpretations: list[m.Interpretation] = []
+    for _ in range(3):
+        interpretation, _ = create_interpretation(client, book.id, section.id)
+        interpretations.append(interpretation)
+    first, second, third = interpretations
+    Kinds = m.UserActivity.Kinds
+    assert activity(author) == [
+        (Kinds.INTERPRETATION, interpretation.id) for interpretation in interpretations
+    ]
+    logout(client)
+
+    _, reader = login(client, "reader", "reader")
+    for _ in range(2):
+        create_comment(client, book.id, second.id)
+    # voting twice removes the vote, the activity stays
+    for _ in range(2):
+        response = client.post(
+            f"/vote/interpretation/{third.id}", json=dict(positive=True)
+        )
+        assert response.status_code == 200
+    response = client.post(
+        f"/vote/interpretation/{second.id}", json=dict(positive=True)
+    )
+    assert response.status_code == 200
+    assert activity(reader) == [(Kinds.COMMENT, second.id), (Kinds.VOTE, third.id)]
+
+    def contributions(url: str) -> list[int]:
+        with count_queries() as queries:
+            response = client.get(url)
+        assert response.status_code == 200
+        contribution_queries = [
+            query for query in queries if "JOIN user_activity" in query
+        ]
+        assert len(contribution_queries) == 1
+        assert "user_activity.user_id = ?" in contribution_queries[0]
+        assert "GROUP BY" not in contribution_queries[0]
+        page = [i for i in interpretations if i.text.encode() in response.data]
+        page.sort(key=lambda i: response.data.index(i.text.encode()))
+        return [i.id for i in page]
+
+    assert contributions("/book/my_contributions") == [third.id, second.id]
+    assert contributions("/book/my_contributions?sort=upvoted") == [
+        second.id,
+        third.id,
+    ]
+
+    third.is_deleted = True
+    third.save()
+    assert contributions("/book/my_contributions") == [second.id]
+    # keyset page has no total, the header is shown by the items
+    response = client.get("/book/my_contributions")
+    assert b"My contributions" in response.data
+    assert b"You don't have contributions yet" not in response.data
+    logout(client)
+
+    login(client)
+    assert contributions("/book/my_contributions?sort=recent") == [
+        second.id,
+        first.id,
+    ]
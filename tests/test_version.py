@@ -7,6 +7,7 @@ from tests.utils import (
     logout,
     create_book,
     check_if_nested_version_entities_is_deleted,
+    count_queries,
 )
 
 
@@ -250,8 +251,30 @@ def test_create_version(client):
     assert response.status_code == 200
     assert b"Success" in response.data
     assert len(book.versions) == 2
+    assert book.active_version == book.versions[0]
 
     new_version: m.BookVersion = book.versions[-1]
 
     for collection in new_version.root_collection.active_children:
         recursive_copy_collection(collection)
+
+
+def test_active_version_query_count(client: FlaskClient):
+    login(client)
+    book: m.Book = create_book(client)
+    active_version_id = book.active_version_id
+    assert active_version_id == book.versions[0].id
+
+    for i in range(10):
+        response: Response = client.post(
+            f"/book/{book.id}/create_version",
+            data=dict(semver=f"1.0.{i}"),
+            follow_redirects=True,
+        )
+        assert b"Success" in response.data
+
+    db.session.expire_all()
+    book = db.session.get(m.Book, book.id)
+    with count_queries() as queries:
+        assert book.active_version.id == active_version_id
+    assert len(queries) == 1
@@ -1,8 +1,10 @@
+from contextlib import contextmanager
 from uuid import uuid4
 
 from flask import current_app as Response
+from sqlalchemy import event
 
-from app import models as m
+from app import models as m, db
 
 TEST_ADMIN_NAME = "bob"
 TEST_ADMIN_EMAIL = "bob@test.com"
@@ -46,6 +48,21 @@ def create_test_book(client):
     return book
 
 
+@contextmanager
+def count_queries():
+    """Collects SQL statements executed inside the block"""
+    queries: list[str] = []
+
+    def before_cursor_execute(conn, cursor, statement, *args):
+        queries.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield queries
+    finally:
+        event.remove(db.engine, "before_cursor_execute", before_cursor_execute)
+
+
 def check_if_nested_book_entities_is_deleted(book: m.Book, is_deleted: bool = True):
     for version in book.versions:
         version: m.BookVersion
@@ -215,3 +232,62 @@ def create_comment(client, book_id, interpretation_id):
     )
     comment: m.Comment = m.Comment.query.filter_by(text=TEXT).first()
     return comment, response
+
+
+def fill_book(book: m.Book, collections: int = 2, sections: int = 2, user=None):
+    """Adds collections with sub collections, sections, interpretations and
+    approved comments to the active version of the book directly in the DB"""
+    version: m.BookVersion = book.active_version
+    root: m.Collection = version.root_collection
+    user_id = user.id if user else book.user_id
+    for collection_index in range(collections):
+        collection = m.Collection(
+            label=f"Collection {collection_index}",
+            parent_id=root.id,
+            version_id=version.id,
+            position=collection_index,
+            access_groups=list(root.access_groups),
+        )
+        db.session.add(collection)
+        db.session.flush()
+        sub_collection = m.Collection(
+            label=f"Sub collection {collection_index}",
+            parent_id=collection.id,
+            version_id=version.id,
+            position=0,
+            is_leaf=True,
+            access_groups=list(root.access_groups),
+        )
+        db.session.add(sub_collection)
+        db.session.flush()
+        for section_index in range(sections):
+            label = f"{collection_index}.{section_index}"
+            section = m.Section(
+                label=f"Section {label}",
+                collection_id=sub_collection.id,
+                version_id=version.id,
+                position=section_index,
+                access_groups=list(root.access_groups),
+            )
+            db.session.add(section)
+            db.session.flush()
+            interpretation = m.Interpretation(
+                text=f"Interpretation {label}",
+                plain_text=f"interpretation {label}",
+                section_id=section.id,
+                user_id=user_id,
+                access_groups=list(root.access_groups),
+            )
+            db.session.add(interpretation)
+            db.session.flush()
+            section.featured_interpretation_id = interpretation.id
+            db.session.add(
+                m.Comment(
+                    text=f"Comment {label}",
+                    approved=True,
+                    interpretation_id=interpretation.id,
+                    user_id=user_id,
+                )
+            )
+    db.session.commit()
+    return book